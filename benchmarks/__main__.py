@@ -0,0 +1,66 @@
+import sys
+
+import click
+
+from .corpora import scenarios as all_scenarios
+from .runner import DEFAULT_THRESHOLD, MIN_ROUNDS, baseline_path, compare as compare_results, format_ns, load, save
+
+
+@click.group()
+def cli():
+    """Micro-benchmarks for the request hot path."""
+    pass
+
+
+@cli.command()
+@click.option("--save", "save_as", default=None, help="Baseline name (stored in benchmarks/baselines/) or JSON path.")
+@click.option("--scale", "scales", multiple=True, help="Only run these corpus scales (10, 1k, 100k).")
+@click.option("--case", "cases", multiple=True, help="Only run these cases (e.g. find_matching_mock).")
+@click.option("--rounds", default=MIN_ROUNDS, show_default=True, type=click.INT)
+@click.option("--against", default=None, help="Baseline to compare the fresh results with.")
+@click.option("--threshold", default=DEFAULT_THRESHOLD, show_default=True, type=click.FLOAT)
+def run(save_as: str | None, scales: tuple[str, ...], cases: tuple[str, ...], rounds: int, against: str | None, threshold: float) -> None:
+    """Time every stage in isolation and optionally store the results as a baseline."""
+    from .runner import run as run_cases
+    from .stages import build_cases
+
+    selected = [s for s in all_scenarios() if not scales or s[0].split("-")[0] in scales]
+    if not selected:
+        click.echo("❌ No scenarios selected")
+        sys.exit(2)
+
+    document = run_cases(build_cases(selected, set(cases) or None), rounds, echo=click.echo)
+    if save_as:
+        path = baseline_path(save_as)
+        save(document, path)
+        click.echo(f"✅ Baseline saved to {path}")
+    if against:
+        _report(compare_results(load(baseline_path(against)), document, threshold), threshold)
+
+
+@cli.command()
+@click.argument("baseline")
+@click.argument("current")
+@click.option("--threshold", default=DEFAULT_THRESHOLD, show_default=True, type=click.FLOAT,
+              help="Relative slowdown (0.10 = 10%) above which a case is reported as a regression.")
+def compare(baseline: str, current: str, threshold: float) -> None:
+    """Compare two stored baselines and exit non-zero on regressions."""
+    _report(compare_results(load(baseline_path(baseline)), load(baseline_path(current)), threshold), threshold)
+
+
+def _report(rows: list[dict], threshold: float) -> None:
+    regressions = 0
+    for row in rows:
+        mark = "❌" if row["regression"] else "✅"
+        regressions += row["regression"]
+        click.echo(
+            f"{mark} {row['name']:<55} {format_ns(row['baseline_ns']):>12} -> "
+            f"{format_ns(row['current_ns']):>12} ({row['change']:+.1%})"
+        )
+    if regressions:
+        click.echo(f"{regressions} regression(s) above {threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    cli()
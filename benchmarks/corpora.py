@@ -0,0 +1,64 @@
+import json
+from pathlib import Path
+from typing import Any
+
+
+SCALES: dict[str, int] = {
+    "10": 10,
+    "1k": 1_000,
+    "100k": 100_000,
+}
+BODIES: tuple[str, ...] = ("small", "huge")
+
+# Huge bodies are only built for the smaller corpora: 100k mocks with ~100KB bodies would need gigabytes of RAM.
+HUGE_BODY_MAX_SCALE = 1_000
+HUGE_BODY_ITEMS = 1_000
+
+
+def _small_body(i: int) -> dict[str, Any]:
+    return {"id": i, "name": f"item-{i}", "ok": True}
+
+
+def _huge_body(i: int) -> list[dict[str, Any]]:
+    return [
+        {"id": i * HUGE_BODY_ITEMS + j, "title": f"product {j}", "price": j * 1.5, "tags": ["a", "b", "c"]}
+        for j in range(HUGE_BODY_ITEMS)
+    ]
+
+
+def make_mock(i: int, body: str = "small") -> dict[str, Any]:
+    """Build a single mock entry with validation rules and on_pass/on_fail blocks."""
+    return {
+        "path": f"/api/bench/{i}/",
+        "method": ["GET", "POST"],
+        "status": 200,
+        "response": _huge_body(i) if body == "huge" else _small_body(i),
+        "data": [
+            {"name": "user.name", "type": "str", "if": "min_length 3"},
+            {"name": "user.age", "type": "int", "if": "between 18 99"},
+            {"name": "items.0.price", "type": "float", "if": ">= 0"},
+        ],
+        "on_pass": {"response": {"created": True}, "status": 201},
+        "on_fail": {"response": {"created": False}, "status": 422},
+    }
+
+
+def make_corpus(size: int, body: str = "small") -> list[dict[str, Any]]:
+    """Build `size` mocks with distinct paths; the last one is the worst case for a linear lookup."""
+    return [make_mock(i, body) for i in range(size)]
+
+
+def scenarios() -> list[tuple[str, int, str]]:
+    """Return (name, size, body) for every corpus the suite should be run against."""
+    out = []
+    for label, size in SCALES.items():
+        for body in BODIES:
+            if body == "huge" and size > HUGE_BODY_MAX_SCALE:
+                continue
+            out.append((f"{label}-{body}", size, body))
+    return out
+
+
+def write_corpus(corpus: list[dict[str, Any]], path: Path) -> Path:
+    path.write_text(json.dumps(corpus, ensure_ascii=False), encoding="utf-8")
+    return path
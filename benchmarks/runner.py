@@ -0,0 +1,117 @@
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+
+BASELINES_DIR = Path(__file__).resolve().parent / "baselines"
+DEFAULT_THRESHOLD = 0.10
+MIN_ROUNDS = 5
+ROUND_TARGET_NS = 20_000_000  # ~20ms per round
+
+
+def _calibrate(func: Callable[[], Any]) -> int:
+    """Return how many calls fit into one round of ROUND_TARGET_NS (at least 1)."""
+    number = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter_ns() - start
+        if elapsed >= ROUND_TARGET_NS or number >= 1 << 20:
+            return number
+        number *= 10 if elapsed < ROUND_TARGET_NS / 10 else 2
+
+
+def time_case(func: Callable[[], Any], rounds: int = MIN_ROUNDS) -> dict[str, Any]:
+    """Time `func` in several rounds and return per-call statistics in nanoseconds."""
+    number = _calibrate(func)
+    samples: list[float] = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(max(rounds, 1)):
+            start = time.perf_counter_ns()
+            for _ in range(number):
+                func()
+            samples.append((time.perf_counter_ns() - start) / number)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return {
+        "median_ns": statistics.median(samples),
+        "min_ns": min(samples),
+        "max_ns": max(samples),
+        "rounds": len(samples),
+        "number": number,
+    }
+
+
+def run(cases, rounds: int = MIN_ROUNDS, echo: Callable[[str], None] = print) -> dict[str, Any]:
+    """Run every (name, callable) pair and return a baseline-shaped document."""
+    results: dict[str, Any] = {}
+    for name, func in cases:
+        stats = time_case(func, rounds)
+        results[name] = stats
+        echo(f"{name:<55} {format_ns(stats['median_ns']):>12}")
+    return {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        "results": results,
+    }
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any], threshold: float = DEFAULT_THRESHOLD) -> list[dict[str, Any]]:
+    """
+    Compare median timings of cases present in both documents.
+    Each row has the relative change; `regression` is set when it exceeds `threshold`.
+    """
+    rows = []
+    base_results = baseline.get("results", {})
+    for name, stats in current.get("results", {}).items():
+        base = base_results.get(name)
+        if not base or not base.get("median_ns"):
+            continue
+        change = stats["median_ns"] / base["median_ns"] - 1
+        rows.append({
+            "name": name,
+            "baseline_ns": base["median_ns"],
+            "current_ns": stats["median_ns"],
+            "change": change,
+            "regression": change > threshold,
+        })
+    return rows
+
+
+def baseline_path(name_or_path: str) -> Path:
+    """Resolve a bare baseline name to benchmarks/baselines/<name>.json, leave real paths untouched."""
+    path = Path(name_or_path)
+    if path.suffix == ".json" or path.parent != Path("."):
+        return path
+    return BASELINES_DIR / f"{name_or_path}.json"
+
+
+def save(document: dict[str, Any], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(document, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def load(path: Path) -> dict[str, Any]:
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def format_ns(ns: float) -> str:
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("µs", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.2f} {unit}"
+    return f"{ns:.0f} ns"
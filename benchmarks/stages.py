@@ -0,0 +1,198 @@
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Callable
+
+import django
+from django.http import QueryDict
+from django.utils.datastructures import MultiValueDict
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mockapi.django_service.django_service.settings")
+django.setup()
+
+from mockapi.core.io.io import load_mocks
+from mockapi.core.django_service.view.form_parser import parse_form_to_obj
+from mockapi.core.django_service.view.http_helpers import _get_or_generate_response, _make_response, find_matching_mock
+from mockapi.core.django_service.view.validator import ConditionEvaluator, validate
+from mockapi.core.django_service.view.matcher import MatchContext
+from mockapi.core.store.store import MockSnapshot
+from mockapi.core.model.model import FileSpec, Mock, ResponseSpec, parse_mocks
+from mockapi.core.files.files import file_response
+from mockapi.core.template.template import compile_template
+
+from .corpora import make_corpus, make_mock, write_corpus
+
+
+VALID_BODY: dict[str, Any] = {
+    "user": {"name": "Alice", "age": 30},
+    "items": [{"price": 9.99}],
+}
+FORM_BODY = "user[name]=Alice&user[age]=30&items[0][price]=9.99&tags=a&tags=b&meta={\"k\": 1}"
+GENERATE_MOCK: dict[str, Any] = {
+    "generate_response": {
+        "locale": "en_US",
+        "count": 10,
+        "response": {"id": "uuid4", "name": "name", "price": [100, 500], "code": "abc.unGen"},
+    }
+}
+
+
+# Each case factory receives the corpus and a scratch directory and returns the zero-argument callable to time.
+Case = Callable[[list[dict[str, Any]], Path], Callable[[], Any]]
+
+
+def case_find_matching_mock(corpus: list[dict[str, Any]], _tmp: Path) -> Callable[[], Any]:
+    # the last mock is the worst case for a linear scan
+    mocks = parse_mocks(corpus)
+    path = corpus[-1]["path"]
+    return lambda: find_matching_mock(mocks, path, "POST")
+
+
+def case_find_matching_mock_miss(corpus: list[dict[str, Any]], _tmp: Path) -> Callable[[], Any]:
+    mocks = parse_mocks(corpus)
+    return lambda: find_matching_mock(mocks, "/api/bench/missing/", "GET")
+
+
+def case_snapshot_find(corpus: list[dict[str, Any]], _tmp: Path) -> Callable[[], Any]:
+    snapshot = MockSnapshot(corpus)
+    path = corpus[-1]["path"]
+    return lambda: snapshot.find(path, "POST")
+
+
+def case_match_tree_select(_corpus: list[dict[str, Any]], _tmp: Path) -> Callable[[], Any]:
+    # 500 variants of one path told apart by query and header conditions
+    variants = [
+        {"path": "/api/variants/", "match": {"query": {"id": str(i)}, "headers": {"X-Tenant": "regex:^t"}}, "response": i}
+        for i in range(500)
+    ]
+    snapshot = MockSnapshot(variants)
+    query, headers = {"id": "499"}, {"X-Tenant": "tenant"}
+    return lambda: snapshot.find("/api/variants/", "GET", MatchContext(query, headers))
+
+
+def case_load_mocks(corpus: list[dict[str, Any]], tmp: Path) -> Callable[[], Any]:
+    # the path is passed like the store does, so MOCKS_FILE is left alone
+    path = write_corpus(corpus, tmp / "mocks.json")
+    return lambda: load_mocks(path)
+
+
+def case_parse_mocks(corpus: list[dict[str, Any]], _tmp: Path) -> Callable[[], Any]:
+    return lambda: parse_mocks(corpus)
+
+
+def case_get_or_generate_response(corpus: list[dict[str, Any]], _tmp: Path) -> Callable[[], Any]:
+    spec = Mock(corpus[0]).response
+    return lambda: _get_or_generate_response(spec)
+
+
+def case_make_response(corpus: list[dict[str, Any]], _tmp: Path) -> Callable[[], Any]:
+    payload = corpus[0]["response"]
+    return lambda: _make_response(payload, 200)
+
+
+def case_file_response(corpus: list[dict[str, Any]], tmp: Path) -> Callable[[], Any]:
+    # the same body as make_response, served from a file: opening it replaces serializing it
+    path = tmp / "response.json"
+    path.write_text(json.dumps(corpus[0]["response"]), encoding="utf-8")
+    spec = FileSpec(str(path))
+
+    def run():
+        file_response(spec, 200).close()
+    return run
+
+
+def case_render_template(corpus: list[dict[str, Any]], _tmp: Path) -> Callable[[], Any]:
+    # the make_response body with two placeholders, compiled once like a loaded mock's
+    body = corpus[0]["response"]
+    template = compile_template({"id": "{{path.id}}", "echo": "{{body.user.name}}", "data": body})
+    ctx = MatchContext({}, {}, lambda: VALID_BODY, params={"id": "42"})
+    return lambda: template.render(ctx)
+
+
+def case_generate_response_faker(_corpus: list[dict[str, Any]], _tmp: Path) -> Callable[[], Any]:
+    spec = ResponseSpec.from_dict(GENERATE_MOCK, 200)
+    return lambda: _get_or_generate_response(spec)
+
+
+def case_validate(_corpus: list[dict[str, Any]], _tmp: Path) -> Callable[[], Any]:
+    rules = Mock(make_mock(0)).rules
+    return lambda: validate(VALID_BODY, rules)
+
+
+def case_validate_list(_corpus: list[dict[str, Any]], _tmp: Path) -> Callable[[], Any]:
+    rules = Mock(make_mock(0)).rules
+    body = [VALID_BODY] * 100
+    return lambda: validate(body, rules)
+
+
+def case_condition_evaluate(_corpus: list[dict[str, Any]], _tmp: Path) -> Callable[[], Any]:
+    evaluator = ConditionEvaluator()
+    conditions = ["between 18 99", ">= 0", "min_length 3", "regex:^\\S+@\\S+$", 'in ["a", "b"]']
+    values = [30, 5, "Alice", "user@example.com", "a"]
+    pairs = list(zip(values, conditions))
+
+    def run():
+        for val, cond in pairs:
+            evaluator.evaluate(val, cond)
+    return run
+
+
+def case_parse_form_to_obj(_corpus: list[dict[str, Any]], _tmp: Path) -> Callable[[], Any]:
+    post = QueryDict(FORM_BODY)
+    files = MultiValueDict()
+    return lambda: parse_form_to_obj(post, files)
+
+
+# (name, factory, axis): axis "corpus" runs against every corpus scenario, "body" once per body kind
+# on the smallest corpus, and None once in total.
+CASES: list[tuple[str, Case, str | None]] = [
+    ("find_matching_mock", case_find_matching_mock, "corpus"),
+    ("find_matching_mock_miss", case_find_matching_mock_miss, "corpus"),
+    ("snapshot_find", case_snapshot_find, "corpus"),
+    ("load_mocks", case_load_mocks, "corpus"),
+    ("parse_mocks", case_parse_mocks, "corpus"),
+    ("get_or_generate_response", case_get_or_generate_response, "body"),
+    ("make_response", case_make_response, "body"),
+    ("file_response", case_file_response, "body"),
+    ("render_template", case_render_template, "body"),
+    ("generate_response_faker", case_generate_response_faker, None),
+    ("match_tree_select", case_match_tree_select, None),
+    ("validate", case_validate, None),
+    ("validate_list", case_validate_list, None),
+    ("condition_evaluate", case_condition_evaluate, None),
+    ("parse_form_to_obj", case_parse_form_to_obj, None),
+]
+
+
+def build_cases(scenarios: list[tuple[str, int, str]], only: set[str] | None = None):
+    """
+    Yield (result_name, callable) pairs for every case/scenario combination.
+    Corpora are built lazily and shared between cases of the same scenario.
+    Scratch files live in a temporary directory removed once all cases were consumed.
+    """
+    with tempfile.TemporaryDirectory(prefix="mockapi-bench-") as tmp:
+        yield from _build_cases(scenarios, only, Path(tmp))
+
+
+def _build_cases(scenarios: list[tuple[str, int, str]], only: set[str] | None, tmp: Path):
+    smallest = min(size for _, size, _ in scenarios)
+    seen_bodies: set[str] = set()
+    ran_static = False
+
+    for scenario, size, body in scenarios:
+        corpus = None
+        for name, factory, axis in CASES:
+            if only and name not in only:
+                continue
+            if axis == "body" and (size != smallest or body in seen_bodies):
+                continue
+            if axis is None and ran_static:
+                continue
+            if corpus is None:
+                corpus = make_corpus(size, body)
+            label = {"corpus": scenario, "body": body, None: "static"}[axis]
+            yield f"{name}[{label}]", factory(corpus, tmp)
+        if size == smallest:
+            seen_bodies.add(body)
+            ran_static = True
@@ -0,0 +1,62 @@
+import json
+import math
+import random
+
+from django.http import HttpResponse, HttpResponseServerError
+
+from ..model.model import CapacitySpec
+from ..shared.shared_state import get_counter, incr_counter
+from ..utils import logger
+from ..files.files import file_response
+from ..django_service.view.http_helpers import _get_or_generate_response, _make_response
+
+
+def sojourn_time(spec: CapacitySpec, in_system: int) -> float:
+    """
+    Time a request arriving as the `in_system`-th one spends in an M/M/c system: while all `workers`
+    are busy, departures happen at rate workers / service_time, so waiting for the
+    `in_system - workers` requests ahead of it is Erlang distributed; its own service is exponential.
+    """
+    ahead = in_system - spec.workers
+    wait = random.gammavariate(ahead, spec.service_time / spec.workers) if ahead > 0 else 0.0
+    return wait + random.expovariate(1 / spec.service_time)
+
+
+def admit(spec: CapacitySpec) -> float | None:
+    """
+    Count one more in-flight request and return how long it should take, or None if the queue is full
+    (the request is then not counted). Every admitted request must be released.
+    """
+    in_system = incr_counter(f"inflight:{spec.key}")
+    queued = in_system - spec.workers
+    if spec.queue_limit is not None and queued > spec.queue_limit:
+        incr_counter(f"inflight:{spec.key}", -1)
+        return None
+    return sojourn_time(spec, in_system)
+
+
+def release(spec: CapacitySpec) -> None:
+    incr_counter(f"inflight:{spec.key}", -1)
+
+
+def in_flight(spec: CapacitySpec) -> int:
+    return get_counter(f"inflight:{spec.key}")
+
+
+def shed_response(spec: CapacitySpec) -> HttpResponse:
+    """503 (or the configured answer) for a request over capacity, with a Retry-After of about one queue drain."""
+    try:
+        if spec.response.file is not None:
+            response = file_response(spec.response.file, spec.response.status)
+        else:
+            payload = _get_or_generate_response(spec.response)
+            response = _make_response(payload if payload is not None else {"error": "over capacity"}, spec.response.status)
+    except Exception:
+        logger.exception("Error while generating capacity response")
+        return HttpResponseServerError(
+            json.dumps({"error": "failed to generate capacity response"}, ensure_ascii=False),
+            content_type="application/json",
+        )
+    drain = ((spec.queue_limit or 0) + 1) * spec.service_time / spec.workers
+    response["Retry-After"] = str(max(1, math.ceil(drain)))
+    return response
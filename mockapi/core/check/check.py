@@ -0,0 +1,364 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable
+
+from ..model.model import DelaySpec, Mock, PathPattern, _methods
+from ..resource.resource import RESOURCE_TYPE
+from ..template.template import accessor, placeholders
+from ..utils import logger
+from ..django_service.view.constants import TYPE_MAP
+from ..django_service.view.validator import condition_problem
+
+
+ERROR = "error"
+WARNING = "warning"
+CHUNK_SIZE = 500
+HTTP_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "TRACE", "CONNECT"})
+MATCH_SOURCES = ("query", "headers", "body")
+
+
+class Issue:
+    """One problem found in a mocks file; `index` is the position of the mock (None for the file itself)."""
+    __slots__ = ("level", "file", "index", "path", "message")
+
+    def __init__(self, level: str, file: str, index: int | None, path: Any, message: str):
+        self.level = level
+        self.file = file
+        self.index = index
+        self.path = path
+        self.message = message
+
+    def __str__(self) -> str:
+        where = self.file if self.index is None else f"{self.file}:{self.index} {self.path}"
+        return f"{where}: {self.level}: {self.message}"
+
+
+# ---------- Single mock ----------
+@lru_cache(maxsize=None)
+def _faker(locale: str):
+    from faker import Faker
+    return Faker(locale)
+
+
+@lru_cache(maxsize=1)
+def _locales() -> frozenset[str]:
+    from faker.config import AVAILABLE_LOCALES
+    return frozenset(AVAILABLE_LOCALES)
+
+
+def _check_status(status: Any, where: str) -> list[tuple[str, str]]:
+    if status is None:
+        return []
+    if not isinstance(status, int) or isinstance(status, bool) or not 100 <= status <= 599:
+        return [(ERROR, f"{where}status must be an HTTP status code, got {status!r}")]
+    return []
+
+
+def _check_generate(spec: Any, where: str) -> list[tuple[str, str]]:
+    if not isinstance(spec, dict):
+        return []  # reported by the Mock parser
+    locale = spec.get("locale")
+    if locale not in _locales():
+        return [(ERROR, f"{where}generate_response locale {locale!r} is not a Faker locale")]
+    out = []
+    templates = spec.get("response", {})
+    for template in templates if isinstance(templates, list) else [templates]:
+        values = template.values() if isinstance(template, dict) else [template]
+        for value in values:
+            if isinstance(value, str) and not value.endswith(".unGen") and not callable(getattr(_faker(locale), value, None)):
+                out.append((WARNING, f"{where}{value!r} is not a Faker provider, it is returned as is"))
+            elif isinstance(value, list) and not (
+                len(value) in (2, 3) and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in value)
+            ):
+                out.append((WARNING, f"{where}{value!r} is not a [min, max] or [min, max, precision] range, it is returned as is"))
+    return out
+
+
+def _check_placeholders(body: Any, where: str, params: tuple[str, ...]) -> list[tuple[str, str]]:
+    out = []
+    for expr in dict.fromkeys(placeholders(body)):
+        if accessor(expr) is None:
+            out.append((WARNING, f"{where}{{{{{expr}}}}} is not a placeholder, it is returned as is"))
+        elif expr.startswith("path.") and expr[5:] not in params:
+            out.append((WARNING, f"{where}{{{{{expr}}}}}: the path has no {{{expr[5:]}}} parameter, so it has no value"))
+    return out
+
+
+def _check_response_file(file: str, where: str, base_dir: str) -> list[tuple[str, str]]:
+    out = []
+    if not os.path.isfile(os.path.join(base_dir, file)):
+        out.append((WARNING, f"{where}response_file {file!r} is not a file (paths are relative to the mocks file)"))
+    base = os.path.realpath(base_dir)
+    if os.path.isabs(file) or os.path.commonpath([base, os.path.realpath(os.path.join(base, file))]) != base:
+        out.append((WARNING, f"{where}response_file {file!r} is outside the directory of the mocks file"))
+    return out
+
+
+def _check_response_block(block: Any, where: str, params: tuple[str, ...] = (), base_dir: str = ".") -> list[tuple[str, str]]:
+    if not isinstance(block, dict):
+        return []
+    out = _check_status(block.get("status"), where)
+    if not block.get("generate_response") and "response_file" not in block and not block.get("shuffle"):
+        out += _check_placeholders(block.get("response"), where, params)
+    if block.get("generate_response"):
+        out += _check_generate(block["generate_response"], where)
+    file = block.get("response_file")
+    if isinstance(file, str) and file:
+        out += _check_response_file(file, where, base_dir)
+        if "response" in block or block.get("generate_response"):
+            out.append((WARNING, f"{where}response and generate_response are ignored with a response_file"))
+    return out
+
+
+def _check_methods(method: Any) -> list[tuple[str, str]]:
+    if isinstance(method, str):
+        methods = [method]
+    elif isinstance(method, list) and method and all(isinstance(m, str) for m in method):
+        methods = method
+    else:
+        return [(ERROR, f"method must be a string or a non-empty list of strings, got {method!r}")]
+    out = []
+    for m in methods:
+        if m != m.upper() and m.upper() in HTTP_METHODS:
+            out.append((ERROR, f"method {m!r} never matches, methods are upper case"))
+        elif m not in HTTP_METHODS:
+            out.append((WARNING, f"unknown method {m!r}"))
+    return out
+
+
+def _check_rules(rules: Any) -> list[tuple[str, str]]:
+    out = []
+    for i, rule in enumerate(rules if isinstance(rules, list) else []):
+        if not isinstance(rule, dict):
+            continue  # reported by the Mock parser
+        name = rule.get("name")
+        if not isinstance(name, str) or not name:
+            out.append((ERROR, f"data[{i}] has no name"))
+        rule_type = rule.get("type", "any")
+        if not isinstance(rule_type, str) or rule_type.lower() not in TYPE_MAP:
+            out.append((WARNING, f"data[{i}] type {rule_type!r} is unknown and never checked"))
+        problem = condition_problem(rule.get("if"))
+        if problem:
+            out.append((ERROR, f"data[{i}] if: {problem}"))
+    return out
+
+
+def _check_match(match: Any) -> list[tuple[str, str]]:
+    if match is None:
+        return []
+    if not isinstance(match, dict):
+        return [(ERROR, "match must be an object")]
+    out = []
+    for source, conditions in match.items():
+        if source not in MATCH_SOURCES:
+            out.append((WARNING, f"match source {source!r} is ignored (expected one of {', '.join(MATCH_SOURCES)})"))
+            continue
+        if not isinstance(conditions, dict):
+            out.append((ERROR, f"match.{source} must be an object"))
+            continue
+        for key, cond in conditions.items():
+            problem = condition_problem(cond) if isinstance(cond, (str, dict)) else None
+            if problem:
+                out.append((ERROR, f"match.{source}.{key}: {problem}"))
+    return out
+
+
+def _check_resource(config: Any) -> list[tuple[str, str]]:
+    if config is None:
+        return []
+    if not isinstance(config, dict):
+        return []  # reported by the Mock parser
+    out = []
+    if not isinstance(config.get("id_field", "id"), str):
+        out.append((ERROR, "resource.id_field must be a string"))
+    indexes = config.get("indexes", [])
+    if not isinstance(indexes, list) or not all(isinstance(f, str) for f in indexes):
+        out.append((ERROR, "resource.indexes must be a list of field names"))
+    page_size = config.get("page_size", 1)
+    if not isinstance(page_size, int) or isinstance(page_size, bool) or page_size < 1:
+        out.append((ERROR, "resource.page_size must be a positive integer"))
+    seed = config.get("seed")
+    if isinstance(seed, dict):
+        out += _check_generate(seed, "resource.seed: ")
+    elif seed is not None and not isinstance(seed, list):
+        out.append((ERROR, "resource.seed must be a list of objects or a generate_response object"))
+    snapshot = config.get("snapshot")
+    if snapshot is not None and not (isinstance(snapshot, dict) and isinstance(snapshot.get("file"), str)):
+        out.append((ERROR, "resource.snapshot must be an object with a file"))
+    return out
+
+
+def _check_unstable(unstable: Any, params: tuple[str, ...], base_dir: str) -> list[tuple[str, str]]:
+    if not isinstance(unstable, dict):
+        return []
+    out = []
+    fail_rate = unstable.get("fail_rate", 0)
+    if not isinstance(fail_rate, (int, float)) or isinstance(fail_rate, bool) or not 0 <= fail_rate <= 1:
+        out.append((ERROR, f"unstable.fail_rate must be a number in [0, 1], got {fail_rate!r}"))
+    fail_every = unstable.get("fail_every")
+    if fail_every is not None and (not isinstance(fail_every, int) or isinstance(fail_every, bool) or fail_every < 1):
+        out.append((ERROR, f"unstable.fail_every must be a positive integer, got {fail_every!r}"))
+    return out + _check_response_block(unstable, "unstable: ", params, base_dir)
+
+
+def check_mock(entry: Any, base_dir: str = ".") -> list[tuple[str, str]]:
+    """
+    Return (level, message) pairs for everything wrong with one mock entry.
+    `base_dir` is the directory of its mocks file, which response_file paths are relative to.
+    """
+    if not isinstance(entry, dict):
+        return [(ERROR, "mock must be an object")]
+    out: list[tuple[str, str]] = []
+    try:
+        Mock(entry)
+    except ValueError as e:
+        out.append((ERROR, str(e)))
+
+    path = entry.get("path")
+    if isinstance(path, str) and not path.startswith("/"):
+        out.append((WARNING, "path doesn't start with '/' and never matches a request"))
+    try:
+        pattern = PathPattern.parse(path)
+    except ValueError:
+        pattern = None  # reported by the Mock parser
+    params = pattern.names if pattern else ()
+
+    out += _check_methods(entry.get("method", "GET"))
+    out += _check_response_block(entry, "", params, base_dir)
+    for block in ("on_pass", "on_fail"):
+        out += _check_response_block(entry.get(block), f"{block}: ", params, base_dir)
+    if entry.get("delay") is not None:
+        problem = DelaySpec.problem(entry["delay"])
+        if problem:
+            out.append((ERROR, problem))
+    out += _check_unstable(entry.get("unstable"), params, base_dir)
+    out += _check_rules(entry.get("data"))
+    out += _check_match(entry.get("match"))
+
+    sequence = entry.get("sequence")
+    if sequence is not None and not (isinstance(sequence, list) and sequence):
+        out.append((ERROR, "sequence must be a non-empty list"))
+    for i, item in enumerate(sequence if isinstance(sequence, list) else []):
+        out += _check_response_block(item, f"sequence[{i}]: ", params, base_dir)
+
+    fault = entry.get("fault")
+    if entry.get("throughput") is not None or (isinstance(fault, dict) and fault.get("type") == "stall"):
+        out.append((WARNING, "throughput and stall faults keep a thread busy per response under WSGI (mockapi start), "
+                             "serve many slow responses with an ASGI server"))
+
+    mock_type = entry.get("type")
+    if mock_type is not None and mock_type != RESOURCE_TYPE:
+        out.append((WARNING, f"unknown type {mock_type!r}, served as a regular mock"))
+    if mock_type == RESOURCE_TYPE:
+        out += _check_resource(entry.get("resource"))
+    return out
+
+
+def _check_chunk(task: tuple[str, int, list[Any]]) -> list[Issue]:
+    file, start, entries = task
+    base_dir = os.path.dirname(file) or "."
+    issues = []
+    # the problems the loader would log are reported as issues instead
+    disabled, logger.disabled = logger.disabled, True
+    try:
+        for index, entry in enumerate(entries, start):
+            path = entry.get("path") if isinstance(entry, dict) else None
+            for level, message in check_mock(entry, base_dir):
+                issues.append(Issue(level, file, index, path, message))
+    finally:
+        logger.disabled = disabled
+    return issues
+
+
+# ---------- Whole file ----------
+def check_routes(file: str, entries: list[Any]) -> list[Issue]:
+    """
+    Report mocks that are never served: duplicates, and mocks whose methods are all answered by
+    earlier unconditional mocks of the same path (the first matching mock in file order wins).
+    """
+    issues = []
+    served: dict[str, dict[str, int]] = {}  # path -> method -> index of the unconditional mock serving it
+    conditional: dict[tuple, int] = {}
+    collections: dict[str, int] = {}
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict) or not isinstance(entry.get("path"), str):
+            continue
+        path = entry["path"]
+        if entry.get("type") == RESOURCE_TYPE:
+            key = path.rstrip("/") or "/"
+            if key in collections:
+                issues.append(Issue(ERROR, file, index, path, f"duplicate resource, #{collections[key]} is served instead"))
+            else:
+                collections[key] = index
+            continue
+
+        methods = _methods(entry.get("method", "GET"))
+        by_method = served.setdefault(path, {})
+        shadowing = sorted({by_method[m] for m in methods if m in by_method})
+        if methods and all(m in by_method for m in methods):
+            what = "duplicate of" if len(shadowing) == 1 and _methods(entries[shadowing[0]].get("method", "GET")) == methods \
+                else "never served, shadowed by"
+            issues.append(Issue(ERROR, file, index, path, f"{what} {', '.join(f'#{i}' for i in shadowing)}"))
+            continue
+        if shadowing:
+            taken = sorted(m for m in methods if m in by_method)
+            issues.append(Issue(WARNING, file, index, path, f"{', '.join(taken)} already served by {', '.join(f'#{i}' for i in shadowing)}"))
+
+        if entry.get("match"):
+            key = (path, methods, json.dumps(entry["match"], sort_keys=True, default=str))
+            if key in conditional:
+                issues.append(Issue(ERROR, file, index, path, f"duplicate of #{conditional[key]} (same match)"))
+            else:
+                conditional[key] = index
+        else:
+            for m in methods:
+                by_method.setdefault(m, index)
+    return issues
+
+
+def collect_files(paths: Iterable[str | Path]) -> list[Path]:
+    """Files to check: the given files, plus every *.json file under the given directories."""
+    files: list[Path] = []
+    for p in map(Path, paths):
+        files.extend(sorted(p.rglob("*.json")) if p.is_dir() else [p])
+    return files
+
+
+def check_paths(paths: Iterable[str | Path], jobs: int | None = None) -> tuple[int, list[Issue]]:
+    """
+    Check every mocks file under `paths` and return (number of mocks checked, issues).
+    Mocks are checked in chunks spread over a process pool; duplicate and shadowing
+    checks need the whole file and run in this process.
+    """
+    issues: list[Issue] = []
+    tasks: list[tuple[str, int, list[Any]]] = []
+    count = 0
+    for file in collect_files(paths):
+        name = str(file)
+        try:
+            with open(file, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            issues.append(Issue(ERROR, name, None, None, f"can't read mocks: {e}"))
+            continue
+        if not isinstance(entries, list):
+            issues.append(Issue(ERROR, name, None, None, "JSON must be an array of mock objects"))
+            continue
+        count += len(entries)
+        issues.extend(check_routes(name, entries))
+        tasks.extend((name, i, entries[i:i + CHUNK_SIZE]) for i in range(0, len(entries), CHUNK_SIZE))
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+            results = list(pool.map(_check_chunk, tasks))
+    else:
+        results = [_check_chunk(task) for task in tasks]
+    for chunk in results:
+        issues.extend(chunk)
+
+    issues.sort(key=lambda i: (i.file, -1 if i.index is None else i.index))
+    return count, issues
@@ -11,4 +11,5 @@ TYPE_MAP = {
     "any": object,
 }
 OP_RE = re.compile(r'^(>=|<=|==|!=|>|<)\s*(.+)$')
-SIDE_EFFECT_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
\ No newline at end of file
+SIDE_EFFECT_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+INTERNAL_PATH_PREFIX = "/__mockapi/"
\ No newline at end of file
@@ -8,62 +8,47 @@ import random
 
 from .form_parser import parse_form_to_obj
 from ...utils import logger
+from ...shared.shared_state import call_number
+from ...files.files import file_response
+from ...model.model import GenerateSpec, Mock, ResponseSpec, UnstableSpec
 
 
-def _get_method(mock, method) -> bool:
-    method_value = mock.get("method", "GET")
-
-    if isinstance(method_value, str):
-        return method_value == method
-    elif isinstance(method_value, list):
-        return method in [m for m in method_value]
-    return False
-
-
-def _get_or_generate_response(data: dict, user_response = None, errs: list[str]|None = None) -> dict:
-    if data.get("generate_response"):   
-        response_to_gen: dict = data["generate_response"]
-        locale: str = response_to_gen["locale"]
-        count: int|list[int, int] = response_to_gen["count"]
-        template = response_to_gen.get("response", {})
-        response: list[dict] = []
-
-        if isinstance(count, list):
-            min_count, max_count = count
-            count: int = random.randint(min_count, max_count)
-
-        templates: list[dict[str, Any]]
-        if isinstance(template, dict):
-            templates = [template]
-        elif isinstance(template, list):
-            templates = [t if isinstance(t, dict) else {"value": t} for t in template]
-        else:
-            templates = [{"value": template}]
-
-        for _ in range(count):
-            tpl = templates[0] if len(templates) == 1 else random.choice(templates)
-            item: dict[str, Any] = {}
-            for field_name, tmpl_val in tpl.items():
-                try:
-                    item[field_name] = _generate_fake_data(tmpl_val, locale)
-                except:
-                    item[field_name] = tmpl_val
-            response.append(item)
-        return response
-    else:
-        shuffle_flag = data.get("shuffle")
-        
-        if errs:
-            response = data.get("response", {"errors": errs})
-        response = data.get("response")
-
-        if not response and data.get("fallback_data"):
-            response = user_response
-
-        if shuffle_flag:
-            random.shuffle(response)
-
-        return response
+def _get_method(mock: Mock, method: str) -> bool:
+    return method in mock.methods
+
+
+def _generate_response(spec: GenerateSpec) -> list[dict[str, Any]]:
+    count = spec.count
+    if isinstance(count, tuple):
+        count = random.randint(*count)
+
+    templates = spec.templates
+    response: list[dict[str, Any]] = []
+    for _ in range(count):
+        tpl = templates[0] if len(templates) == 1 else random.choice(templates)
+        item: dict[str, Any] = {}
+        for field_name, tmpl_val in tpl.items():
+            try:
+                item[field_name] = _generate_fake_data(tmpl_val, spec.locale)
+            except:
+                item[field_name] = tmpl_val
+        response.append(item)
+    return response
+
+
+def _get_or_generate_response(spec: ResponseSpec, user_response = None, errs: list[str]|None = None) -> Any:
+    if spec.generate is not None:
+        return _generate_response(spec.generate)
+
+    response = spec.body
+    if not response and spec.fallback_data:
+        response = user_response
+
+    if spec.shuffle and isinstance(response, list):
+        # the mock's own list is shared by all requests: shuffle a copy
+        response = random.sample(response, len(response))
+
+    return response
 
 
 def req_path_generate(path: str|None) -> str:
@@ -81,6 +66,18 @@ def _make_response(data: Any, status: int = 200):
     return HttpResponse(json.dumps(data, ensure_ascii=False), content_type="application/json", status=status)
 
 
+def _spec_response(spec: ResponseSpec, user_response = None, errs: list[str]|None = None, ctx = None) -> HttpResponse:
+    """
+    Answer with `spec`: its `response_file` as is, its template rendered from the request context `ctx`
+    (a MatchContext), otherwise its body serialized as JSON.
+    """
+    if spec.file is not None:
+        return file_response(spec.file, spec.status)
+    if spec.template is not None and ctx is not None:
+        return HttpResponse(spec.template.render(ctx), content_type="application/json", status=spec.status)
+    return _make_response(_get_or_generate_response(spec, user_response, errs), spec.status)
+
+
 def get_request_data(request) -> Any:
     """Return parsed request body: JSON when content-type is application/json else parsed form/files."""
     if request.content_type and "application/json" in request.content_type:
@@ -111,92 +108,63 @@ def _generate_fake_data(field_name: str | list[int, int], locale: str = "en_US")
     return field_name
 
 
-def find_matching_mock(mocks: list[dict[str, Any]], req_path: str, method: str) -> dict[str, Any]|None:
+def find_matching_mock(mocks: list[Mock], req_path: str, method: str) -> Mock|None:
     for m in mocks:
-        try:
-            if m.get("path") == req_path and _get_method(m, method):
-                return m
-        except Exception:
-            logger.exception("Error while checking mock entry, skipping it")
+        if m.path == req_path and method in m.methods:
+            return m
     return None
 
 
-def apply_delay(mock: dict[str, Any]) -> None:
-    delay = mock.get("delay")
+def apply_delay(mock: Mock) -> None:
+    delay = mock.delay
     if delay is None:
         return
+    if delay.kind == "sequence":
+        delay = delay.steps[(call_number(mock, "delay") - 1) % len(delay.steps)]
 
-    if isinstance(delay, (int, float)):
-        if delay < 0:
-            logger.warning("Negative delay ignored: %s", delay)
-            return
-        time.sleep(delay)
-        return
+    if delay.kind == "fixed":
+        time.sleep(delay.low)
+    elif delay.kind == "int_range":
+        time.sleep(random.randint(delay.low, delay.high))
+    elif delay.kind == "float_range":
+        time.sleep(round(random.uniform(delay.low, delay.high), delay.precision))
 
-    if isinstance(delay, list):
-        if len(delay) == 2:
-            a, b = delay
-            if not (isinstance(a, int) and isinstance(b, int)):
-                logger.warning("Expected ints for 2-element delay list, got: %r", delay)
-                return
-            time.sleep(random.randint(a, b))
-            return
-        if len(delay) == 3:
-            a, b, prec = delay
-            if not (isinstance(a, (int, float)) and isinstance(b, (int, float)) and isinstance(prec, int)):
-                logger.warning("Bad types for 3-element delay list, got: %r", delay)
-                return
-            if prec < 0:
-                logger.warning("Negative precision for delay ignored: %r", delay)
-                return
-            value = round(random.uniform(a, b), prec)
-            time.sleep(value)
-            return
-
-    logger.warning("Unsupported delay format: %r", delay)
-
-
-def maybe_handle_unstable(mock: dict[str, Any]) -> HttpResponse|None:
-    unstable = mock.get("unstable")
-    if not unstable:
-        return None
 
-    fail_rate = unstable.get("fail_rate", 0)
-    try:
-        fail_rate = float(fail_rate)
-    except Exception:
-        logger.warning("Invalid fail_rate in unstable: %r, defaulting to 0", unstable.get("fail_rate"))
-        fail_rate = 0.0
+def maybe_handle_unstable(mock: Mock) -> HttpResponse|None:
+    unstable = mock.unstable
+    if unstable is None:
+        return None
 
-    if not (0.0 <= fail_rate <= 1.0):
-        logger.warning("fail_rate out of range [0,1]: %r, clamping", fail_rate)
-        fail_rate = max(0.0, min(1.0, fail_rate))
+    if unstable.fail_every is not None:
+        if unstable.fail_every > 0 and call_number(mock, "unstable") % unstable.fail_every == 0:
+            return _unstable_response(unstable)
+        return None
 
-    rnd = random.random()
-    if rnd < fail_rate:
-        status = unstable.get("status", 400)
-        try:
-            return _make_response(_get_or_generate_response(unstable), status)
-        except Exception:
-            logger.exception("Error while generating unstable response")
-            return HttpResponseServerError(
-                json.dumps({"error": "failed to generate unstable response"}, ensure_ascii=False),
-                content_type="application/json",
-            )
+    if random.random() < unstable.fail_rate:
+        return _unstable_response(unstable)
     return None
 
 
-def on_fail_response(mock: dict[str, Any], errs: Any, data) -> HttpResponse:
-    of = mock.get("on_fail")
-    if not of:
+def _unstable_response(unstable: UnstableSpec) -> HttpResponse:
+    try:
+        return _spec_response(unstable.response)
+    except Exception:
+        logger.exception("Error while generating unstable response")
+        return HttpResponseServerError(
+            json.dumps({"error": "failed to generate unstable response"}, ensure_ascii=False),
+            content_type="application/json",
+        )
+
+
+def on_fail_response(mock: Mock, errs: Any, data, ctx = None) -> HttpResponse:
+    of = mock.on_fail
+    if of is None:
         return HttpResponseBadRequest(
             json.dumps({"errors": errs}, ensure_ascii=False),
             content_type="application/json",
         )
     try:
-        payload = _get_or_generate_response(data=of, errs=errs, user_response=data)
-        status = of.get("status", 400)
-        return _make_response(payload, status)
+        return _spec_response(of, errs=errs, user_response=data, ctx=ctx)
     except Exception:
         logger.exception("Error while generating on_fail response")
         return HttpResponseServerError(
@@ -205,30 +173,30 @@ def on_fail_response(mock: dict[str, Any], errs: Any, data) -> HttpResponse:
         )
     
 
-def on_pass_response(mock: dict[str, Any], data) -> HttpResponse:
-    op = mock.get("on_pass")
-    if op:
+def on_pass_response(mock: Mock, data, ctx = None) -> HttpResponse:
+    op = mock.on_pass
+    if op is not None:
         try:
-            payload = _get_or_generate_response(op, user_response=data)
-            status = op.get("status", mock.get("status", 200))
-            return _make_response(payload, status)
+            return _spec_response(op, user_response=data, ctx=ctx)
         except Exception:
             logger.exception("Error while generating on_pass response")
             return HttpResponseServerError(
                 json.dumps({"error": "failed to generate on_pass response"}, ensure_ascii=False),
                 content_type="application/json",
             )
-    return default_mock_response(mock, data)
+    return default_mock_response(mock, data, ctx)
 
 
-def default_mock_response(mock: dict[str, Any], data = None) -> HttpResponse:
+def default_mock_response(mock: Mock, data = None, ctx = None) -> HttpResponse:
     try:
-        payload = _get_or_generate_response(mock, user_response=data)
-        status = mock.get("status", 200)
-        return _make_response(payload, status)
+        source = mock.response
+        if mock.sequence:
+            # responses are served in turn, shared by all workers
+            source = mock.sequence[(call_number(mock, "sequence") - 1) % len(mock.sequence)]
+        return _spec_response(source, user_response=data, ctx=ctx)
     except Exception:
         logger.exception("Error while generating default mock response")
         return HttpResponseServerError(
             json.dumps({"error": "failed to generate response"}, ensure_ascii=False),
             content_type="application/json",
-        )
\ No newline at end of file
+        )
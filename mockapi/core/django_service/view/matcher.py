@@ -0,0 +1,187 @@
+from typing import Any, Callable
+
+from .constants import OP_RE
+from .validator import ConditionEvaluator, _get_by_dotted, _safe_parse
+from ...utils import logger
+from ...model.model import Mock
+
+
+MATCH_SOURCES = ("query", "headers", "body")
+_NON_EQUALITY_PREFIXES = ("regex:", "in ", "not_in ", "min_length", "max_length", "between")
+_MISSING = object()
+_evaluator = ConditionEvaluator()
+
+
+class MatchContext:
+    """
+    Lazy access to the parts of a request that `match` conditions and response templates can look at.
+    `params` are the path parameters, set once a mock with a `{name}` path was found.
+    """
+
+    def __init__(self, query=None, headers=None, body_loader: Callable[[], Any] | None = None,
+                 params: dict[str, str] | None = None):
+        self.query = query if query is not None else {}
+        self.headers = headers if headers is not None else {}
+        self.params = params if params is not None else {}
+        self._body_loader = body_loader
+        self._body = _MISSING
+
+    @property
+    def body(self) -> Any:
+        if self._body is _MISSING:
+            try:
+                self._body = self._body_loader() if self._body_loader else None
+            except Exception:
+                self._body = None
+        return self._body
+
+    def value(self, source: str, key: str) -> Any:
+        """Value of `key` in `source`; query and header strings are parsed like condition literals."""
+        if source == "body":
+            found, val = _get_by_dotted(self.body, key)
+            return val if found else _MISSING
+        container = self.query if source == "query" else self.headers
+        val = container.get(key)
+        if val is None:
+            return _MISSING
+        return _safe_parse(val) if isinstance(val, str) else val
+
+
+def _dispatch_key(value: Any) -> Any:
+    """Hash key of a value; bools are kept apart from the ints they hash and compare equal to."""
+    return (bool, value) if isinstance(value, bool) else value
+
+
+def _equality_value(cond: Any) -> tuple[bool, Any]:
+    """Return (True, value) if `cond` is a plain equality test that can be dispatched through a hash table."""
+    if isinstance(cond, dict):
+        if str(cond.get("op", "")).lower() != "==":
+            return False, None
+        value = cond.get("value")
+    elif isinstance(cond, str):
+        s = cond.strip()
+        if s.startswith(_NON_EQUALITY_PREFIXES):
+            return False, None
+        m = OP_RE.match(s)
+        if m and m.group(1) != "==":
+            return False, None
+        value = _safe_parse(m.group(2) if m else s)
+    else:
+        value = cond
+    try:
+        hash(value)
+    except TypeError:
+        return False, None
+    return True, _dispatch_key(value)
+
+
+def _conditions(mock: Mock) -> dict[tuple[str, str], Any]:
+    """Flatten a mock's `match` block into {(source, key): condition}."""
+    out: dict[tuple[str, str], Any] = {}
+    match = mock.match or {}
+    for source in MATCH_SOURCES:
+        for key, cond in (match.get(source) or {}).items():
+            if not isinstance(cond, (str, dict)):
+                cond = {"op": "==", "value": cond}
+            out[(source, key)] = cond
+    return out
+
+
+class _Candidate:
+    __slots__ = ("order", "mock", "conditions")
+
+    def __init__(self, order: int, mock: Mock, conditions: dict[tuple[str, str], Any]):
+        self.order = order
+        self.mock = mock
+        self.conditions = conditions
+
+    def without(self, attr: tuple[str, str]) -> "_Candidate":
+        return _Candidate(self.order, self.mock, {a: c for a, c in self.conditions.items() if a != attr})
+
+
+class _Leaf:
+    """Candidates checked in file order: method first, then their remaining conditions."""
+    __slots__ = ("candidates",)
+
+    def __init__(self, candidates: list[_Candidate]):
+        self.candidates = sorted(candidates, key=lambda c: c.order)
+
+    def select(self, method: str, ctx: MatchContext, method_check) -> Mock | None:
+        for c in self.candidates:
+            try:
+                if not method_check(c.mock, method):
+                    continue
+                if all(_check(ctx, attr, cond) for attr, cond in c.conditions.items()):
+                    return c.mock
+            except Exception:
+                logger.exception("Error while checking mock entry, skipping it")
+        return None
+
+
+class _Node:
+    """Hash dispatch on one attribute; candidates that don't test it for equality are in every branch."""
+    __slots__ = ("attr", "branches", "default")
+
+    def __init__(self, attr: tuple[str, str], branches: dict[Any, "_Node | _Leaf"], default: "_Node | _Leaf"):
+        self.attr = attr
+        self.branches = branches
+        self.default = default
+
+    def select(self, method: str, ctx: MatchContext, method_check) -> Mock | None:
+        value = ctx.value(*self.attr)
+        child = self.default
+        if value is not _MISSING:
+            try:
+                child = self.branches.get(_dispatch_key(value), self.default)
+            except TypeError:
+                pass
+        return child.select(method, ctx, method_check)
+
+
+def _check(ctx: MatchContext, attr: tuple[str, str], cond: Any) -> bool:
+    value = ctx.value(*attr)
+    if value is _MISSING:
+        return False
+    ok, _ = _evaluator.evaluate(value, cond)
+    return ok
+
+
+def _build(candidates: list[_Candidate], depth: int = 0) -> "_Node | _Leaf":
+    """
+    Split on the attribute with an equality test in the most candidates (the most discriminating one),
+    recursing until no attribute is shared by at least two candidates.
+    """
+    counts: dict[tuple[str, str], int] = {}
+    for c in candidates:
+        for attr, cond in c.conditions.items():
+            if _equality_value(cond)[0]:
+                counts[attr] = counts.get(attr, 0) + 1
+    if not counts or depth >= 8:
+        return _Leaf(candidates)
+    attr, count = max(counts.items(), key=lambda kv: kv[1])
+    if count < 2:
+        return _Leaf(candidates)
+
+    groups: dict[Any, list[_Candidate]] = {}
+    others: list[_Candidate] = []
+    for c in candidates:
+        is_eq, value = _equality_value(c.conditions[attr]) if attr in c.conditions else (False, None)
+        if is_eq:
+            groups.setdefault(value, []).append(c.without(attr))
+        else:
+            others.append(c)
+
+    branches = {value: _build(group + others, depth + 1) for value, group in groups.items()}
+    return _Node(attr, branches, _build(others, depth + 1))
+
+
+class MatchTree:
+    """Compiled selection among all mocks registered for one path."""
+    __slots__ = ("root",)
+
+    def __init__(self, mocks: list[Mock]):
+        candidates = [_Candidate(i, m, _conditions(m)) for i, m in enumerate(mocks)]
+        self.root = _build(candidates)
+
+    def select(self, method: str, ctx: MatchContext, method_check) -> Mock | None:
+        return self.root.select(method, ctx, method_check)
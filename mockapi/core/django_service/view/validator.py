@@ -1,8 +1,9 @@
-from typing import Any
+from typing import Any, Iterable
 import json
 import re
 
 from .constants import TYPE_MAP, OP_RE
+from ...model.model import Rule
 
 
 def _get_by_dotted(obj: Any, dotted: str) -> tuple[bool, Any]:
@@ -46,6 +47,11 @@ def _matches_type(val: Any, expected: str) -> bool:
     return isinstance(val, t)
 
 
+def _same_kind(a: Any, b: Any) -> bool:
+    """True unless one side is a bool and the other isn't: `true` does not equal 1, nor `false` 0."""
+    return isinstance(a, bool) == isinstance(b, bool)
+
+
 def _safe_parse(s: str) -> Any:
     """Try json.loads, then int, then float, otherwise return raw string."""
     try:
@@ -146,9 +152,9 @@ class ConditionEvaluator:
     def _handle_comparison(self, val: Any, op: str, cmp: Any) -> tuple[bool, str]:
         left, right = val, cmp
         if op == "==":
-            ok = left == right
+            ok = left == right and _same_kind(left, right)
         elif op == "!=":
-            ok = left != right
+            ok = left != right or not _same_kind(left, right)
         elif op == ">":
             ok = left > right
         elif op == ">=":
@@ -188,21 +194,61 @@ class ConditionEvaluator:
         return ok, "" if ok else f"len {len(val)} > {max_len}"
 
 
+KNOWN_OPS = (">", ">=", "<", "<=", "==", "!=", "in", "not_in", "regex", "min_length", "max_length")
+
+
+def condition_problem(cond: Any) -> str | None:
+    """Why ConditionEvaluator can't evaluate `cond`, or None if its syntax is fine."""
+    if cond is None:
+        return None
+    if isinstance(cond, dict):
+        op = str(cond.get("op", "")).lower()
+        if op not in KNOWN_OPS:
+            return f"unknown op {op!r}"
+        if op == "regex":
+            return _regex_problem(cond.get("value"))
+        return None
+
+    s = str(cond).strip()
+    if s.startswith("regex:"):
+        return _regex_problem(s[len("regex:"):])
+    if s.startswith(("min_length", "max_length")):
+        return None if re.sub(r"\D", "", s) else f"missing length in {s!r}"
+    if s.startswith("between"):
+        parts = s.split()
+        if len(parts) != 3:
+            return f"invalid between format: {s}"
+        try:
+            float(parts[1]), float(parts[2])
+        except ValueError:
+            return f"invalid numbers in between: {s}"
+    return None
+
+
+def _regex_problem(pattern: Any) -> str | None:
+    try:
+        re.compile(str(pattern))
+    except re.error as e:
+        return f"invalid regex {pattern!r}: {e}"
+    return None
+
+
 def _eval_condition(val: Any, cond) -> tuple[bool, str]:
     return ConditionEvaluator().evaluate(val, cond)
 
 
-def validate(target: Any, rules: list[dict]) -> list[str]:
+def validate(target: Any, rules: Iterable[Rule | dict]) -> list[str]:
     """
-    Validate `target` (dict or list) against list of rule dicts.
+    Validate `target` (dict or list) against list of rules (Rule objects or rule dicts).
     Each rule: { name: 'a.b', type: 'int', if: condition, ... }
     Returns list of error messages.
     """
     errs: list[str] = []
+    rules = [r if isinstance(r, Rule) else Rule.from_dict(r) for r in rules or ()]
     targets = [(f"[{i}]", it) for i, it in enumerate(target)] if isinstance(target, list) else [("", target)]
     for pref, targ in targets:
-        for r in (rules or []):
-            name = r.get("name")
+        for r in rules:
+            name = r.name
             if not name:
                 errs.append(f"{pref}: rule without name")
                 continue
@@ -210,11 +256,11 @@ def validate(target: Any, rules: list[dict]) -> list[str]:
             if not ok:
                 errs.append(f"{pref}.{name}: missing")
                 continue
-            if not _matches_type(val, r.get("type", "any")):
-                errs.append(f"{pref}.{name}: type {r.get('type')} != {type(val).__name__}")
+            if not _matches_type(val, r.type):
+                errs.append(f"{pref}.{name}: type {r.type} != {type(val).__name__}")
                 continue
-            if "if" in r:
-                ok2, msg = _eval_condition(val, r["if"])
+            if r.has_cond:
+                ok2, msg = _eval_condition(val, r.cond)
                 if not ok2:
                     errs.append(f"{pref}.{name}: {msg}")
     return errs
\ No newline at end of file
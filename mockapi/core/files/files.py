@@ -0,0 +1,165 @@
+import mmap
+import os
+import re
+import threading
+import weakref
+from typing import BinaryIO, Iterator
+
+from django.http import FileResponse, HttpRequest, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+from ..model.model import FileSpec
+
+
+CHUNK_SIZE = 64 * 1024
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class MockFileResponse(FileResponse):
+    """FileResponse for a `response_file`, with the stat of the open file (validators and ranges are derived from it)."""
+
+    def __init__(self, spec: FileSpec, status: int):
+        self.path = spec.resolved
+        f = open(self.path, "rb")
+        self.stat = os.fstat(f.fileno())
+        super().__init__(f, status=status, content_type=spec.content_type)
+        self.spec = spec
+        self["ETag"] = etag(self.stat)
+        self["Last-Modified"] = http_date(self.stat.st_mtime)
+        self["Accept-Ranges"] = "bytes"
+
+
+def etag(stat: os.stat_result) -> str:
+    """Strong validator of one version of a file: changes with its mtime or size."""
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def file_response(spec: FileSpec, status: int) -> MockFileResponse:
+    """The whole file, streamed by the server (sendfile where the WSGI server supports it). See serve_file."""
+    return MockFileResponse(spec, status)
+
+
+# ---------- Memory maps ----------
+class _MapCache:
+    """
+    One read-only map per file version, shared by all requests for it: bodies are sliced from
+    the page cache instead of being read into buffers. Maps belong to the FileSpec of a mock and
+    are dropped with it, when no snapshot uses the mock any more. A map is replaced when the file
+    changes; the old one is unmapped right away, or once the last body using it is done.
+    """
+
+    def __init__(self):
+        self._maps: weakref.WeakKeyDictionary[FileSpec, tuple[tuple[int, int, int], mmap.mmap]] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self, spec: FileSpec, f: BinaryIO, stat: os.stat_result) -> mmap.mmap:
+        """Map of the version of the file open as `f` (mapping the open file, not the path, so both agree)."""
+        version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        entry = self._maps.get(spec)
+        if entry is None or entry[0] != version:
+            with self._lock:
+                entry = self._maps.get(spec)
+                if entry is None or entry[0] != version:
+                    old, entry = entry, (version, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+                    self._maps[spec] = entry
+                    if old is not None:
+                        _unmap(old[1])
+        return entry[1]
+
+    def __len__(self) -> int:
+        return len(self._maps)
+
+
+def _unmap(mapped: mmap.mmap) -> None:
+    try:
+        mapped.close()
+    except BufferError:  # a body is still being sent from it: unmapped when that body is done
+        pass
+
+
+maps = _MapCache()
+
+
+def _mapped_body(mapped: mmap.mmap, start: int, end: int) -> Iterator[memoryview]:
+    view = memoryview(mapped)
+    try:
+        for pos in range(start, end, CHUNK_SIZE):
+            yield view[pos:min(pos + CHUNK_SIZE, end)]
+    finally:
+        view.release()
+
+
+# ---------- Requests ----------
+def parse_range(header: str, size: int) -> tuple[int, int] | None | bool:
+    """
+    (start, end) of a single `bytes=` range, end excluded; False if it can't be satisfied;
+    None if the header should be ignored (malformed or several ranges: the whole file is sent).
+    """
+    m = _RANGE.match(header.strip())
+    if m is None or m.group(1) == m.group(2) == "":
+        return None
+    first, last = m.group(1), m.group(2)
+    if first == "":
+        length = int(last)
+        return (max(size - length, 0), size) if length and size else False
+    start = int(first)
+    end = min(int(last) + 1, size) if last else size
+    if last and int(last) < start:
+        return None
+    return (start, end) if start < size else False
+
+
+def _range_applies(request: HttpRequest, response: MockFileResponse) -> bool:
+    """If-Range: the range is only for the version the client already has part of."""
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        return if_range == response["ETag"]
+    date = parse_http_date_safe(if_range)
+    return date is not None and int(response.stat.st_mtime) <= date
+
+
+def _mapped(response: MockFileResponse, status: int, start: int, end: int) -> StreamingHttpResponse:
+    """Bytes [start, end) of the file from its memory map, with the headers of `response` (which is closed)."""
+    mapped = maps.get(response.spec, response.file_to_stream, response.stat)
+    body = StreamingHttpResponse(_mapped_body(mapped, start, end), status=status)
+    for header, value in response.items():
+        body[header] = value
+    body["Content-Length"] = str(end - start)
+    response.close()
+    return body
+
+
+def serve_file(request: HttpRequest, response: MockFileResponse) -> HttpResponse:
+    """
+    Adapt a response_file answer to `request`: 304/412 from the conditional headers, 206/416
+    for a Range, and a memory-mapped body when the server has no wsgi.file_wrapper to send
+    the file itself (ASGI). Only 200 answers are adapted.
+    """
+    if response.status_code != 200:
+        return response
+    stat = response.stat
+    conditional = get_conditional_response(request, etag=response["ETag"], last_modified=int(stat.st_mtime), response=response)
+    if conditional is not response:
+        response.close()
+        return conditional
+
+    size = stat.st_size
+    header = request.META.get("HTTP_RANGE")
+    if header and request.method in ("GET", "HEAD") and _range_applies(request, response):
+        span = parse_range(header, size)
+        if span is False:
+            response.close()
+            refused = HttpResponse(status=416)
+            refused["Content-Range"] = f"bytes */{size}"
+            return refused
+        if span is not None:
+            partial = _mapped(response, 206, span[0], span[1])
+            partial["Content-Range"] = f"bytes {span[0]}-{span[1] - 1}/{size}"
+            return partial
+
+    if "wsgi.file_wrapper" not in request.META and size:
+        return _mapped(response, 200, 0, size)
+    return response
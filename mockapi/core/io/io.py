@@ -1,5 +1,6 @@
 import json
 import os
+import tempfile
 from pathlib import Path
 
 from .constants import MOCKS_FILE_PATH, SETTINGS_FILE_PATH, MOCKS_FILE_EXAMPLE_PATH, SETTINGS_FILE_EXAMPLE_PATH
@@ -18,11 +19,16 @@ def _read_json(path: Path, fallback: Path):
             return None
 
 
-def load_mocks() -> list[dict]:
+def mocks_file_path() -> Path:
+    """Returns the mocks file in use: $MOCKS_FILE, the local mocks.json or the bundled example."""
     env_path = os.environ.get("MOCKS_FILE")
-    path = Path(env_path) if env_path and Path(env_path).exists() else (
+    return Path(env_path) if env_path and Path(env_path).exists() else (
         MOCKS_FILE_PATH if MOCKS_FILE_PATH.exists() else MOCKS_FILE_EXAMPLE_PATH
     )
+
+
+def load_mocks(path: Path | None = None) -> list[dict]:
+    path = path or mocks_file_path()
     data = _read_json(path, MOCKS_FILE_EXAMPLE_PATH) or []
     return data if isinstance(data, list) else [data]
 
@@ -30,4 +36,22 @@ def load_mocks() -> list[dict]:
 def load_settings() -> dict:
     path = SETTINGS_FILE_PATH if SETTINGS_FILE_PATH.exists() else SETTINGS_FILE_EXAMPLE_PATH
     data = _read_json(path, SETTINGS_FILE_EXAMPLE_PATH) or {}
-    return data if isinstance(data, dict) else {}
\ No newline at end of file
+    return data if isinstance(data, dict) else {}
+
+
+def write_json_atomic(path: Path, data) -> None:
+    """Write JSON to a temporary file next to `path` and atomically replace it."""
+    path = Path(path)
+    fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
\ No newline at end of file
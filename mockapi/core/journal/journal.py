@@ -0,0 +1,148 @@
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+
+from ..utils import logger
+
+
+FIELDS = ("ts", "method", "path", "query", "headers", "body", "mock", "status", "latency_ms")
+WRITE_BATCH = 512
+# records waiting for the log file; further ones are dropped (and counted) while the disk can't keep up
+MAX_PENDING = 10_000
+# credentials are not kept, in memory or on disk
+REDACTED_HEADERS = frozenset({"authorization", "cookie", "proxy-authorization"})
+REDACTED = "[redacted]"
+
+
+class RequestJournal:
+    """
+    Opt-in record of served requests.
+    Recording appends a tuple to a bounded ring buffer (for queries) and, if a log file is
+    configured, to a queue drained by a background thread that writes NDJSON in batches
+    and rotates the file by size. Nothing is serialized on the request thread.
+    The queue holds at most `max_pending` records: when it is full new ones are not written,
+    only counted in `dropped`. Headers in REDACTED_HEADERS are recorded as REDACTED.
+    """
+
+    def __init__(self, capacity: int = 1000, log_file: str | Path | None = None,
+                 max_bytes: int = 10 * 1024 * 1024, backups: int = 3, max_pending: int = MAX_PENDING):
+        self._ring: deque[tuple] = deque(maxlen=max(capacity, 1))
+        self.log_file = Path(log_file) if log_file else None
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._pending: queue.Queue[tuple] = queue.Queue(maxsize=max(max_pending, 1))
+        self.dropped = 0
+        self._dropped_logged = 0
+        self._writer: threading.Thread | None = None
+        self._writer_lock = threading.Lock()
+
+    def record(self, method: str, path: str, query: dict, headers: dict, body: Any,
+               mock: str | None, status: int, latency_ns: int) -> None:
+        headers = {k: REDACTED if k.lower() in REDACTED_HEADERS else v for k, v in headers.items()}
+        entry = (time.time(), method, path, query, headers, body, mock, status, latency_ns / 1_000_000)
+        self._ring.append(entry)
+        if self.log_file is not None:
+            try:
+                self._pending.put_nowait(entry)
+            except queue.Full:
+                self.dropped += 1
+            if self._writer is None:
+                self._start_writer()
+
+    def query(self, path: str | None = None, method: str | None = None, mock: str | None = None,
+              since: float | None = None, until: float | None = None, limit: int = 100) -> list[dict[str, Any]]:
+        """Return the most recent matching records (oldest first), at most `limit` of them."""
+        out = []
+        if limit <= 0:
+            return out
+        for entry in reversed(list(self._ring)):
+            ts = entry[0]
+            if until is not None and ts > until:
+                continue
+            if since is not None and ts < since:
+                break
+            if path is not None and entry[2] != path:
+                continue
+            if method is not None and entry[1] != method:
+                continue
+            if mock is not None and entry[6] != mock:
+                continue
+            out.append(dict(zip(FIELDS, entry)))
+            if len(out) >= limit:
+                break
+        out.reverse()
+        return out
+
+    def clear(self) -> None:
+        self._ring.clear()
+
+    # ---------- Background writer ----------
+    def _start_writer(self) -> None:
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="mockapi-journal", daemon=True)
+                self._writer.start()
+
+    def _write_loop(self) -> None:
+        while True:
+            batch = [self._pending.get()]
+            try:
+                while len(batch) < WRITE_BATCH:
+                    batch.append(self._pending.get_nowait())
+            except queue.Empty:
+                pass
+            try:
+                self._write(batch)
+            except Exception:
+                logger.exception("Failed to write request journal to %s", self.log_file)
+            dropped = self.dropped
+            if dropped != self._dropped_logged:
+                logger.warning("Request journal is behind, %d records not written to %s",
+                               dropped - self._dropped_logged, self.log_file)
+                self._dropped_logged = dropped
+
+    def _write(self, batch: list[tuple]) -> None:
+        lines = "".join(json.dumps(dict(zip(FIELDS, e)), ensure_ascii=False, default=str) + "\n" for e in batch)
+        self.log_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.log_file, "a", encoding="utf-8") as f:
+            f.write(lines)
+            size = f.tell()
+        if self.max_bytes and size >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        """journal.log -> journal.log.1 -> ... -> journal.log.<backups> (the oldest is dropped)."""
+        if self.backups <= 0:
+            self.log_file.unlink(missing_ok=True)
+            return
+        for i in range(self.backups - 1, 0, -1):
+            src = self.log_file.with_name(f"{self.log_file.name}.{i}")
+            if src.exists():
+                os.replace(src, self.log_file.with_name(f"{self.log_file.name}.{i + 1}"))
+        os.replace(self.log_file, self.log_file.with_name(f"{self.log_file.name}.1"))
+
+
+_journal: RequestJournal | None = None
+_journal_lock = threading.Lock()
+
+
+def get_journal() -> RequestJournal:
+    """Return the process-wide journal, created from the Django settings on first use."""
+    global _journal
+    if _journal is None:
+        with _journal_lock:
+            if _journal is None:
+                _journal = RequestJournal(
+                    capacity=getattr(settings, "MOCKAPI_JOURNAL_SIZE", 1000),
+                    log_file=getattr(settings, "MOCKAPI_JOURNAL_FILE", None),
+                    max_bytes=getattr(settings, "MOCKAPI_JOURNAL_MAX_BYTES", 10 * 1024 * 1024),
+                    backups=getattr(settings, "MOCKAPI_JOURNAL_BACKUPS", 3),
+                )
+    return _journal
@@ -0,0 +1,164 @@
+import threading
+import weakref
+from bisect import bisect_left
+
+
+# Upper bounds of the latency histogram buckets, in seconds (+Inf is implicit).
+LATENCY_BUCKETS: tuple[float, ...] = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_BUCKETS_NS: tuple[int, ...] = tuple(int(b * 1_000_000_000) for b in LATENCY_BUCKETS)
+UNMATCHED = ("", "")
+
+
+class _Series:
+    """Counters of a single (path, method) pair, or (path, method, source) for responses not served by a mock; owned by exactly one thread."""
+    __slots__ = ("requests", "statuses", "unstable", "validation_failures", "buckets", "sum_ns")
+
+    def __init__(self):
+        self.requests = 0
+        self.statuses: dict[int, int] = {}
+        self.unstable = 0
+        self.validation_failures = 0
+        self.buckets = [0] * (len(_BUCKETS_NS) + 1)
+        self.sum_ns = 0
+
+
+def _merge(total: dict[tuple[str, ...], _Series], shard: dict[tuple[str, ...], _Series]) -> None:
+    """Add the series of `shard` to `total`."""
+    for key, s in list(shard.items()):
+        t = total.get(key)
+        if t is None:
+            t = total[key] = _Series()
+        t.requests += s.requests
+        for status, count in list(s.statuses.items()):
+            t.statuses[status] = t.statuses.get(status, 0) + count
+        t.unstable += s.unstable
+        t.validation_failures += s.validation_failures
+        for i, count in enumerate(s.buckets):
+            t.buckets[i] += count
+        t.sum_ns += s.sum_ns
+
+
+class _Owner:
+    """Thread-local token of a shard: it dies with its thread, which retires the shard."""
+    __slots__ = ("shard", "__weakref__")
+
+    def __init__(self, shard: dict):
+        self.shard = shard
+
+
+class MetricsRegistry:
+    """
+    Per-thread metric shards aggregated at scrape time.
+    A request only ever touches the shard of its own thread, so recording needs no lock;
+    the lock is taken once per thread (shard registration), when the thread exits (its shard
+    is folded into the retired totals, so short-lived threads don't pile up) and on scrape.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: dict[int, dict[tuple[str, ...], _Series]] = {}
+        self._retired: dict[tuple[str, ...], _Series] = {}
+        self._lock = threading.Lock()
+
+    def _series(self, path: str, method: str, source: str = "") -> _Series:
+        try:
+            shard = self._local.owner.shard
+        except AttributeError:
+            shard = {}
+            owner = self._local.owner = _Owner(shard)
+            with self._lock:
+                self._shards[id(shard)] = shard
+            weakref.finalize(owner, self._retire, shard)
+        key = (path, method, source) if source else (path, method)
+        series = shard.get(key)
+        if series is None:
+            series = shard[key] = _Series()
+        return series
+
+    def _retire(self, shard: dict[tuple[str, ...], _Series]) -> None:
+        """Fold the shard of a finished thread into the retired totals."""
+        with self._lock:
+            if self._shards.pop(id(shard), None) is not None:
+                _merge(self._retired, shard)
+
+    def observe(self, path: str, method: str, status: int, duration_ns: int,
+                unstable: bool = False, validation_failed: bool = False, source: str = "") -> None:
+        """Record one finished request; `source` labels responses that no mock served (such as "replay") as `mock`."""
+        s = self._series(path, method, source)
+        s.requests += 1
+        s.statuses[status] = s.statuses.get(status, 0) + 1
+        s.buckets[bisect_left(_BUCKETS_NS, duration_ns)] += 1
+        s.sum_ns += duration_ns
+        if unstable:
+            s.unstable += 1
+        if validation_failed:
+            s.validation_failures += 1
+
+    def observe_unmatched(self) -> None:
+        self._series(*UNMATCHED).requests += 1
+
+    def collect(self) -> dict[tuple[str, ...], _Series]:
+        """Sum the retired totals and all live thread shards into a fresh set of series."""
+        total: dict[tuple[str, ...], _Series] = {}
+        with self._lock:
+            _merge(total, self._retired)
+            shards = list(self._shards.values())
+        for shard in shards:
+            _merge(total, shard)
+        return total
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        series = self.collect()
+        unmatched = series.pop(UNMATCHED, None)
+        keys = sorted(series)
+        lines: list[str] = []
+
+        def family(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        family("mockapi_requests_total", "counter", "Requests served per mock.")
+        for key in keys:
+            lines.append(f"mockapi_requests_total{{{_labels(*key)}}} {series[key].requests}")
+
+        family("mockapi_responses_total", "counter", "Responses per mock and status code.")
+        for key in keys:
+            for status in sorted(series[key].statuses):
+                lines.append(f'mockapi_responses_total{{{_labels(*key)},status="{status}"}} {series[key].statuses[status]}')
+
+        family("mockapi_unstable_failures_total", "counter", "Failures injected by the unstable option.")
+        for key in keys:
+            lines.append(f"mockapi_unstable_failures_total{{{_labels(*key)}}} {series[key].unstable}")
+
+        family("mockapi_validation_failures_total", "counter", "Requests rejected by data validation.")
+        for key in keys:
+            lines.append(f"mockapi_validation_failures_total{{{_labels(*key)}}} {series[key].validation_failures}")
+
+        family("mockapi_request_duration_seconds", "histogram", "Time spent handling a request.")
+        for key in keys:
+            s, labels = series[key], _labels(*key)
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + (None,), s.buckets):
+                cumulative += count
+                le = "+Inf" if bound is None else repr(bound)
+                lines.append(f'mockapi_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"mockapi_request_duration_seconds_sum{{{labels}}} {s.sum_ns / 1_000_000_000}")
+            lines.append(f"mockapi_request_duration_seconds_count{{{labels}}} {cumulative}")
+
+        family("mockapi_unmatched_requests_total", "counter", "Requests for which no mock was defined.")
+        lines.append(f"mockapi_unmatched_requests_total {unmatched.requests if unmatched else 0}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(path: str, method: str, source: str = "") -> str:
+    labels = f'path="{_escape(path)}",method="{_escape(method)}"'
+    return f'{labels},mock="{_escape(source)}"' if source else labels
+
+
+registry = MetricsRegistry()
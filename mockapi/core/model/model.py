@@ -0,0 +1,523 @@
+import hashlib
+import json
+import os
+import re
+from typing import Any, Iterable
+
+from ..utils import logger
+from ..template.template import compile_template
+
+
+DEFAULT_METHOD = "GET"
+# values equal between mocks are shared; each cache stops growing at _INTERN_LIMIT entries
+_INTERN_LIMIT = 1024
+_METHOD_SETS: dict[tuple[str, ...], frozenset[str]] = {}
+_LAYOUTS: dict[tuple[tuple[str, bool], ...], tuple[tuple[str, bool], ...]] = {}
+
+
+_set = object.__setattr__
+_RULES: dict[tuple, "Rule"] = {}
+_PARAM_RE = re.compile(r"\{([A-Za-z_]\w*)\}")
+
+
+class _Frozen:
+    """Base of the model classes: slotted, and read-only once built."""
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{n}={getattr(self, n)!r}" for n in self.__slots__ if not n.startswith("_"))
+        return f"{type(self).__name__}({fields})"
+
+
+def _intern(cache: dict, key: Any, value: Any) -> Any:
+    """The value already cached for `key`, else `value`, cached while the cache has room."""
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    return cache.setdefault(key, value) if len(cache) < _INTERN_LIMIT else value
+
+
+def _methods(value: Any) -> frozenset[str]:
+    """`method` as a frozenset; equal sets are shared between mocks."""
+    if isinstance(value, str):
+        key = (value,)
+    elif isinstance(value, list):
+        key = tuple(sorted({m for m in value if isinstance(m, str)}))
+    else:
+        key = ()
+    methods = _METHOD_SETS.get(key)
+    return methods if methods is not None else _intern(_METHOD_SETS, key, frozenset(key))
+
+
+def compact_json(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+class GenerateSpec(_Frozen):
+    """`generate_response` block: `count` items built from the templates with Faker."""
+    __slots__ = ("locale", "count", "templates")
+
+    def __init__(self, locale: str, count: int | tuple[int, int], templates: tuple[dict[str, Any], ...]):
+        _set(self, "locale", locale)
+        _set(self, "count", count)
+        _set(self, "templates", templates)
+
+    @classmethod
+    def from_dict(cls, data: Any) -> "GenerateSpec":
+        if not isinstance(data, dict):
+            raise ValueError("generate_response must be an object")
+        if "locale" not in data or "count" not in data:
+            raise ValueError("generate_response needs locale and count")
+        count = data["count"]
+        if isinstance(count, list):
+            if len(count) != 2 or not all(isinstance(c, int) for c in count):
+                raise ValueError(f"generate_response count must be an int or [min, max], got {count!r}")
+            count = (count[0], count[1])
+        elif not isinstance(count, int):
+            raise ValueError(f"generate_response count must be an int or [min, max], got {count!r}")
+
+        template = data.get("response", {})
+        if isinstance(template, dict):
+            templates = (template,)
+        elif isinstance(template, list):
+            templates = tuple(t if isinstance(t, dict) else {"value": t} for t in template)
+        else:
+            templates = ({"value": template},)
+        return cls(data["locale"], count, templates)
+
+
+class FileSpec(_Frozen):
+    """
+    `response_file`: a file sent as the body as is, with `content_type`, or one guessed from the file name when None.
+    `path` is as written; `resolved` is where the file is: relative paths are from `base_dir`,
+    the directory of the mocks file the mock was loaded from.
+    """
+    __slots__ = ("path", "resolved", "content_type", "__weakref__")
+
+    def __init__(self, path: str, content_type: str | None = None, base_dir: str = ""):
+        _set(self, "path", path)
+        _set(self, "resolved", os.path.join(base_dir, path))
+        _set(self, "content_type", content_type)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any], base_dir: str = "") -> "FileSpec":
+        path, content_type = data.get("response_file"), data.get("content_type")
+        if not isinstance(path, str) or not path:
+            raise ValueError(f"response_file must be a file path, got {path!r}")
+        if content_type is not None and not isinstance(content_type, str):
+            raise ValueError(f"content_type must be a string, got {content_type!r}")
+        return cls(path, content_type, base_dir)
+
+
+class ResponseSpec(_Frozen):
+    """
+    What to answer with: a static `response`, a `generate_response` or a `response_file`, plus a status.
+    A static `response` with {{...}} placeholders also gets its compiled `template`.
+    """
+    __slots__ = ("body", "status", "generate", "shuffle", "fallback_data", "file", "template")
+
+    def __init__(self, body: Any = None, status: int = 200, generate: GenerateSpec | None = None,
+                 shuffle: bool = False, fallback_data: bool = False, file: FileSpec | None = None):
+        _set(self, "body", body)
+        _set(self, "status", status)
+        _set(self, "generate", generate)
+        _set(self, "shuffle", shuffle)
+        _set(self, "fallback_data", fallback_data)
+        _set(self, "file", file)
+        static = generate is None and file is None and not shuffle
+        _set(self, "template", compile_template(body) if static and body else None)
+
+    @classmethod
+    def from_dict(cls, data: Any, default_status: int, base_dir: str = "") -> "ResponseSpec":
+        if not isinstance(data, dict):
+            raise ValueError("response block must be an object")
+        generate = data.get("generate_response")
+        return cls(
+            body=data.get("response"),
+            status=data.get("status", default_status),
+            generate=GenerateSpec.from_dict(generate) if generate else None,
+            shuffle=bool(data.get("shuffle")),
+            fallback_data=bool(data.get("fallback_data")),
+            file=FileSpec.from_dict(data, base_dir) if "response_file" in data else None,
+        )
+
+
+class DelaySpec(_Frozen):
+    """
+    `delay` in one of its forms:
+    "fixed" (seconds), "int_range" [a, b], "float_range" [a, b, precision] or "sequence" of DelaySpecs.
+    """
+    __slots__ = ("kind", "low", "high", "precision", "steps")
+
+    def __init__(self, kind: str, low: float = 0, high: float = 0, precision: int = 0,
+                 steps: tuple["DelaySpec", ...] = ()):
+        _set(self, "kind", kind)
+        _set(self, "low", low)
+        _set(self, "high", high)
+        _set(self, "precision", precision)
+        _set(self, "steps", steps)
+
+    @staticmethod
+    def problem(delay: Any) -> str | None:
+        """Why `delay` can't be used, or None if it can."""
+        if isinstance(delay, dict):
+            sequence = delay.get("sequence")
+            if not isinstance(sequence, list) or not sequence:
+                return f"Delay sequence must be a non-empty list, got: {delay!r}"
+            for step in sequence:
+                problem = DelaySpec.problem(step)
+                if problem:
+                    return problem
+            return None
+
+        if isinstance(delay, (int, float)) and not isinstance(delay, bool):
+            return f"Negative delay ignored: {delay}" if delay < 0 else None
+
+        if isinstance(delay, list):
+            if len(delay) == 2:
+                a, b = delay
+                if not (isinstance(a, int) and isinstance(b, int)):
+                    return f"Expected ints for 2-element delay list, got: {delay!r}"
+                return None
+            if len(delay) == 3:
+                a, b, prec = delay
+                if not (isinstance(a, (int, float)) and isinstance(b, (int, float)) and isinstance(prec, int)):
+                    return f"Bad types for 3-element delay list, got: {delay!r}"
+                if prec < 0:
+                    return f"Negative precision for delay ignored: {delay!r}"
+                return None
+
+        return f"Unsupported delay format: {delay!r}"
+
+    @classmethod
+    def parse(cls, delay: Any) -> "DelaySpec | None":
+        """Return the spec, or None (with a warning) for a missing or unsupported delay, which is then ignored."""
+        if delay is None:
+            return None
+        problem = cls.problem(delay)
+        if problem:
+            logger.warning(problem)
+            return None
+        if isinstance(delay, dict):
+            return cls("sequence", steps=tuple(cls.parse(step) for step in delay["sequence"]))
+        if isinstance(delay, list):
+            if len(delay) == 2:
+                return cls("int_range", low=delay[0], high=delay[1])
+            return cls("float_range", low=delay[0], high=delay[1], precision=delay[2])
+        return cls("fixed", low=delay)
+
+
+class UnstableSpec(_Frozen):
+    """`unstable` block: fail every Nth call, or randomly with `fail_rate`, answering with `response`."""
+    __slots__ = ("fail_rate", "fail_every", "response")
+
+    def __init__(self, fail_rate: float, fail_every: int | None, response: ResponseSpec):
+        _set(self, "fail_rate", fail_rate)
+        _set(self, "fail_every", fail_every)
+        _set(self, "response", response)
+
+    @classmethod
+    def from_dict(cls, data: Any, base_dir: str = "") -> "UnstableSpec":
+        if not isinstance(data, dict):
+            raise ValueError("unstable must be an object")
+
+        fail_every = data.get("fail_every")
+        if fail_every:
+            try:
+                fail_every = int(fail_every)
+            except Exception:
+                logger.warning("Invalid fail_every in unstable: %r, ignoring it", fail_every)
+                fail_every = None
+        else:
+            fail_every = None
+
+        try:
+            fail_rate = float(data.get("fail_rate", 0))
+        except Exception:
+            logger.warning("Invalid fail_rate in unstable: %r, defaulting to 0", data.get("fail_rate"))
+            fail_rate = 0.0
+        if not (0.0 <= fail_rate <= 1.0):
+            logger.warning("fail_rate out of range [0,1]: %r, clamping", fail_rate)
+            fail_rate = max(0.0, min(1.0, fail_rate))
+
+        return cls(fail_rate, fail_every, ResponseSpec.from_dict(data, 400, base_dir))
+
+
+class ThroughputSpec(_Frozen):
+    """`throughput` limit of the response body: `bytes_per_sec`, written in chunks of `chunk_size` bytes."""
+    __slots__ = ("bytes_per_sec", "chunk_size")
+
+    def __init__(self, bytes_per_sec: float, chunk_size: int):
+        _set(self, "bytes_per_sec", bytes_per_sec)
+        _set(self, "chunk_size", chunk_size)
+
+    @classmethod
+    def parse(cls, value: Any) -> "ThroughputSpec":
+        """A number of bytes per second, or {"bytes_per_sec": ..., "chunk_size": ...}."""
+        data = value if isinstance(value, dict) else {"bytes_per_sec": value}
+        rate, chunk_size = data.get("bytes_per_sec"), data.get("chunk_size")
+        if not isinstance(rate, (int, float)) or isinstance(rate, bool) or rate <= 0:
+            raise ValueError(f"throughput bytes_per_sec must be a positive number, got {rate!r}")
+        if chunk_size is None:
+            # about ten writes per second
+            chunk_size = max(1, min(int(rate) // 10, 64 * 1024))
+        elif not isinstance(chunk_size, int) or isinstance(chunk_size, bool) or chunk_size <= 0:
+            raise ValueError(f"throughput chunk_size must be a positive integer, got {chunk_size!r}")
+        return cls(rate, chunk_size)
+
+
+class FaultSpec(_Frozen):
+    """
+    `fault` injected after `after_bytes` bytes of the body: "stall" pauses for `duration` seconds,
+    "truncate" ends the body early, "close" drops the connection.
+    """
+    __slots__ = ("kind", "after_bytes", "duration")
+    KINDS = ("stall", "truncate", "close")
+    MAX_DURATION = 300
+
+    def __init__(self, kind: str, after_bytes: int, duration: float = 0):
+        _set(self, "kind", kind)
+        _set(self, "after_bytes", after_bytes)
+        _set(self, "duration", duration)
+
+    @classmethod
+    def from_dict(cls, data: Any) -> "FaultSpec":
+        if not isinstance(data, dict):
+            raise ValueError("fault must be an object")
+        kind, after, duration = data.get("type"), data.get("after_bytes", 0), data.get("duration", 10)
+        if kind not in cls.KINDS:
+            raise ValueError(f"fault type must be one of {', '.join(cls.KINDS)}, got {kind!r}")
+        if not isinstance(after, int) or isinstance(after, bool) or after < 0:
+            raise ValueError(f"fault after_bytes must be a non-negative integer, got {after!r}")
+        if not isinstance(duration, (int, float)) or isinstance(duration, bool) or not 0 <= duration <= cls.MAX_DURATION:
+            raise ValueError(f"fault duration must be a number of seconds from 0 to {cls.MAX_DURATION}, got {duration!r}")
+        return cls(kind, after, duration)
+
+
+class CapacitySpec(_Frozen):
+    """
+    `capacity` of the service behind a mock: `workers` serving requests in `service_time` seconds on
+    average, at most `queue_limit` requests waiting. Mocks with the same `group` share one capacity.
+    `key` names the in-flight counter; `response` answers shed requests.
+    """
+    __slots__ = ("workers", "service_time", "queue_limit", "key", "response")
+
+    def __init__(self, workers: int, service_time: float, queue_limit: int | None, key: str, response: ResponseSpec):
+        _set(self, "workers", workers)
+        _set(self, "service_time", service_time)
+        _set(self, "queue_limit", queue_limit)
+        _set(self, "key", key)
+        _set(self, "response", response)
+
+    @classmethod
+    def from_dict(cls, data: Any, mock_key: str, namespace: str = "", base_dir: str = "") -> "CapacitySpec":
+        if not isinstance(data, dict):
+            raise ValueError("capacity must be an object")
+        workers, service_time = data.get("workers", 1), data.get("service_time")
+        queue_limit, group = data.get("queue_limit"), data.get("group")
+        if not isinstance(workers, int) or isinstance(workers, bool) or workers < 1:
+            raise ValueError(f"capacity workers must be a positive integer, got {workers!r}")
+        if not isinstance(service_time, (int, float)) or isinstance(service_time, bool) or service_time <= 0:
+            raise ValueError(f"capacity service_time must be a positive number, got {service_time!r}")
+        if queue_limit is not None and (not isinstance(queue_limit, int) or isinstance(queue_limit, bool) or queue_limit < 0):
+            raise ValueError(f"capacity queue_limit must be a non-negative integer, got {queue_limit!r}")
+        if group is not None and not isinstance(group, str):
+            raise ValueError(f"capacity group must be a string, got {group!r}")
+        key = f"{namespace}group:{group}" if group else mock_key
+        return cls(workers, service_time, queue_limit, key, ResponseSpec.from_dict(data, 503, base_dir))
+
+
+class Rule(_Frozen):
+    """One entry of a mock's `data` list: the field `name` must exist, have `type` and satisfy `cond` (`if`)."""
+    __slots__ = ("name", "type", "has_cond", "cond")
+
+    def __init__(self, name: str | None, type: str = "any", has_cond: bool = False, cond: Any = None):
+        _set(self, "name", name)
+        _set(self, "type", type)
+        _set(self, "has_cond", has_cond)
+        _set(self, "cond", cond)
+
+    @classmethod
+    def from_dict(cls, data: Any) -> "Rule":
+        """Equal rules are shared: large corpora tend to repeat the same few validation rules."""
+        if not isinstance(data, dict):
+            raise ValueError("validation rules must be objects")
+        fields = (data.get("name"), data.get("type", "any"), "if" in data, data.get("if"))
+        # the type is part of the key: 1 == True and 0 == False, but they are different conditions
+        key = (*fields, type(fields[3]))
+        try:
+            rule = _RULES.get(key)
+        except TypeError:  # unhashable `if` (an object condition)
+            return cls(*fields)
+        return rule if rule is not None else _intern(_RULES, key, cls(*fields))
+
+
+class PathPattern(_Frozen):
+    """A mock path with `{name}` segments, such as "/users/{id}/"; each parameter matches one path segment."""
+    __slots__ = ("regex", "names")
+
+    def __init__(self, path: str):
+        names: list[str] = []
+        pattern, pos = "", 0
+        for m in _PARAM_RE.finditer(path):
+            if m.group(1) in names:
+                raise ValueError(f"path parameter {{{m.group(1)}}} is used twice")
+            names.append(m.group(1))
+            pattern += re.escape(path[pos:m.start()]) + f"(?P<{m.group(1)}>[^/]+)"
+            pos = m.end()
+        _set(self, "regex", re.compile(pattern + re.escape(path[pos:]) + r"\Z"))
+        _set(self, "names", tuple(names))
+
+    @classmethod
+    def parse(cls, path: Any) -> "PathPattern | None":
+        """Pattern for `path`, or None for a plain path."""
+        if not isinstance(path, str) or not _PARAM_RE.search(path):
+            return None
+        return cls(path)
+
+    def match(self, req_path: str) -> dict[str, str] | None:
+        m = self.regex.match(req_path)
+        return m.groupdict() if m else None
+
+
+def counter_key(raw: dict[str, Any], namespace: str = "", variant: int = 0) -> str:
+    """
+    Key the counters of a mock are kept under: its methods and path, plus "#<variant>" for the
+    second, third... mock with the same ones (variants told apart by `match`).
+    """
+    method = raw.get("method", DEFAULT_METHOD)
+    key = f"{namespace}{method if isinstance(method, str) else ','.join(sorted(_methods(method)))}:{raw.get('path')}"
+    return f"{key}#{variant}" if variant else key
+
+
+# entry keys whose value a Mock holds as is, so they are not kept twice (see Mock.raw)
+_KEPT = ("path", "type", "match", "resource", "response")
+
+
+def _kept(mock: "Mock", key: str) -> Any:
+    return mock.response.body if key == "response" else getattr(mock, key)
+
+
+class Mock(_Frozen):
+    """
+    One mock entry with every default resolved. Built once when mocks are loaded, so serving a
+    request only reads attributes. `raw` rebuilds the entry as written, for listing and persisting:
+    the values held by the attributes are not copied, only the rest of the entry is kept as compact JSON.
+    `namespace` prefixes the keys of its counters and state, so that stores serving the same mocks
+    in one process (test servers) don't share them. `variant` is the position of the mock among the ones
+    with the same methods and path (see counter_key). `pattern` is set when the path has `{name}` parameters.
+    `base_dir` is the directory of the mocks file, which relative response_file paths are from.
+    """
+    __slots__ = (
+        "_layout", "_rest", "namespace", "variant", "base_dir", "path", "pattern", "methods", "key", "type", "response", "on_pass", "on_fail",
+        "unstable", "delay", "rules", "sequence", "match", "resource", "resource_fingerprint",
+        "throughput", "fault", "capacity",
+    )
+
+    def __init__(self, raw: dict[str, Any], namespace: str = "", variant: int = 0, base_dir: str = ""):
+        if not isinstance(raw, dict):
+            raise ValueError("mock must be an object")
+        path = raw.get("path")
+        if not isinstance(path, str):
+            raise ValueError(f"path must be a string, got {path!r}")
+        method = raw.get("method", DEFAULT_METHOD)
+        status = raw.get("status", 200)
+        methods = _methods(method)
+        on_pass, on_fail, unstable, sequence = raw.get("on_pass"), raw.get("on_fail"), raw.get("unstable"), raw.get("sequence")
+        rules = raw.get("data") or ()
+        if not isinstance(rules, (list, tuple)):
+            raise ValueError("data must be a list of rules")
+        resource = raw.get("resource") or None
+        if resource is not None and not isinstance(resource, dict):
+            raise ValueError(f"resource must be an object, got {resource!r}")
+
+        _set(self, "namespace", namespace)
+        _set(self, "variant", variant)
+        _set(self, "base_dir", base_dir)
+        _set(self, "path", path)
+        _set(self, "pattern", PathPattern.parse(path))
+        _set(self, "methods", methods)
+        # counters of this mock (delay/response sequences, fail_every) are kept under this key
+        _set(self, "key", counter_key(raw, namespace, variant))
+        _set(self, "type", raw.get("type"))
+        _set(self, "response", ResponseSpec.from_dict(raw, status, base_dir))
+        _set(self, "on_pass", ResponseSpec.from_dict(on_pass, status, base_dir) if on_pass else None)
+        _set(self, "on_fail", ResponseSpec.from_dict(on_fail, 400, base_dir) if on_fail else None)
+        _set(self, "unstable", UnstableSpec.from_dict(unstable, base_dir) if unstable else None)
+        _set(self, "delay", DelaySpec.parse(raw.get("delay")))
+        _set(self, "rules", tuple(Rule.from_dict(r) for r in rules))
+        _set(self, "sequence", tuple(ResponseSpec.from_dict(s, status, base_dir) for s in sequence) if isinstance(sequence, list) else ())
+        _set(self, "match", raw.get("match") or None)
+        _set(self, "resource", resource)
+        # a changed resource config replaces its collection; compared on every request, so hashed once here
+        _set(self, "resource_fingerprint", hashlib.blake2b(
+            json.dumps(self.resource, sort_keys=True, default=str).encode("utf-8"), digest_size=16,
+        ).digest() if self.resource else b"")
+        throughput, fault = raw.get("throughput"), raw.get("fault")
+        _set(self, "throughput", ThroughputSpec.parse(throughput) if throughput is not None else None)
+        _set(self, "fault", FaultSpec.from_dict(fault) if fault is not None else None)
+        capacity = raw.get("capacity")
+        _set(self, "capacity", CapacitySpec.from_dict(capacity, self.key, namespace, base_dir) if capacity is not None else None)
+
+        # (key, held by an attribute) in the entry's order, and the values that are not
+        kept = {k for k in _KEPT if k in raw and _kept(self, k) is raw[k]}
+        layout = tuple((k, k in kept) for k in raw)
+        _set(self, "_layout", _intern(_LAYOUTS, layout, layout))
+        _set(self, "_rest", compact_json({k: v for k, v in raw.items() if k not in kept}))
+
+    @property
+    def raw(self) -> dict[str, Any]:
+        rest = json.loads(self._rest)
+        return {k: _kept(self, k) if kept else rest[k] for k, kept in self._layout}
+
+    @property
+    def files(self) -> tuple[FileSpec, ...]:
+        """The response_file of every response the mock can answer with."""
+        specs = (self.response, self.on_pass, self.on_fail, *self.sequence,
+                 self.unstable.response if self.unstable else None, self.capacity.response if self.capacity else None)
+        return tuple(s.file for s in specs if s is not None and s.file is not None)
+
+    @property
+    def group(self) -> str:
+        """The key without its variant: shared by the mocks with the same methods and path."""
+        return self.key.rpartition("#")[0] if self.variant else self.key
+
+
+def parse_mocks(entries: Iterable[Any], namespace: str = "", base_dir: str = "") -> list[Mock]:
+    """Build Mock objects from raw entries, logging and skipping the invalid ones."""
+    return [m for m in parse_entries(entries, namespace, base_dir) if isinstance(m, Mock)]
+
+
+def parse_entries(entries: Iterable[Any], namespace: str = "", base_dir: str = "") -> list[Mock | bytes]:
+    """
+    One item per entry: its Mock, or the entry as compact JSON if it is invalid (logged).
+    Entries can also be such items, carried over from a previous list: a Mock is reused
+    instead of parsing it again unless its variant or base_dir changed, compact JSON is parsed again.
+    """
+    items: list[Mock | bytes] = []
+    variants: dict[str, int] = {}
+    for i, entry in enumerate(entries):
+        if isinstance(entry, bytes):
+            entry = json.loads(entry)
+        elif isinstance(entry, Mock) and (entry.namespace != namespace or entry.base_dir != base_dir):
+            entry = entry.raw
+        group = entry.group if isinstance(entry, Mock) else counter_key(entry, namespace) if isinstance(entry, dict) else ""
+        variant = variants[group] = variants.get(group, -1) + 1
+        if isinstance(entry, Mock):
+            if entry.variant == variant:
+                items.append(entry)
+                continue
+            entry = entry.raw
+        try:
+            items.append(Mock(entry, namespace, variant, base_dir))
+        except Exception as e:
+            path = entry.get("path") if isinstance(entry, dict) else None
+            logger.error("Skipping invalid mock #%d (%s): %s", i, path, e)
+            items.append(compact_json(entry))
+    return items
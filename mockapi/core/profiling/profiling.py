@@ -0,0 +1,85 @@
+import cProfile
+import itertools
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+from ..utils import logger
+
+
+class PhaseTimer:
+    """Records the duration of consecutive request phases using perf_counter_ns."""
+    __slots__ = ("phases", "_last")
+
+    def __init__(self):
+        self.phases: list[tuple[str, int]] = []
+        self._last = time.perf_counter_ns()
+
+    def lap(self, name: str) -> None:
+        """Close the current phase under `name` and start the next one."""
+        now = time.perf_counter_ns()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    def header(self, total_ns: int | None = None) -> str:
+        """Render phases as a Server-Timing header value (durations in milliseconds)."""
+        parts = [f"{name};dur={ns / 1_000_000:.3f}" for name, ns in self.phases]
+        if total_ns is not None:
+            parts.append(f"total;dur={total_ns / 1_000_000:.3f}")
+        return ", ".join(parts)
+
+
+class NullTimer:
+    """Drop-in PhaseTimer replacement used when Server-Timing is disabled."""
+    __slots__ = ()
+
+    def lap(self, name: str) -> None:
+        pass
+
+
+NULL_TIMER = NullTimer()
+
+
+class ProfileSampler:
+    """
+    Runs cProfile on 1-in-N calls and dumps pstats files into a directory.
+    Only one call is profiled at a time; concurrent sampled calls run unprofiled.
+    """
+
+    def __init__(self):
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def should_sample(self, every: int) -> bool:
+        return every > 0 and next(self._counter) % every == 0
+
+    def run(self, func: Callable[[], Any], directory: str | Path, label: str) -> Any:
+        if not self._lock.acquire(blocking=False):
+            return func()
+        try:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # another profiler (e.g. a debugger) is already active
+                return func()
+            try:
+                return func()
+            finally:
+                profiler.disable()
+                self._dump(profiler, Path(directory), label)
+        finally:
+            self._lock.release()
+
+    def _dump(self, profiler: cProfile.Profile, directory: Path, label: str) -> None:
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", label).strip("_") or "root"
+            profiler.dump_stats(directory / f"{time.time_ns()}-{slug}.pstats")
+        except Exception:
+            logger.exception("Failed to write profile to %s", directory)
+
+
+sampler = ProfileSampler()
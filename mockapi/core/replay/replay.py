@@ -0,0 +1,216 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Iterable
+
+from django.conf import settings
+from django.http import HttpResponse
+
+from ..utils import logger
+
+
+INDEX_FILE = "index.ndjson"
+BODIES_FILE = "bodies.bin"
+META_FILE = "meta.json"
+BODY_CACHE_SIZE = 1024
+# Hop-by-hop and transport headers are never forwarded nor replayed.
+SKIP_HEADERS = frozenset({
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "te", "trailers",
+    "transfer-encoding", "upgrade", "host", "content-length", "content-encoding", "accept-encoding",
+    "date", "server",
+})
+
+
+def normalize_path(path: str) -> str:
+    """'/a//b/' and 'a/b' both become '/a/b'."""
+    return "/" + "/".join(p for p in path.split("/") if p)
+
+
+def canonical_body(body: bytes, content_type: str | None) -> bytes:
+    """JSON bodies are re-serialized with sorted keys so that key order doesn't change the fingerprint."""
+    if body and content_type and "application/json" in content_type:
+        try:
+            return json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode("utf-8")
+        except Exception:
+            pass
+    return body
+
+
+def fingerprint(method: str, path: str, query: Iterable[tuple[str, list[str]]], body: bytes,
+                content_type: str | None = None, query_keys: Iterable[str] | None = None) -> str:
+    """
+    Identify an exchange by method, normalized path, the selected query parameters
+    (all of them if `query_keys` is None) and a hash of the body.
+    """
+    keys = set(query_keys) if query_keys is not None else None
+    params = sorted((k, v) for k, vals in query for v in vals if keys is None or k in keys)
+    h = hashlib.sha256()
+    h.update(method.upper().encode())
+    h.update(b"\0" + normalize_path(path).encode("utf-8"))
+    h.update(b"\0" + json.dumps(params, ensure_ascii=False).encode("utf-8"))
+    h.update(b"\0" + hashlib.sha256(canonical_body(body, content_type)).digest())
+    return h.hexdigest()
+
+
+class ReplayStore:
+    """
+    Recorded exchanges on disk.
+    Metadata lives in an append-only NDJSON index (one line per exchange), bodies are appended
+    to a single blob file and referenced by offset and length. On load only the index is read
+    into a hash map; a body is read from disk the first time its exchange is replayed and then
+    kept in a bounded LRU cache.
+    `query_keys` are the query parameters fingerprints are computed from (None: all of them).
+    They are saved in meta.json with the recordings, so that a replay without --query-keys
+    computes the same fingerprints as the recording did.
+    """
+
+    def __init__(self, directory: str | Path, query_keys: Iterable[str] | None = None):
+        self.directory = Path(directory)
+        self._index: dict[str, dict[str, Any]] = {}
+        self._bodies: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+        saved = self._load_meta().get("query_keys")
+        self.query_keys: list[str] | None = list(query_keys) if query_keys is not None else saved
+        self._meta_saved = self.query_keys == saved
+        self._load_index()
+
+    def _load_meta(self) -> dict[str, Any]:
+        path = self.directory / META_FILE
+        try:
+            meta = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return {}
+        except Exception:
+            logger.warning("Ignoring broken replay metadata %s", path)
+            return {}
+        return meta if isinstance(meta, dict) else {}
+
+    def _save_meta(self) -> None:
+        with open(self.directory / META_FILE, "w", encoding="utf-8") as f:
+            json.dump({"query_keys": self.query_keys}, f)
+        self._meta_saved = True
+
+    def _load_index(self) -> None:
+        path = self.directory / INDEX_FILE
+        if not path.exists():
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    self._index[entry["fp"]] = entry
+                except Exception:
+                    logger.warning("Skipping broken replay index line in %s", path)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, fp: str) -> tuple[dict[str, Any], bytes] | None:
+        """Return (metadata, body) for a fingerprint or None; O(1) plus one read on the first hit."""
+        entry = self._index.get(fp)
+        if entry is None:
+            return None
+        with self._lock:
+            body = self._bodies.get(fp)
+            if body is not None:
+                self._bodies.move_to_end(fp)
+        if body is None:
+            with open(self.directory / BODIES_FILE, "rb") as f:
+                f.seek(entry["offset"])
+                body = f.read(entry["length"])
+            with self._lock:
+                self._bodies[fp] = body
+                if len(self._bodies) > BODY_CACHE_SIZE:
+                    self._bodies.popitem(last=False)
+        return entry, body
+
+    def add(self, fp: str, method: str, path: str, status: int, headers: dict[str, str],
+            body: bytes, latency_ms: float) -> None:
+        """Append an exchange; a later recording of the same fingerprint wins."""
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if not self._meta_saved:
+                self._save_meta()
+            with open(self.directory / BODIES_FILE, "ab") as f:
+                offset = f.tell()
+                f.write(body)
+            entry = {
+                "fp": fp, "method": method, "path": path, "status": status, "headers": headers,
+                "latency_ms": latency_ms, "offset": offset, "length": len(body),
+            }
+            with open(self.directory / INDEX_FILE, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._index[fp] = entry
+            self._bodies.pop(fp, None)
+
+
+def request_fingerprint(request, path: str, query_keys: Iterable[str] | None = None) -> str:
+    return fingerprint(request.method, path, request.GET.lists(), request.body, request.content_type, query_keys)
+
+
+def record_exchange(store: ReplayStore, request, path: str, upstream: str) -> HttpResponse:
+    """Forward the request to `upstream`, store the exchange and return the upstream answer."""
+    body = request.body
+    url = upstream.rstrip("/") + "/" + path.lstrip("/")
+    if request.META.get("QUERY_STRING"):
+        url += "?" + request.META["QUERY_STRING"]
+    headers = {k: v for k, v in request.headers.items() if k.lower() not in SKIP_HEADERS}
+    req = urllib.request.Request(url, data=body or None, headers=headers, method=request.method)
+
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=getattr(settings, "MOCKAPI_UPSTREAM_TIMEOUT", 30)) as resp:
+            status, resp_headers, resp_body = resp.status, resp.headers, resp.read()
+    except urllib.error.HTTPError as e:
+        status, resp_headers, resp_body = e.code, e.headers, e.read()
+    latency_ms = (time.perf_counter() - start) * 1000
+
+    kept = {k: v for k, v in resp_headers.items() if k.lower() not in SKIP_HEADERS}
+    store.add(request_fingerprint(request, path, store.query_keys), request.method, normalize_path(path), status, kept, resp_body, latency_ms)
+    return _build_response(status, kept, resp_body)
+
+
+def replay_exchange(store: ReplayStore, request, path: str) -> HttpResponse | None:
+    """Serve a recorded exchange, or None if this request was never recorded."""
+    hit = store.get(request_fingerprint(request, path, store.query_keys))
+    if hit is None:
+        return None
+    entry, body = hit
+    if getattr(settings, "MOCKAPI_REPLAY_LATENCY", False):
+        time.sleep(entry.get("latency_ms", 0) / 1000)
+    return _build_response(entry["status"], entry.get("headers", {}), body)
+
+
+def _build_response(status: int, headers: dict[str, str], body: bytes) -> HttpResponse:
+    response = HttpResponse(body, status=status, content_type=headers.get("Content-Type") or headers.get("content-type"))
+    for k, v in headers.items():
+        if k.lower() != "content-type":
+            response[k] = v
+    return response
+
+
+_store: ReplayStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_replay_store() -> ReplayStore:
+    """
+    Return the process-wide replay store for MOCKAPI_REPLAY_DIR, loading its index on first use.
+    MOCKAPI_REPLAY_QUERY_KEYS, when set, overrides the query keys saved with the recordings.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ReplayStore(
+                    getattr(settings, "MOCKAPI_REPLAY_DIR", None) or os.path.join(os.getcwd(), "mockapi-recordings"),
+                    getattr(settings, "MOCKAPI_REPLAY_QUERY_KEYS", None),
+                )
+                logger.info("Loaded %d recorded exchanges from %s", len(_store), _store.directory)
+    return _store
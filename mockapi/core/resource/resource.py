@@ -0,0 +1,335 @@
+import json
+import threading
+from itertools import islice
+from pathlib import Path
+from typing import Any
+
+from django.http import HttpResponse
+
+from ..io.io import write_json_atomic
+from ..utils import logger
+from ..django_service.view.http_helpers import _generate_response, _make_response
+from ..model.model import GenerateSpec, Mock
+
+
+RESOURCE_TYPE = "resource"
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 1000
+
+
+def collection_path(path: str) -> str:
+    """Normalize a collection path so that '/things' and '/things/' are the same resource."""
+    return path.rstrip("/") or "/"
+
+
+def _index_key(value: Any) -> str | None:
+    """Key used by primary and secondary indexes; query params are strings, so scalars are compared as text."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (str, int, float)):
+        return str(value)
+    return None
+
+
+def _int_id(value: Any) -> int | None:
+    """`value` as an integer id: an int, or a string that reads back as the same int ("7", not "007")."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    # isascii: "²" is a digit too, but not one int() reads
+    if isinstance(value, str) and value.isascii() and value.isdigit() and str(int(value)) == value:
+        return int(value)
+    return None
+
+
+class ResourceCollection:
+    """
+    In-memory collection of JSON objects.
+    Objects are kept in a dict keyed by primary key (O(1) lookup, insertion ordered), and every
+    field listed in `indexes` has a hash index value -> ordered set of primary keys.
+    Writes only touch the object and its index entries; pages are sliced lazily from them.
+    """
+
+    def __init__(self, config: dict[str, Any]):
+        self.id_field: str = config.get("id_field", "id")
+        self.index_fields: tuple[str, ...] = tuple(config.get("indexes", ()))
+        self.page_size: int = int(config.get("page_size", DEFAULT_PAGE_SIZE))
+        self._items: dict[str, dict[str, Any]] = {}
+        self._indexes: dict[str, dict[str, dict[str, None]]] = {f: {} for f in self.index_fields}
+        self._max_id = 0
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._closed = False
+
+        snapshot = config.get("snapshot") or {}
+        self.snapshot_file: Path | None = Path(snapshot["file"]) if snapshot.get("file") else None
+        self.snapshot_interval: float = float(snapshot.get("interval", 30))
+        self._snapshot_timer: threading.Timer | None = None
+
+        if not (self.snapshot_file and self.restore()):
+            self.seed(config.get("seed"))
+        if self.snapshot_file:
+            self._schedule_snapshot()
+
+    # ---------- Index maintenance ----------
+    def _index_add(self, pk: str, obj: dict[str, Any]) -> None:
+        for field, index in self._indexes.items():
+            key = _index_key(obj.get(field))
+            if key is not None:
+                index.setdefault(key, {})[pk] = None
+
+    def _index_remove(self, pk: str, obj: dict[str, Any]) -> None:
+        for field, index in self._indexes.items():
+            key = _index_key(obj.get(field))
+            bucket = index.get(key)
+            if bucket is not None:
+                bucket.pop(pk, None)
+                if not bucket:
+                    del index[key]
+
+    def _assign_id(self, obj: dict[str, Any]) -> str:
+        if obj.get(self.id_field) is None:
+            obj[self.id_field] = self._max_id + 1
+        pk = _index_key(obj[self.id_field])
+        if pk is None:
+            raise ValueError(f"{self.id_field} must be a string or a number")
+        return pk
+
+    def _put(self, pk: str, obj: dict[str, Any]) -> None:
+        old = self._items.get(pk)
+        if old is not None:
+            self._index_remove(pk, old)
+        self._items[pk] = obj
+        self._index_add(pk, obj)
+        self._dirty = True
+        # generated ids must not collide with "7" any more than with 7: both are stored under "7"
+        obj_id = _int_id(obj.get(self.id_field))
+        if obj_id is not None and obj_id > self._max_id:
+            self._max_id = obj_id
+
+    # ---------- CRUD ----------
+    def get(self, pk: str) -> dict[str, Any] | None:
+        return self._items.get(pk)
+
+    def create(self, obj: dict[str, Any]) -> dict[str, Any] | None:
+        """Insert a new object; returns None if the primary key is already taken, ValueError for an unusable id."""
+        with self._lock:
+            pk = self._assign_id(obj)
+            if pk in self._items:
+                return None
+            self._put(pk, obj)
+            return obj
+
+    def replace(self, pk: str, obj: dict[str, Any]) -> tuple[dict[str, Any], bool]:
+        """Replace (or create) the object stored under `pk`; returns (object, created)."""
+        with self._lock:
+            old = self._items.get(pk)
+            if old is not None:
+                obj[self.id_field] = old[self.id_field]
+            elif _index_key(obj.get(self.id_field)) != pk:
+                # "7" is the id 7, "007" stays a string (int would not give the same key back)
+                int_id = _int_id(pk)
+                obj[self.id_field] = int_id if int_id is not None else pk
+            self._put(pk, obj)
+            return obj, old is None
+
+    def update(self, pk: str, changes: dict[str, Any]) -> dict[str, Any] | None:
+        with self._lock:
+            old = self._items.get(pk)
+            if old is None:
+                return None
+            obj = {**old, **changes, self.id_field: old[self.id_field]}
+            self._put(pk, obj)
+            return obj
+
+    def delete(self, pk: str) -> bool:
+        with self._lock:
+            obj = self._items.pop(pk, None)
+            if obj is None:
+                return False
+            self._index_remove(pk, obj)
+            self._dirty = True
+            return True
+
+    def query(self, filters: dict[str, str], offset: int, limit: int) -> tuple[list[dict[str, Any]], int]:
+        """
+        Return one page of objects matching all `filters` plus the total number of matches.
+        Indexed fields are resolved through their hash index (smallest candidate set first);
+        other fields are checked on the remaining candidates. Only the objects of the page are collected.
+        """
+        with self._lock:
+            indexed = [(f, v) for f, v in filters.items() if f in self._indexes]
+            scanned = [(f, v) for f, v in filters.items() if f not in self._indexes]
+
+            if not filters:
+                return list(islice(self._items.values(), offset, offset + limit)), len(self._items)
+
+            if indexed:
+                buckets = sorted((self._indexes[f].get(v, {}) for f, v in indexed), key=len)
+                if len(buckets) == 1 and not scanned:
+                    return [self._items[pk] for pk in islice(buckets[0], offset, offset + limit)], len(buckets[0])
+                candidates = (pk for pk in buckets[0] if all(pk in b for b in buckets[1:]))
+                objects = (self._items[pk] for pk in candidates)
+            else:
+                objects = iter(self._items.values())
+
+            if scanned:
+                objects = (o for o in objects if all(_index_key(o.get(f)) == v for f, v in scanned))
+
+            page: list[dict[str, Any]] = []
+            total = 0
+            for obj in objects:
+                if offset <= total < offset + limit:
+                    page.append(obj)
+                total += 1
+            return page, total
+
+    # ---------- Seeding and snapshots ----------
+    def seed(self, seed: Any) -> None:
+        """Fill the collection from a static list or a generate_response template; objects with an unusable id are skipped."""
+        if not seed:
+            return
+        items = seed if isinstance(seed, list) else _generate_response(GenerateSpec.from_dict(seed))
+        with self._lock:
+            for i, obj in enumerate(items or []):
+                if isinstance(obj, dict):
+                    obj = dict(obj)
+                    try:
+                        pk = self._assign_id(obj)
+                    except ValueError as e:
+                        logger.warning("Skipping resource object #%d: %s", i, e)
+                        continue
+                    self._put(pk, obj)
+            self._dirty = False
+
+    def restore(self) -> bool:
+        """Load objects from the snapshot file; returns False if there is nothing to restore."""
+        try:
+            items = json.loads(self.snapshot_file.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return False
+        except Exception:
+            logger.exception("Can't restore resource snapshot %s", self.snapshot_file)
+            return False
+        self.seed(items if isinstance(items, list) else [])
+        return True
+
+    def save_snapshot(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+            items = list(self._items.values())
+            self._dirty = False
+        try:
+            write_json_atomic(self.snapshot_file, items)
+        except Exception:
+            logger.exception("Can't write resource snapshot %s", self.snapshot_file)
+
+    def close(self) -> None:
+        """Stop periodic snapshots and write the last one."""
+        with self._lock:
+            self._closed = True
+            if self._snapshot_timer is not None:
+                self._snapshot_timer.cancel()
+                self._snapshot_timer = None
+        if self.snapshot_file:
+            self.save_snapshot()
+
+    def _schedule_snapshot(self) -> None:
+        def tick():
+            self.save_snapshot()
+            with self._lock:
+                # a tick already running when close() cancelled the timer must not start another one
+                if not self._closed:
+                    self._schedule_snapshot()
+        self._snapshot_timer = threading.Timer(self.snapshot_interval, tick)
+        self._snapshot_timer.daemon = True
+        self._snapshot_timer.start()
+
+
+class ResourceRegistry:
+    """Keeps collections alive across mock reloads, keyed by the mock namespace and collection path."""
+
+    def __init__(self):
+        self._collections: dict[str, tuple[bytes, ResourceCollection]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, mock: Mock) -> ResourceCollection:
+        path = mock.namespace + collection_path(mock.path)
+        config = mock.resource or {}
+        fingerprint = mock.resource_fingerprint
+        entry = self._collections.get(path)
+        if entry is None or entry[0] != fingerprint:
+            with self._lock:
+                entry = self._collections.get(path)
+                if entry is None or entry[0] != fingerprint:
+                    if entry is not None:
+                        entry[1].close()
+                    entry = self._collections[path] = (fingerprint, ResourceCollection(config))
+        return entry[1]
+
+    def discard(self, namespace: str) -> None:
+        """Close and forget the collections of a namespace (a stopped test server)."""
+        with self._lock:
+            for path in [p for p in self._collections if p.startswith(namespace)]:
+                self._collections.pop(path)[1].close()
+
+
+resources = ResourceRegistry()
+
+
+def _page_params(query, default_size: int) -> tuple[int, int]:
+    try:
+        page = max(int(query.get("page", 1)), 1)
+    except (TypeError, ValueError):
+        page = 1
+    try:
+        size = min(max(int(query.get("page_size", default_size)), 1), MAX_PAGE_SIZE)
+    except (TypeError, ValueError):
+        size = default_size
+    return page, size
+
+
+def resource_response(mock: Mock, req_path: str, method: str, query, data: Any = None) -> HttpResponse:
+    """
+    Serve a request for a `resource` mock.
+    `/things` lists (GET) and creates (POST); `/things/{id}` reads, replaces, updates and deletes one object.
+    """
+    collection = resources.get(mock)
+    base = collection_path(mock.path)
+    rest = collection_path(req_path)[len(base):].strip("/")
+
+    if not rest:
+        if method == "GET":
+            page, size = _page_params(query, collection.page_size)
+            filters = {k: query.get(k) for k in query if k not in ("page", "page_size")}
+            items, total = collection.query(filters, (page - 1) * size, size)
+            return _make_response({"items": items, "page": page, "page_size": size, "total": total})
+        if method == "POST":
+            if not isinstance(data, dict):
+                return _make_response({"error": "object expected"}, 400)
+            try:
+                obj = collection.create(dict(data))
+            except ValueError as e:
+                return _make_response({"error": str(e)}, 400)
+            if obj is None:
+                return _make_response({"error": "already exists"}, 409)
+            return _make_response(obj, 201)
+        return _make_response({"error": "method not allowed"}, 405)
+
+    pk = rest
+    if method == "GET":
+        obj = collection.get(pk)
+        return _make_response(obj, 200) if obj is not None else _make_response({"error": "not found"}, 404)
+    if method == "PUT":
+        if not isinstance(data, dict):
+            return _make_response({"error": "object expected"}, 400)
+        obj, created = collection.replace(pk, dict(data))
+        return _make_response(obj, 201 if created else 200)
+    if method == "PATCH":
+        if not isinstance(data, dict):
+            return _make_response({"error": "object expected"}, 400)
+        obj = collection.update(pk, data)
+        return _make_response(obj, 200) if obj is not None else _make_response({"error": "not found"}, 404)
+    if method == "DELETE":
+        return HttpResponse(status=204) if collection.delete(pk) else _make_response({"error": "not found"}, 404)
+    return _make_response({"error": "method not allowed"}, 405)
@@ -0,0 +1,275 @@
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+import threading
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+
+from django.conf import settings
+
+from ..utils import logger
+from ..model.model import Mock
+
+try:
+    import fcntl
+except ImportError:  # Windows: stripes are only locked between threads of one process
+    fcntl = None
+
+
+# Slot layout (128 bytes):
+#   0  u8   used flag
+#   2  u16  value length
+#   8  16s  key digest
+#   24 i64  counter
+#   32 96s  value
+SLOT_SIZE = 128
+VALUE_SIZE = 96
+_HEADER = struct.Struct("<BxH4x16sq")
+DEFAULT_SLOTS = 4096
+DEFAULT_STRIPES = 64
+
+
+def _digest(key: str) -> bytes:
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+
+
+class LocalState:
+    """In-process implementation of the SharedState interface (single worker deployments)."""
+
+    def __init__(self):
+        self._counters: dict[str, int] = {}
+        self._values: dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def incr(self, key: str, delta: int = 1) -> int:
+        with self._lock:
+            value = self._counters[key] = self._counters.get(key, 0) + delta
+            return value
+
+    def get(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    def set_value(self, key: str, value: bytes) -> None:
+        if len(value) > VALUE_SIZE:
+            raise ValueError(f"shared values are limited to {VALUE_SIZE} bytes")
+        with self._lock:
+            self._values[key] = bytes(value)
+
+    def get_value(self, key: str) -> bytes | None:
+        return self._values.get(key)
+
+    def close(self) -> None:
+        pass
+
+
+def _untracked(name: str, size: int = 0) -> shared_memory.SharedMemory:
+    """
+    Open the block `name`, or create it with `size` bytes, without leaving it registered with the
+    resource tracker, which would unlink it when this process exits while other workers still use it.
+    """
+    create = size > 0
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, create=create, size=size, track=False)
+    shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+    return shm
+
+
+class SharedState:
+    """
+    Counters and small values shared by all worker processes through one named shared memory block.
+    The block is a hash table split into lock stripes: a key hashes to a stripe and is probed only
+    inside that stripe's slots, so holding the stripe lock (a threading lock plus an fcntl record
+    lock on a byte of a lock file) makes every read-modify-write on the key atomic across processes.
+    The block is opened with `open` by the workers: the first one creates it, the others attach.
+    `mockapi start` creates it beforehand with `create` (replacing one left over by an earlier run)
+    and removes it with `unlink` when the server stops; blocks created by workers stay until then.
+    """
+
+    def __init__(self, name: str, slots: int = DEFAULT_SLOTS, stripes: int = DEFAULT_STRIPES,
+                 create: bool = False, _new: bool = False):
+        self.name = name
+        self.stripes = max(1, min(stripes, slots))
+        self.slots_per_stripe = max(1, slots // self.stripes)
+        size = self.stripes * self.slots_per_stripe * SLOT_SIZE
+        self._owner = create
+        if create:
+            try:
+                self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            except FileExistsError:
+                # left over by an earlier run
+                stale = shared_memory.SharedMemory(name=name)
+                stale.close()
+                stale.unlink()
+                self._shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        else:
+            self._shm = _untracked(name, size if _new else 0)
+            if self._shm.size < size:
+                self._shm.close()
+                raise ValueError(f"shared state {name!r} exists with a smaller size ({self._shm.size} < {size})")
+        self._buf = self._shm.buf
+        self._thread_locks = [threading.Lock() for _ in range(self.stripes)]
+        self._lock_fd = None
+        if fcntl is not None:
+            self._lock_fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+
+    @classmethod
+    def open(cls, name: str, slots: int = DEFAULT_SLOTS, stripes: int = DEFAULT_STRIPES) -> "SharedState":
+        """Attach to the block `name`, creating it if no process did yet (workers racing to create it all end up attached)."""
+        try:
+            return cls(name, slots, stripes)
+        except FileNotFoundError:
+            pass
+        try:
+            return cls(name, slots, stripes, _new=True)
+        except FileExistsError:
+            return cls(name, slots, stripes)
+
+    @property
+    def _lock_path(self) -> Path:
+        return Path(tempfile.gettempdir()) / f"{self.name}.lock"
+
+    # ---------- Locking ----------
+    def _acquire(self, stripe: int) -> None:
+        self._thread_locks[stripe].acquire()
+        if self._lock_fd is not None:
+            fcntl.lockf(self._lock_fd, fcntl.LOCK_EX, 1, stripe)
+
+    def _release(self, stripe: int) -> None:
+        if self._lock_fd is not None:
+            fcntl.lockf(self._lock_fd, fcntl.LOCK_UN, 1, stripe)
+        self._thread_locks[stripe].release()
+
+    # ---------- Slots ----------
+    def _find(self, digest: bytes, create: bool) -> int | None:
+        """Return the byte offset of the key's slot (claiming an empty one if `create`); caller holds the stripe."""
+        stripe = digest[0] % self.stripes
+        start = int.from_bytes(digest[8:16], "little") % self.slots_per_stripe
+        base = stripe * self.slots_per_stripe
+        for i in range(self.slots_per_stripe):
+            offset = (base + (start + i) % self.slots_per_stripe) * SLOT_SIZE
+            used, _, key, _ = _HEADER.unpack_from(self._buf, offset)
+            if not used:
+                if not create:
+                    return None
+                _HEADER.pack_into(self._buf, offset, 1, 0, digest, 0)
+                return offset
+            if key == digest:
+                return offset
+        if create:
+            raise MemoryError("shared state stripe is full, increase shared_state_slots")
+        return None
+
+    def _locked(self, key: str, create: bool, func):
+        digest = _digest(key)
+        stripe = digest[0] % self.stripes
+        self._acquire(stripe)
+        try:
+            return func(self._find(digest, create))
+        finally:
+            self._release(stripe)
+
+    # ---------- Public API ----------
+    def incr(self, key: str, delta: int = 1) -> int:
+        """Atomically add `delta` to the counter `key` and return the new value."""
+        def op(offset):
+            value = struct.unpack_from("<q", self._buf, offset + 24)[0] + delta
+            struct.pack_into("<q", self._buf, offset + 24, value)
+            return value
+        return self._locked(key, True, op)
+
+    def get(self, key: str) -> int:
+        return self._locked(key, False, lambda o: 0 if o is None else struct.unpack_from("<q", self._buf, o + 24)[0])
+
+    def set_value(self, key: str, value: bytes) -> None:
+        if len(value) > VALUE_SIZE:
+            raise ValueError(f"shared values are limited to {VALUE_SIZE} bytes")
+
+        def op(offset):
+            struct.pack_into("<H", self._buf, offset + 2, len(value))
+            self._buf[offset + 32:offset + 32 + len(value)] = value
+        self._locked(key, True, op)
+
+    def get_value(self, key: str) -> bytes | None:
+        def op(offset):
+            if offset is None:
+                return None
+            length = struct.unpack_from("<H", self._buf, offset + 2)[0]
+            return bytes(self._buf[offset + 32:offset + 32 + length])
+        return self._locked(key, False, op)
+
+    def close(self) -> None:
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+        self._buf = None
+        self._shm.close()
+
+    def unlink(self) -> None:
+        """Close and remove the block and its lock file (owner only; attached workers just close)."""
+        self.close()
+        if self._owner:
+            # an attach in a forked child shares this process's tracker and may have dropped the registration
+            resource_tracker.register(self._shm._name, "shared_memory")
+            self._shm.unlink()
+            self._lock_path.unlink(missing_ok=True)
+
+
+_state: SharedState | LocalState | None = None
+_state_lock = threading.Lock()
+# counters that don't fit in the shared block any more are kept per process
+_overflow = LocalState()
+_overflow_logged = False
+
+
+def get_shared_state() -> SharedState | LocalState:
+    """
+    Return the process-wide state: a SharedState when the "shared_state" setting is on
+    (falling back to LocalState if shared memory is unavailable), LocalState otherwise.
+    """
+    global _state
+    if _state is None:
+        with _state_lock:
+            if _state is None:
+                if getattr(settings, "MOCKAPI_SHARED_STATE", False):
+                    try:
+                        _state = SharedState.open(
+                            settings.MOCKAPI_SHARED_STATE_NAME,
+                            getattr(settings, "MOCKAPI_SHARED_STATE_SLOTS", DEFAULT_SLOTS),
+                        )
+                    except Exception:
+                        logger.exception("Can't open shared state, counters will be per process")
+                        _state = LocalState()
+                else:
+                    _state = LocalState()
+    return _state
+
+
+def incr_counter(key: str, delta: int = 1) -> int:
+    """
+    get_shared_state().incr, except that a key for which the shared block has no free slot left
+    is counted by this process alone (logged once) instead of failing the request.
+    """
+    global _overflow_logged
+    try:
+        return get_shared_state().incr(key, delta)
+    except MemoryError:
+        if not _overflow_logged:
+            _overflow_logged = True
+            logger.warning("Shared state is full, new counters will be per process (raise shared_state_slots)")
+        return _overflow.incr(key, delta)
+
+
+def get_counter(key: str) -> int:
+    """Current value of a counter updated with incr_counter."""
+    return get_shared_state().get(key) or _overflow.get(key)
+
+
+def call_number(mock: Mock, purpose: str) -> int:
+    """Count calls of `mock` for `purpose` (1 for the first call) across all workers."""
+    return incr_counter(f"{purpose}:{mock.key}")
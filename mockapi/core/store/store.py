@@ -0,0 +1,357 @@
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Iterable
+
+from django.conf import settings
+
+from ..io.constants import MOCKS_FILE_EXAMPLE_PATH, MOCKS_FILE_PATH
+from ..io.io import load_mocks, mocks_file_path, write_json_atomic
+from ..utils import logger
+from ..django_service.view.http_helpers import _get_method
+from ..model.model import Mock, parse_entries
+from ..django_service.view.matcher import MatchContext, MatchTree
+from ..resource.resource import RESOURCE_TYPE, collection_path
+
+
+# WSGI environ key under which a server can hand its own MockStore to the views (see request_store)
+STORE_ENVIRON_KEY = "mockapi.store"
+
+
+MockKey = tuple[str, tuple[str, ...], str]
+
+
+def _match_key(match: Any) -> str:
+    """Canonical form of a `match` block ("" for none): mocks of one path told apart by `match` are different mocks."""
+    return json.dumps(match, sort_keys=True, separators=(",", ":"), default=str) if match else ""
+
+
+def mock_key(mock: dict[str, Any]) -> MockKey:
+    """Identity of a mock: its path, the sorted set of methods it answers and its `match` block."""
+    method = mock.get("method", "GET")
+    methods = (method,) if isinstance(method, str) else tuple(sorted({str(m) for m in method or ()}))
+    return str(mock.get("path")), methods, _match_key(mock.get("match"))
+
+
+def _item_path(item: Mock | bytes) -> str | None:
+    """Path of a snapshot item (None if it has no string path)."""
+    if isinstance(item, Mock):
+        return item.path
+    entry = json.loads(item)
+    path = entry.get("path") if isinstance(entry, dict) else None
+    return path if isinstance(path, str) else None
+
+
+def _item_key(item: Mock | bytes) -> MockKey | None:
+    """mock_key of a snapshot item (None for an invalid entry that isn't an object)."""
+    if isinstance(item, Mock):
+        return str(item.path), tuple(sorted(item.methods)), _match_key(item.match)
+    entry = json.loads(item)
+    return mock_key(entry) if isinstance(entry, dict) else None
+
+
+class MockSnapshot:
+    """
+    Immutable view of the mock list with a path index. Never mutated after creation.
+    `items` has one item per entry as loaded (see parse_entries): its Mock, or compact JSON for the
+    invalid ones, which are still listed and persisted. `mocks` are the valid ones.
+    `resource` mocks are indexed separately by collection path, as they also answer `<path>/<id>`.
+    Paths with `{name}` parameters are tried in order after the plain paths, one PathPattern per path.
+    Paths where at least one mock has a `match` block get a compiled MatchTree.
+    `base_dir` is the directory of the mocks file the entries come from (see Mock).
+    Items are kept by mock_key, and the index is built path by path, so that `apply` only
+    rebuilds the paths it changes (see MockStore.apply).
+    """
+    __slots__ = ("namespace", "base_dir", "_items", "_paths", "_patterns", "_cache",
+                 "routes", "resources", "patterns", "trees")
+
+    def __init__(self, entries: Iterable[dict[str, Any] | Mock | bytes], namespace: str = "", base_dir: str = ""):
+        self.namespace = namespace
+        self.base_dir = base_dir
+        # items by key in file order; duplicates and invalid entries without a key get a key of their own
+        self._items: dict[Any, Mock | bytes] = {}
+        paths: dict[str, list[Any]] = {}
+        for item in parse_entries(entries, namespace, base_dir):
+            key = _item_key(item)
+            if key is None or key in self._items:
+                key = object()
+            self._items[key] = item
+            path = _item_path(item)
+            if path is not None:
+                paths.setdefault(path, []).append(key)
+        self._paths: dict[str, tuple[Any, ...]] = {p: tuple(keys) for p, keys in paths.items()}
+        self._patterns: dict[str, tuple[Mock, ...]] = {}
+        self._cache: tuple[tuple[Mock | bytes, ...], tuple[Mock, ...]] | None = None
+        self.routes: dict[str, tuple[Mock, ...]] = {}
+        self.resources: dict[str, Mock] = {}
+        self.trees: dict[str, MatchTree] = {}
+        for path in self._paths:
+            self._index(path)
+        self.patterns: tuple[tuple[Mock, ...], ...] = tuple(self._patterns.values())
+
+    def _index(self, path: str) -> None:
+        """(Re)build the routes, patterns, tree and resource collection of one path from its items."""
+        items = (self._items[k] for k in self._paths.get(path, ()))
+        mocks = [m for m in items if isinstance(m, Mock) and m.type != RESOURCE_TYPE]
+        table = self._patterns if mocks and mocks[0].pattern is not None else self.routes
+        self.routes.pop(path, None)
+        self._patterns.pop(path, None)
+        if mocks:
+            table[path] = tuple(mocks)
+        if any(m.match for m in mocks):
+            self.trees[path] = MatchTree(mocks)
+        else:
+            self.trees.pop(path, None)
+        collection = collection_path(path)
+        self.resources.pop(collection, None)
+        for p in dict.fromkeys((collection, collection + "/", path)):
+            for k in self._paths.get(p, ()):
+                m = self._items[k]
+                if isinstance(m, Mock) and m.type == RESOURCE_TYPE:
+                    self.resources[collection] = m
+                    break
+            if collection in self.resources:
+                break
+
+    def _items_and_mocks(self) -> tuple[tuple[Mock | bytes, ...], tuple[Mock, ...]]:
+        if self._cache is None:
+            items = tuple(self._items.values())
+            self._cache = items, tuple(m for m in items if isinstance(m, Mock))
+        return self._cache
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def items(self) -> tuple[Mock | bytes, ...]:
+        """One item per entry, in file order (built on first use)."""
+        return self._items_and_mocks()[0]
+
+    @property
+    def mocks(self) -> tuple[Mock, ...]:
+        """The valid mocks, in file order (built on first use)."""
+        return self._items_and_mocks()[1]
+
+    def apply(self, upserts: Iterable[dict[str, Any]] = (),
+              deletes: Iterable[dict[str, Any]] = ()) -> tuple["MockSnapshot", int, int]:
+        """
+        New snapshot with the upserts and deletes applied (see MockStore.apply), and the number of
+        each applied. Only the paths they touch are parsed and indexed again; the rest is shared.
+        """
+        new = object.__new__(MockSnapshot)
+        new.namespace, new.base_dir = self.namespace, self.base_dir
+        new._items = dict(self._items)
+        new._paths = dict(self._paths)
+        new._patterns = dict(self._patterns)
+        new._cache = None
+        new.routes = dict(self.routes)
+        new.resources = dict(self.resources)
+        new.trees = dict(self.trees)
+        touched: dict[str, None] = {}
+        upserted = deleted = 0
+
+        for m in upserts:
+            key = mock_key(m)
+            path = m.get("path")
+            if not isinstance(path, str):
+                new._items[key] = parse_entries([m], self.namespace, self.base_dir)[0]
+            else:
+                if key not in new._items:
+                    new._paths[path] = new._paths.get(path, ()) + (key,)
+                new._items[key] = m
+                touched[path] = None
+            upserted += 1
+
+        for d in deletes:
+            key = mock_key(d)
+            if new._items.pop(key, None) is None:
+                continue
+            deleted += 1
+            path = d.get("path")
+            if isinstance(path, str):
+                keys = tuple(k for k in new._paths.get(path, ()) if k != key)
+                if keys:
+                    new._paths[path] = keys
+                else:
+                    new._paths.pop(path, None)
+                touched[path] = None
+
+        for path in touched:
+            # variants are numbered per path and methods, so a path's items are parsed together
+            keys = new._paths.get(path, ())
+            for k, item in zip(keys, parse_entries([new._items[k] for k in keys], self.namespace, self.base_dir)):
+                new._items[k] = item
+            new._index(path)
+        new.patterns = tuple(new._patterns.values())
+        return new, upserted, deleted
+
+    @property
+    def entries(self) -> list[Any]:
+        """The mocks as loaded, rebuilt (for listing and persisting)."""
+        return [m.raw if isinstance(m, Mock) else json.loads(m) for m in self.items]
+
+    def find(self, req_path: str, method: str, ctx: MatchContext | None = None) -> Mock | None:
+        """
+        Same result as find_matching_mock, but only scans mocks registered for `req_path`.
+        `ctx` gives access to the query, headers and body for mocks with a `match` block.
+        """
+        tree = self.trees.get(req_path)
+        if tree is not None:
+            mock = tree.select(method, ctx or MatchContext(), _get_method)
+            if mock is not None:
+                return mock
+        else:
+            for m in self.routes.get(req_path, ()):
+                if method in m.methods:
+                    return m
+        if self.patterns:
+            mock = self.find_pattern(req_path, method, ctx)
+            if mock is not None:
+                return mock
+        if self.resources:
+            return self.find_resource(req_path)
+        return None
+
+    def find_pattern(self, req_path: str, method: str, ctx: MatchContext | None = None) -> Mock | None:
+        """Match `req_path` against the paths with `{name}` parameters, in file order."""
+        for mocks in self.patterns:
+            if mocks[0].pattern.regex.match(req_path) is None:
+                continue
+            tree = self.trees.get(mocks[0].path)
+            if tree is not None:
+                mock = tree.select(method, ctx or MatchContext(), _get_method)
+                if mock is not None:
+                    return mock
+                continue
+            for m in mocks:
+                if method in m.methods:
+                    return m
+        return None
+
+    def find_resource(self, req_path: str) -> Mock | None:
+        """Match `/things` or `/things/{id}` against resource collections."""
+        path = collection_path(req_path)
+        mock = self.resources.get(path)
+        if mock is None:
+            parent = path.rsplit("/", 1)[0] or "/"
+            mock = self.resources.get(parent)
+        return mock
+
+
+class MockStore:
+    """
+    Holds the current MockSnapshot.
+    Readers take the snapshot reference without locking; writers build a new snapshot
+    (copy-on-write) under a lock and swap the reference atomically. The snapshot is
+    rebuilt from disk when the mocks file changes, and admin changes can optionally be
+    persisted back to it (debounced, atomic replace).
+    A store created with `mocks` holds them in memory only: it neither reads nor writes a file.
+    Its `namespace` is given to the mocks it builds (see Mock), and so is `base_dir`: the directory
+    of the mocks file, set on every load from disk (given for in-memory mocks read from a file).
+    """
+
+    def __init__(self, path: Path | None = None, persist_delay: float | None = None,
+                 mocks: Iterable[dict[str, Any]] | None = None, namespace: str = "", base_dir: str | Path = ""):
+        self._fixed_path = Path(path) if path else None
+        self._persist_delay = persist_delay
+        self._in_memory = mocks is not None
+        self.namespace = namespace
+        self.base_dir = str(base_dir)
+        self._snapshot = MockSnapshot(mocks or (), namespace=namespace, base_dir=self.base_dir)
+        self._source: tuple[str, int] | None = None
+        self._write_lock = threading.Lock()
+        self._persist_timer: threading.Timer | None = None
+
+    # ---------- Reading ----------
+    def current(self) -> MockSnapshot:
+        """Return the current snapshot, reloading it first if the mocks file changed on disk."""
+        if self._in_memory:
+            return self._snapshot
+        _, source = self._stat_source()
+        if source != self._source:
+            with self._write_lock:
+                self._reload_if_changed()
+        return self._snapshot
+
+    def _stat_source(self) -> tuple[Path, tuple[str, int]]:
+        path = self._fixed_path or mocks_file_path()
+        try:
+            return path, (str(path), os.stat(path).st_mtime_ns)
+        except (OSError, TypeError):
+            return path, (str(path), -1)
+
+    def _reload_if_changed(self) -> None:
+        """Rebuild the snapshot from disk if the file changed (caller holds the write lock)."""
+        if self._in_memory:
+            return
+        path, source = self._stat_source()
+        if source != self._source:
+            self.base_dir = str(path.resolve().parent)
+            self._snapshot = MockSnapshot(load_mocks(path), namespace=self.namespace, base_dir=self.base_dir)
+            self._source = source
+
+    # ---------- Writing ----------
+    def replace(self, mocks: Iterable[dict[str, Any]], persist: bool = False, base_dir: str | Path | None = None) -> MockSnapshot:
+        """Swap in a completely new mock list (read from a file in `base_dir`, if given)."""
+        with self._write_lock:
+            self._reload_if_changed()
+            if base_dir is not None:
+                self.base_dir = str(base_dir)
+            self._snapshot = MockSnapshot(mocks, namespace=self.namespace, base_dir=self.base_dir)
+        if persist:
+            self.schedule_persist()
+        return self._snapshot
+
+    def apply(self, upserts: Iterable[dict[str, Any]] = (), deletes: Iterable[dict[str, Any]] = (),
+              persist: bool = False) -> dict[str, int]:
+        """
+        Apply a batch of upserts and deletes in one atomic swap.
+        Upserts replace the mock with the same path, methods and `match` in place, or are appended.
+        Deletes are matched the same way.
+        """
+        with self._write_lock:
+            self._reload_if_changed()
+            self._snapshot, upserted, deleted = self._snapshot.apply(upserts, deletes)
+            total = len(self._snapshot)
+
+        if persist:
+            self.schedule_persist()
+        return {"upserted": upserted, "deleted": deleted, "total": total}
+
+    # ---------- Persistence ----------
+    def schedule_persist(self) -> None:
+        """Write the snapshot to disk once no further changes arrived for the persist delay."""
+        if self._in_memory:
+            return
+        with self._write_lock:
+            if self._persist_timer is not None:
+                self._persist_timer.cancel()
+            delay = self._persist_delay
+            if delay is None:
+                delay = getattr(settings, "MOCKAPI_ADMIN_PERSIST_DELAY", 1.0)
+            self._persist_timer = threading.Timer(delay, self.persist)
+            self._persist_timer.daemon = True
+            self._persist_timer.start()
+
+    def persist(self) -> None:
+        """Atomically write the current snapshot back to the mocks file."""
+        with self._write_lock:
+            self._persist_timer = None
+            path = self._fixed_path or mocks_file_path()
+            if path == MOCKS_FILE_EXAMPLE_PATH:
+                path = MOCKS_FILE_PATH
+            try:
+                write_json_atomic(path, self._snapshot.entries)
+                # we wrote what is already in memory: don't reload it on the next request
+                self._source = (str(path), os.stat(path).st_mtime_ns)
+            except Exception:
+                logger.exception("Failed to persist mocks to %s", path)
+
+
+store = MockStore()
+
+
+def request_store(request) -> MockStore:
+    """The store serving `request`: the one its server put in the environ (test servers), else the global one."""
+    return request.META.get(STORE_ENVIRON_KEY) or store
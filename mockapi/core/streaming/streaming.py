@@ -0,0 +1,168 @@
+import asyncio
+import socket
+import time
+from typing import Any, AsyncIterator, Callable, Iterable, Iterator
+
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+
+from ..model.model import FaultSpec, Mock, ThroughputSpec
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+_SLEEP, _DATA, _ABORT = range(3)
+
+
+class ConnectionAborted(Exception):
+    """Raised in the middle of a body to make the server drop the connection (the "close" fault)."""
+
+
+def _rechunk(parts: Iterable[bytes], size: int) -> Iterator[bytes]:
+    """Split and join `parts` into chunks of `size` bytes (the last one may be shorter)."""
+    buffer = b""
+    for part in parts:
+        if buffer:
+            part = buffer + part
+        view, pos = memoryview(part), 0
+        while len(part) - pos >= size:
+            yield bytes(view[pos:pos + size])
+            pos += size
+        buffer = part[pos:]
+    if buffer:
+        yield buffer
+
+
+def _steps(parts: Iterable[bytes], throughput: ThroughputSpec | None, fault: FaultSpec | None) -> Iterator[tuple[int, Any]]:
+    """
+    Plan the delivery of a body as (_SLEEP, seconds), (_DATA, bytes) and (_ABORT, None) steps.
+    The pace is kept against the clock: before each chunk we wait until `sent / bytes_per_sec`
+    seconds (not counting stalls) have passed since the first byte.
+    """
+    chunk_size = throughput.chunk_size if throughput else DEFAULT_CHUNK_SIZE
+    fault_at = fault.after_bytes if fault else None
+    start = time.monotonic()
+    sent = 0
+    stalled = 0.0
+
+    for chunk in _rechunk(parts, chunk_size):
+        while chunk:
+            if fault_at is not None and sent + len(chunk) >= fault_at:
+                piece, chunk = chunk[:fault_at - sent], chunk[fault_at - sent:]
+            else:
+                piece, chunk = chunk, b""
+
+            if piece:
+                if throughput:
+                    wait = start + stalled + sent / throughput.bytes_per_sec - time.monotonic()
+                    if wait > 0:
+                        yield _SLEEP, wait
+                yield _DATA, piece
+                sent += len(piece)
+
+            if fault_at is not None and sent == fault_at:
+                fault_at = None
+                if fault.kind == "stall":
+                    yield _SLEEP, fault.duration
+                    stalled += fault.duration
+                elif fault.kind == "truncate":
+                    return
+                else:
+                    yield _ABORT, None
+                    return
+
+
+def _unwrap(stream: Any) -> Any:
+    """The object `stream` reads from, through private attributes: None when none of them is there."""
+    for name in ("_sock", "raw"):
+        try:
+            inner = getattr(stream, name, None)
+        except Exception:
+            inner = None
+        if inner is not None:
+            return inner
+    try:
+        return stream._read.__self__
+    except Exception:
+        return None
+
+
+def _wsgi_socket_closer(request: HttpRequest) -> Callable[[], bool] | None:
+    """
+    Return a function shutting down the client socket of a WSGI request, or None if the socket
+    can't be reached through wsgi.input (only the development server exposes it).
+    """
+    # LimitedStream -> its bound read() -> BufferedReader -> SocketIO -> socket
+    sock = request.META.get("wsgi.input")
+    for _ in range(5):
+        if sock is None or isinstance(sock, socket.socket):
+            break
+        sock = _unwrap(sock)
+    if not isinstance(sock, socket.socket):
+        return None
+
+    def close() -> bool:
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            return False
+        return True
+    return close
+
+
+def paced_body(parts: Iterable[bytes], throughput: ThroughputSpec | None, fault: FaultSpec | None,
+               close: Callable[[], bool] | None = None) -> Iterator[bytes]:
+    """
+    Body iterator for WSGI servers: pauses sleep in the worker thread serving the request.
+    A "close" fault shuts the socket down with `close`, then (or without it) the body just ends.
+    """
+    for step, value in _steps(parts, throughput, fault):
+        if step == _DATA:
+            yield value
+        elif step == _SLEEP:
+            time.sleep(value)
+        else:
+            if close is not None:
+                close()
+            return
+
+
+async def apaced_body(parts: Iterable[bytes], throughput: ThroughputSpec | None, fault: FaultSpec | None) -> AsyncIterator[bytes]:
+    """Body iterator for ASGI servers: pauses are awaited, so no thread is held while a body is paced."""
+    for step, value in _steps(parts, throughput, fault):
+        if step == _DATA:
+            yield value
+        elif step == _SLEEP:
+            await asyncio.sleep(value)
+        else:
+            raise ConnectionAborted("fault: connection closed mid-body")
+
+
+def shape_response(response: HttpResponse, mock: Mock, request: HttpRequest) -> StreamingHttpResponse:
+    """
+    Re-send `response` as a stream paced by the mock's `throughput` and broken by its `fault`,
+    with an async body under ASGI and a sync one under WSGI.
+    The full Content-Length is announced, so a "close" fault is seen as a premature end of the body;
+    a "truncate" fault sends no length, so the shorter body looks complete. When a WSGI server doesn't
+    expose the client socket, a "close" fault can't drop the connection: it sends no length either and
+    ends the body, which closes the connection (clients relying on the length then get a shorter body).
+    """
+    if response.streaming:
+        parts, length = response.streaming_content, response.get("Content-Length")
+    else:
+        parts, length = (response.content,), str(len(response.content))
+
+    closing = mock.fault is not None and mock.fault.kind == "close"
+    if isinstance(request, ASGIRequest):
+        body = apaced_body(parts, mock.throughput, mock.fault)
+    else:
+        close = _wsgi_socket_closer(request) if closing else None
+        closing = close is not None
+        body = paced_body(parts, mock.throughput, mock.fault, close)
+    shaped = StreamingHttpResponse(body, status=response.status_code)
+    for header, value in response.items():
+        shaped[header] = value
+    if "Content-Length" in shaped:
+        del shaped["Content-Length"]
+    if length is not None and (mock.fault is None or closing or mock.fault.kind == "stall"):
+        shaped["Content-Length"] = length
+    return shaped
@@ -0,0 +1,143 @@
+import json
+import re
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterator
+
+
+# {{source.key}}: path.<param>, query.<name>, headers.<name>, body.<dotted.path>, or {{body}} and {{now}}
+PLACEHOLDER_RE = re.compile(r"\{\{\s*([^{}\s]+)\s*\}\}")
+SOURCES = ("path", "query", "headers", "body")
+_SLOT_RE = re.compile(r'"\\u0000(\d+)\\u0000"')
+_MISSING = object()
+
+Accessor = Callable[[Any], Any]
+
+
+def _dig(obj: Any, parts: tuple[str, ...]) -> Any:
+    """_get_by_dotted with the path split in advance; _MISSING when not found."""
+    for part in parts:
+        if isinstance(obj, dict):
+            obj = obj.get(part, _MISSING)
+            if obj is _MISSING:
+                return _MISSING
+        elif isinstance(obj, list) and part.isdigit() and 0 <= int(part) < len(obj):
+            obj = obj[int(part)]
+        else:
+            return _MISSING
+    return obj
+
+
+def _now(_ctx) -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def accessor(expr: str) -> Accessor | None:
+    """
+    Compile the inside of a placeholder into a function of the request context (a MatchContext).
+    None if it isn't one of ours: such placeholders are left in the text as they are.
+    """
+    if expr == "now":
+        return _now
+    if expr == "body":
+        return lambda ctx: ctx.body
+    source, _, key = expr.partition(".")
+    if source not in SOURCES or not key:
+        return None
+    if source == "body":
+        parts = tuple(key.split("."))
+        return lambda ctx: _dig(ctx.body, parts)
+    if source == "path":
+        return lambda ctx: ctx.params.get(key, _MISSING)
+    if source == "query":
+        return lambda ctx: ctx.query.get(key, _MISSING)
+    return lambda ctx: ctx.headers.get(key, _MISSING)
+
+
+def _json(value: Any) -> bytes:
+    return json.dumps(None if value is _MISSING else value, ensure_ascii=False, default=str).encode("utf-8")
+
+
+def _text(value: Any) -> str:
+    if value is _MISSING or value is None:
+        return ""
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False, default=str)
+
+
+def placeholders(body: Any) -> Iterator[str]:
+    """The inside of every placeholder in the strings of a response body, known or not."""
+    if isinstance(body, str):
+        if "{{" in body:
+            yield from PLACEHOLDER_RE.findall(body)
+    elif isinstance(body, dict):
+        for value in body.values():
+            yield from placeholders(value)
+    elif isinstance(body, list):
+        for value in body:
+            yield from placeholders(value)
+
+
+def _slot(text: str) -> Callable[[Any], bytes] | None:
+    """
+    A string that is one placeholder becomes the value itself (numbers, objects... keep their type,
+    a missing value is null); placeholders inside text are replaced by their text ("" if missing).
+    None if the string has no known placeholder.
+    """
+    parts: list[str | Accessor] = []
+    pos = 0
+    for m in PLACEHOLDER_RE.finditer(text):
+        get = accessor(m.group(1))
+        if get is not None:
+            parts += [text[pos:m.start()], get]
+            pos = m.end()
+    if not parts:
+        return None
+    parts = [p for p in (*parts, text[pos:]) if p != ""]
+    if len(parts) == 1:
+        get = parts[0]
+        return lambda ctx: _json(get(ctx))
+    return lambda ctx: _json("".join(p if isinstance(p, str) else _text(p(ctx)) for p in parts))
+
+
+class Template:
+    """
+    A JSON response body with placeholders, compiled once when the mock is loaded: the JSON text
+    between templated strings is kept as bytes `fragments`, and each templated string is a slot
+    rendering its value from the request. Rendering is one join, len(fragments) == len(slots) + 1.
+    """
+    __slots__ = ("fragments", "slots")
+
+    def __init__(self, fragments: list[bytes], slots: list[Callable[[Any], bytes]]):
+        self.fragments = fragments
+        self.slots = slots
+
+    def render(self, ctx) -> bytes:
+        out = [self.fragments[0]]
+        for slot, fragment in zip(self.slots, self.fragments[1:]):
+            out.append(slot(ctx))
+            out.append(fragment)
+        return b"".join(out)
+
+
+def compile_template(body: Any) -> Template | None:
+    """Template for a response body, or None if none of its strings has a known placeholder."""
+    slots: list[Callable[[Any], bytes]] = []
+
+    def mark(value: Any) -> Any:
+        # templated strings are swapped for "\x00<slot>\x00", which json.dumps writes as "\u0000<slot>\u0000"
+        if isinstance(value, str):
+            slot = _slot(value) if "{{" in value else None
+            if slot is None:
+                return value
+            slots.append(slot)
+            return f"\x00{len(slots) - 1}\x00"
+        if isinstance(value, dict):
+            return {k: mark(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [mark(v) for v in value]
+        return value
+
+    marked = mark(body)
+    if not slots:
+        return None
+    pieces = _SLOT_RE.split(json.dumps(marked, ensure_ascii=False))
+    return Template([p.encode("utf-8") for p in pieces[::2]], [slots[int(i)] for i in pieces[1::2]])
@@ -0,0 +1,173 @@
+import itertools
+import json
+import os
+import selectors
+import socket
+import threading
+from pathlib import Path
+from typing import Any, Iterable
+
+import django
+from django.apps import apps
+from django.core.handlers.exception import convert_exception_to_response
+from django.core.handlers.wsgi import WSGIHandler, WSGIRequest
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+
+from ..store.store import STORE_ENVIRON_KEY, MockStore
+from ..resource.resource import resources
+
+
+SETTINGS_MODULE = "mockapi.django_service.django_service.settings"
+URLCONF = "mockapi.django_service.django_service.urls"
+
+_ids = itertools.count(1)
+
+
+def _setup_django() -> None:
+    """Set Django up with mockapi's settings, unless the process already configured its own (a Django project's tests)."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", SETTINGS_MODULE)
+    if not apps.ready:
+        django.setup()
+
+
+def _mocks_dir(mocks: Any) -> str:
+    """Directory relative response_file paths are from: the mocks file's, else the working directory."""
+    return str(Path(mocks).resolve().parent) if isinstance(mocks, (str, os.PathLike)) else ""
+
+
+def _read_mocks(mocks: Any) -> list[dict[str, Any]]:
+    """Mocks given as a list, a single mock or the path of a mocks file (read errors are raised, not logged)."""
+    if mocks is None:
+        return []
+    if isinstance(mocks, (str, os.PathLike)):
+        mocks = json.loads(Path(mocks).read_text(encoding="utf-8"))
+    if isinstance(mocks, dict):
+        return [mocks]
+    return list(mocks)
+
+
+class _Request(WSGIRequest):
+    # resolve against mockapi's URLconf whatever ROOT_URLCONF is
+    urlconf = URLCONF
+
+
+class _Handler(WSGIHandler):
+    """Django's WSGI handler without the project middleware, serving the views with one server's store."""
+    request_class = _Request
+
+    def __init__(self, store: MockStore):
+        self.store = store
+        super().__init__()
+
+    def load_middleware(self, is_async: bool = False) -> None:
+        self._view_middleware = []
+        self._template_response_middleware = []
+        self._exception_middleware = []
+        self._middleware_chain = convert_exception_to_response(self._get_response)
+
+    def __call__(self, environ, start_response):
+        environ[STORE_ENVIRON_KEY] = self.store
+        return super().__call__(environ, start_response)
+
+
+class _Server(ThreadedWSGIServer):
+    # parallel clients of one test must not be refused while handler threads start
+    request_queue_size = 128
+
+
+class _QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class MockServer:
+    """
+    mockapi served from a background thread of the current process, by default on 127.0.0.1 and
+    a free port. `mocks` is a list of mocks, a single mock or the path of a mocks file.
+
+        with MockServer([{"path": "/users/", "response": [{"id": 1}]}]) as server:
+            urllib.request.urlopen(server.url + "/users/")
+
+    Every server has its own mocks, counters (sequences, fail_every, capacity) and resource
+    collections, so any number of them can run side by side. Mocks can be changed while it runs
+    with set_mocks, add and remove. Settings (append_slash, journal, ...) are the process's ones.
+    """
+
+    def __init__(self, mocks: Any = None, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.namespace = f"test-{os.getpid()}-{next(_ids)}:"
+        self.store = MockStore(mocks=_read_mocks(mocks), namespace=self.namespace, base_dir=_mocks_dir(mocks))
+        self._server: _Server | None = None
+        self._thread: threading.Thread | None = None
+        self._wakeup: tuple[socket.socket, socket.socket] | None = None
+        self._stopping = False
+
+    @property
+    def url(self) -> str:
+        """Base URL, without a trailing slash."""
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def mocks(self) -> list[dict[str, Any]]:
+        return self.store.current().entries
+
+    # ---------- Mocks ----------
+    def set_mocks(self, mocks: Any) -> None:
+        """Replace all mocks (same forms as the constructor)."""
+        self.store.replace(_read_mocks(mocks), base_dir=_mocks_dir(mocks))
+
+    def add(self, *mocks: dict[str, Any]) -> None:
+        """Add mocks, replacing the ones with the same path, methods and match."""
+        self.store.apply(mocks)
+
+    def remove(self, path: str, method: str | Iterable[str] = "GET", match: dict[str, Any] | None = None) -> None:
+        self.store.apply(deletes=[{"path": path, "method": method, "match": match}])
+
+    # ---------- Lifecycle ----------
+    def start(self) -> "MockServer":
+        """Bind the port and serve in a daemon thread; requests are accepted as soon as this returns."""
+        if self._server is not None:
+            raise RuntimeError("server is already running")
+        _setup_django()
+        server = _Server((self.host, self.port), _QuietHandler, ipv6=":" in self.host)
+        server.set_app(_Handler(self.store))
+        self._server, self.port = server, server.server_address[1]
+        self._wakeup = socket.socketpair()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._serve, name=f"mockapi-{self.port}", daemon=True)
+        self._thread.start()
+        return self
+
+    def _serve(self) -> None:
+        """Accept connections until stop() writes to the wakeup socket (no polling, so stop is immediate)."""
+        server, wakeup = self._server, self._wakeup[0]
+        with selectors.DefaultSelector() as selector:
+            selector.register(server.socket, selectors.EVENT_READ)
+            selector.register(wakeup, selectors.EVENT_READ)
+            while not self._stopping:
+                for key, _ in selector.select():
+                    if key.fileobj is server.socket and not self._stopping:
+                        server.handle_request()
+
+    def stop(self) -> None:
+        """Stop accepting connections and forget the server's resource collections."""
+        if self._server is None:
+            return
+        self._stopping = True
+        self._wakeup[1].send(b"\0")
+        self._thread.join()
+        self._server.server_close()
+        for sock in self._wakeup:
+            sock.close()
+        self._server = self._thread = self._wakeup = None
+        resources.discard(self.namespace)
+
+    def __enter__(self) -> "MockServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def __repr__(self) -> str:
+        return f"MockServer({self.url if self._server else 'stopped'}, {len(self.store.current())} mocks)"
@@ -1,11 +1,22 @@
 import json
+import time
+from django.conf import settings
 from django.http import HttpRequest, HttpResponse, HttpResponseBadRequest, HttpResponseNotFound, HttpResponseServerError
 
 from ...core.utils import logger
-from ...core.io.io import load_mocks
-from ...core.django_service.view.http_helpers import apply_delay, default_mock_response, find_matching_mock, maybe_handle_unstable, on_fail_response, on_pass_response, req_path_generate, get_request_data
+from ...core.metrics.metrics import registry as metrics
+from ...core.profiling.profiling import NULL_TIMER, PhaseTimer, sampler
+from ...core.store.store import request_store
+from ...core.resource.resource import RESOURCE_TYPE, resource_response
+from ...core.journal.journal import get_journal
+from ...core.streaming.streaming import shape_response
+from ...core.files.files import MockFileResponse, serve_file
+from ...core.capacity.capacity import admit, release, shed_response
+from ...core.replay.replay import get_replay_store, record_exchange, replay_exchange
+from ...core.django_service.view.http_helpers import apply_delay, default_mock_response, maybe_handle_unstable, on_fail_response, on_pass_response, req_path_generate, get_request_data
 from ...core.django_service.view.validator import validate
-from ...core.django_service.view.constants import SIDE_EFFECT_METHODS
+from ...core.django_service.view.matcher import MatchContext
+from ...core.django_service.view.constants import INTERNAL_PATH_PREFIX, SIDE_EFFECT_METHODS
 
 
 class DynamicViewHandler:
@@ -18,36 +29,97 @@ class DynamicViewHandler:
         self.request = request
         self.path = path
         self.method = request.method.upper()
-        self.mocks = None
+        self.snapshot = None
         self.mock = None
+        self.ctx = None
+        self.data = None
+        self.unstable_fired = False
+        self.validation_failed = False
+        self.admitted = False
+        # "record" or "replay" when the response came from record/replay mode rather than a mock
+        self.served_by = ""
+        self.timer = PhaseTimer() if getattr(settings, "MOCKAPI_SERVER_TIMING", False) else NULL_TIMER
 
     # ---------- Entry point ----------
     def handle(self) -> HttpResponse:
         """Main entry point (replaces the dynamic_view function)."""
+        start = time.perf_counter_ns()
+        try:
+            if sampler.should_sample(getattr(settings, "MOCKAPI_PROFILE_EVERY", 0)):
+                response = sampler.run(self._process, settings.MOCKAPI_PROFILE_DIR, f"{self.method}-{self.path}")
+            else:
+                response = self._process()
+        finally:
+            if self.admitted:
+                release(self.mock.capacity)
+        duration_ns = time.perf_counter_ns() - start
+        if isinstance(response, MockFileResponse):
+            response = serve_file(self.request, response)
+        if self.mock is not None and (self.mock.throughput is not None or self.mock.fault is not None):
+            response = shape_response(response, self.mock, self.request)
+
+        if getattr(settings, "MOCKAPI_METRICS", False):
+            self._record_metrics(response, duration_ns)
+        if getattr(settings, "MOCKAPI_JOURNAL", False):
+            self._record_journal(response, duration_ns)
+        if self.timer is not NULL_TIMER:
+            response["Server-Timing"] = self.timer.header(duration_ns)
+        return response
+
+    def _process(self) -> HttpResponse:
+        """Run the processing steps and return the response."""
+        timer = self.timer
         if not self._load_mocks():
             return self._error_response("failed to load mocks", HttpResponseServerError)
+        timer.lap("load")
 
         self._prepare_request_path()
+        timer.lap("path")
+
+        if self.req_path.startswith(INTERNAL_PATH_PREFIX):
+            return self._error_response("No mock defined", HttpResponseNotFound)
+
+        mode = getattr(settings, "MOCKAPI_MODE", "")
+        if mode:
+            response = self._handle_record_replay(mode)
+            timer.lap("replay")
+            if response is not None:
+                self.served_by = mode
+                return response
 
         if not self._find_mock():
             return self._error_response("No mock defined", HttpResponseNotFound)
+        timer.lap("find")
+
+        if self.mock.capacity is not None:
+            overload_response = self._enter_capacity()
+            timer.lap("capacity")
+            if overload_response:
+                return overload_response
 
         self._apply_delay_safe()
+        timer.lap("delay")
         unstable_response = self._handle_unstable()
+        timer.lap("unstable")
         if unstable_response:
             return unstable_response
 
+        if self.mock.type == RESOURCE_TYPE:
+            return self._handle_resource()
+
         if self.method in SIDE_EFFECT_METHODS:
             return self._handle_side_effect_method()
 
-        return self._default_response()
+        response = self._default_response()
+        timer.lap("response")
+        return response
 
     # ---------- Processing steps ----------
 
     def _load_mocks(self) -> bool:
         """Load mocks safely with error handling."""
         try:
-            self.mocks = load_mocks()
+            self.snapshot = request_store(self.request).current()
             return True
         except Exception:
             logger.exception("Failed to load mocks")
@@ -58,10 +130,32 @@ class DynamicViewHandler:
         self.req_path = req_path_generate(self.path)
 
     def _find_mock(self) -> bool:
-        """Find the matching mock."""
-        self.mock = find_matching_mock(self.mocks, self.req_path, self.method)
+        """Find the matching mock; the context is kept for response templates."""
+        ctx = self.ctx = MatchContext(self.request.GET, self.request.headers, self._parse_body_for_match)
+        self.mock = self.snapshot.find(self.req_path, self.method, ctx)
+        if self.mock is not None and self.mock.pattern is not None:
+            ctx.params = self.mock.pattern.match(self.req_path) or {}
         return self.mock is not None
 
+    def _parse_body_for_match(self):
+        """Parse the body once for `match` conditions and templates; it's reused by validation later."""
+        if self.data is None:
+            self.data = get_request_data(self.request)
+        return self.data
+
+    def _enter_capacity(self) -> HttpResponse | None:
+        """Queue behind the other in-flight requests of the mock's capacity, or shed the request if the queue is full."""
+        try:
+            duration = admit(self.mock.capacity)
+        except Exception:
+            logger.exception("Error while applying capacity, continuing without it")
+            return None
+        if duration is None:
+            return shed_response(self.mock.capacity)
+        self.admitted = True
+        time.sleep(duration)
+        return None
+
     def _apply_delay_safe(self):
         """Apply delay safely (non-critical if it fails)."""
         try:
@@ -71,26 +165,75 @@ class DynamicViewHandler:
 
     def _handle_unstable(self) -> HttpResponse | None:
         """Handle unstable responses (if mock defines one)."""
-        return maybe_handle_unstable(self.mock)
+        response = maybe_handle_unstable(self.mock)
+        self.unstable_fired = response is not None
+        return response
 
     # ---------- Side-effect methods ----------
     def _handle_side_effect_method(self) -> HttpResponse:
         """Handle methods that modify state (POST, PUT, DELETE, etc.)."""
-        data = self._get_request_data_safe()
+        data = self.data = self._get_request_data_safe()
         if isinstance(data, HttpResponse):
             return data
+        self.timer.lap("body")
 
         errs = self._validate_data_safe(data)
         if isinstance(errs, HttpResponse):
             return errs
+        self.timer.lap("validate")
 
         if errs:
-            return on_fail_response(self.mock, errs, data)
+            self.validation_failed = True
+            response = on_fail_response(self.mock, errs, data, self.ctx)
+        else:
+            response = on_pass_response(self.mock, data, self.ctx)
+        self.timer.lap("response")
+        return response
 
-        return on_pass_response(self.mock, data)
+    # ---------- Record / replay ----------
+    def _handle_record_replay(self, mode: str) -> HttpResponse | None:
+        """Proxy and record the exchange, or serve a recorded one (None falls back to mocks)."""
+        try:
+            if mode == "record":
+                return record_exchange(get_replay_store(), self.request, self.request.path, settings.MOCKAPI_UPSTREAM)
+            if mode == "replay":
+                return replay_exchange(get_replay_store(), self.request, self.request.path)
+        except Exception:
+            logger.exception("Error while handling %s mode", mode)
+            return self._error_response(f"{mode} failed", HttpResponseServerError)
+        return None
+
+    # ---------- Resources ----------
+    def _handle_resource(self) -> HttpResponse:
+        """Serve CRUD requests against the in-memory collection of a `resource` mock."""
+        data = None
+        if self.method in SIDE_EFFECT_METHODS and self.method != "DELETE":
+            data = self.data = self._get_request_data_safe()
+            if isinstance(data, HttpResponse):
+                return data
+            self.timer.lap("body")
+
+            if self.method != "PATCH":
+                errs = self._validate_data_safe(data)
+                if isinstance(errs, HttpResponse):
+                    return errs
+                self.timer.lap("validate")
+                if errs:
+                    self.validation_failed = True
+                    return on_fail_response(self.mock, errs, data, self.ctx)
+
+        try:
+            response = resource_response(self.mock, self.req_path, self.method, self.request.GET, data)
+        except Exception:
+            logger.exception("Error while serving resource")
+            return self._error_response("failed to serve resource", HttpResponseServerError)
+        self.timer.lap("response")
+        return response
 
     def _get_request_data_safe(self):
         """Safely extract data from the request body."""
+        if self.data is not None:
+            return self.data
         try:
             return get_request_data(self.request)
         except ValueError:
@@ -102,16 +245,48 @@ class DynamicViewHandler:
     def _validate_data_safe(self, data):
         """Validate request data with safety wrappers."""
         try:
-            return validate(data, self.mock.get("data", []))
+            return validate(data, self.mock.rules)
         except Exception:
             logger.exception("Validator raised an exception")
             return self._error_response("validation failed unexpectedly", HttpResponseServerError)
 
     def _default_response(self) -> HttpResponse:
         """Return default response for non-side-effect methods."""
-        return default_mock_response(self.mock)
+        return default_mock_response(self.mock, ctx=self.ctx)
 
     # ---------- Helpers ----------
+    def _record_metrics(self, response: HttpResponse, duration_ns: int) -> None:
+        """Record the finished request in the metrics registry (never fails the request)."""
+        try:
+            if self.served_by:
+                metrics.observe(self.req_path, self.method, response.status_code, duration_ns, source=self.served_by)
+                return
+            if self.mock is None:
+                metrics.observe_unmatched()
+                return
+            metrics.observe(
+                str(self.mock.path), self.method, response.status_code, duration_ns,
+                unstable=self.unstable_fired, validation_failed=self.validation_failed,
+            )
+        except Exception:
+            logger.exception("Failed to record metrics")
+
+    def _record_journal(self, response: HttpResponse, duration_ns: int) -> None:
+        """Append the finished request to the journal (never fails the request)."""
+        try:
+            get_journal().record(
+                self.method,
+                getattr(self, "req_path", req_path_generate(self.path)),
+                {k: v[0] if len(v) == 1 else v for k, v in self.request.GET.lists()},
+                dict(self.request.headers),
+                None if isinstance(self.data, HttpResponse) else self.data,
+                self.mock.path if self.mock else None,
+                response.status_code,
+                duration_ns,
+            )
+        except Exception:
+            logger.exception("Failed to record request in journal")
+
     def _error_response(self, message: str, response_class) -> HttpResponse:
         """Generate a standardized JSON error response."""
         return response_class(
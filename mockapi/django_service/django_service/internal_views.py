@@ -0,0 +1,108 @@
+import json
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse, HttpResponseBadRequest, HttpResponseNotAllowed, HttpResponseNotFound, JsonResponse
+
+from ...core.metrics.metrics import registry
+from ...core.journal.journal import get_journal
+from ...core.model.model import Mock
+from ...core.store.store import request_store
+
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """Expose request metrics in the Prometheus text format."""
+    if not getattr(settings, "MOCKAPI_METRICS", False):
+        return HttpResponseNotFound("metrics are disabled", content_type="text/plain")
+    return HttpResponse(registry.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def admin_mocks_view(request: HttpRequest) -> HttpResponse:
+    """
+    GET  - list the mocks currently served.
+    POST - apply a batch: {"upsert": [mock, ...], "delete": [{"path", "method"}, ...], "replace": bool, "persist": bool}.
+    Mocks with a response_file are refused: files are only served from mocks files.
+    """
+    if not getattr(settings, "MOCKAPI_ADMIN_API", False):
+        return _error("admin api is disabled", HttpResponseNotFound)
+
+    if request.method == "GET":
+        return JsonResponse(list(request_store(request).current().entries), safe=False)
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["GET", "POST"])
+
+    try:
+        batch = json.loads(request.body or b"{}")
+    except Exception:
+        return _error("invalid json body", HttpResponseBadRequest)
+    if isinstance(batch, list):
+        batch = {"upsert": batch}
+    if not isinstance(batch, dict):
+        return _error("body must be an object or an array of mocks", HttpResponseBadRequest)
+
+    upserts = batch.get("upsert") or []
+    deletes = batch.get("delete") or []
+    for name, items in (("upsert", upserts), ("delete", deletes)):
+        if not isinstance(items, list) or not all(isinstance(m, dict) and isinstance(m.get("path"), str) for m in items):
+            return _error(f"{name} must be an array of objects with a string path", HttpResponseBadRequest)
+    for i, m in enumerate(upserts):
+        try:
+            mock = Mock(m)
+        except ValueError as e:
+            return _error(f"upsert[{i}] ({m['path']}): {e}", HttpResponseBadRequest)
+        # any client of the api could otherwise read any file the server can
+        if mock.files:
+            return _error(f"upsert[{i}] ({m['path']}): response_file can't be set through the admin api", HttpResponseBadRequest)
+    for i, d in enumerate(deletes):
+        method, match = d.get("method", "GET"), d.get("match")
+        if not (isinstance(method, str) or isinstance(method, list) and all(isinstance(x, str) for x in method)):
+            return _error(f"delete[{i}] ({d['path']}): method must be a string or a list of strings", HttpResponseBadRequest)
+        if match is not None and not isinstance(match, dict):
+            return _error(f"delete[{i}] ({d['path']}): match must be an object", HttpResponseBadRequest)
+
+    store = request_store(request)
+    persist = bool(batch.get("persist", getattr(settings, "MOCKAPI_ADMIN_PERSIST", False)))
+    if batch.get("replace"):
+        snapshot = store.replace(upserts, persist=persist)
+        return JsonResponse({"upserted": len(upserts), "deleted": 0, "total": len(snapshot.items)})
+    return JsonResponse(store.apply(upserts, deletes, persist=persist))
+
+
+def journal_view(request: HttpRequest) -> HttpResponse:
+    """
+    GET    - recent requests, filtered by ?path=, ?method=, ?mock=, ?since=, ?until= (unix time) and ?limit=.
+    DELETE - forget all recorded requests.
+    """
+    if not getattr(settings, "MOCKAPI_JOURNAL", False):
+        return _error("journal is disabled", HttpResponseNotFound)
+
+    journal = get_journal()
+    if request.method == "DELETE":
+        journal.clear()
+        return HttpResponse(status=204)
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET", "DELETE"])
+
+    try:
+        since = float(request.GET["since"]) if "since" in request.GET else None
+        until = float(request.GET["until"]) if "until" in request.GET else None
+        limit = int(request.GET.get("limit", 100))
+    except ValueError:
+        return _error("since, until and limit must be numbers", HttpResponseBadRequest)
+    if limit < 0:
+        return _error("limit must not be negative", HttpResponseBadRequest)
+
+    records = journal.query(
+        path=request.GET.get("path"),
+        method=request.GET.get("method", "").upper() or None,
+        mock=request.GET.get("mock"),
+        since=since,
+        until=until,
+        limit=limit,
+    )
+    return HttpResponse(json.dumps(records, ensure_ascii=False, default=str), content_type="application/json")
+
+
+def _error(message: str, response_class) -> HttpResponse:
+    return response_class(json.dumps({"error": message}, ensure_ascii=False), content_type="application/json")
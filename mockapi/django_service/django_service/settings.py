@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 from mockapi.core.config.config import get_config_value
 
@@ -15,4 +16,27 @@ MIDDLEWARE = []
 ROOT_URLCONF = "mockapi.django_service.django_service.urls"
 WSGI_APPLICATION = "mockapi.django_service.django_service.wsgi.application"
 
-APPEND_SLASH = get_config_value("append_slash", False, bool)
\ No newline at end of file
+APPEND_SLASH = get_config_value("append_slash", False, bool)
+MOCKAPI_METRICS = get_config_value("metrics", False, bool)
+MOCKAPI_SERVER_TIMING = get_config_value("server_timing", False, bool)
+MOCKAPI_PROFILE_EVERY = get_config_value("profile_every", 0, int)
+MOCKAPI_PROFILE_DIR = get_config_value("profile_dir", "mockapi-profiles")
+MOCKAPI_ADMIN_API = get_config_value("admin_api", False, bool)
+MOCKAPI_ADMIN_PERSIST = get_config_value("admin_persist", False, bool)
+MOCKAPI_ADMIN_PERSIST_DELAY = get_config_value("admin_persist_delay", 1.0, (int, float))
+MOCKAPI_JOURNAL = get_config_value("journal", False, bool)
+MOCKAPI_JOURNAL_SIZE = get_config_value("journal_size", 1000, int)
+MOCKAPI_JOURNAL_FILE = get_config_value("journal_file", None)
+MOCKAPI_JOURNAL_MAX_BYTES = get_config_value("journal_max_bytes", 10 * 1024 * 1024, int)
+MOCKAPI_JOURNAL_BACKUPS = get_config_value("journal_backups", 3, int)
+MOCKAPI_SHARED_STATE = get_config_value("shared_state", False, bool)
+MOCKAPI_SHARED_STATE_NAME = get_config_value("shared_state_name", f"mockapi_{get_config_value('port', '8000')}")
+MOCKAPI_SHARED_STATE_SLOTS = get_config_value("shared_state_slots", 4096, int)
+
+# Record/replay mode is chosen per run by the "record" and "start --replay" commands.
+MOCKAPI_MODE = os.environ.get("MOCKAPI_MODE", "")
+MOCKAPI_UPSTREAM = os.environ.get("MOCKAPI_UPSTREAM")
+MOCKAPI_UPSTREAM_TIMEOUT = get_config_value("upstream_timeout", 30, (int, float))
+MOCKAPI_REPLAY_DIR = os.environ.get("MOCKAPI_REPLAY_DIR")
+MOCKAPI_REPLAY_LATENCY = os.environ.get("MOCKAPI_REPLAY_LATENCY") == "1"
+MOCKAPI_REPLAY_QUERY_KEYS = [k for k in os.environ["MOCKAPI_REPLAY_QUERY_KEYS"].split(",") if k] if "MOCKAPI_REPLAY_QUERY_KEYS" in os.environ else None
\ No newline at end of file
@@ -1,7 +1,11 @@
 from .dynamic_view import dynamic_view
+from .internal_views import admin_mocks_view, journal_view, metrics_view
 from django.urls import re_path
 
 
 urlpatterns = [
+    re_path(r'^__mockapi/metrics/?$', metrics_view),
+    re_path(r'^__mockapi/admin/mocks/?$', admin_mocks_view),
+    re_path(r'^__mockapi/journal/?$', journal_view),
     re_path(r'^(?P<path>.*)$', dynamic_view),
-]
\ No newline at end of file
+]
@@ -4,14 +4,19 @@ import subprocess
 import sys
 import click
 import json
+import urllib.error
+import urllib.request
 from pathlib import Path
 
 
-from ..mockapi.settings import HOST, PORT
-from ..mockapi.messages import HELP_TEXT_FOR_ADD_COMMAND, HELP_TEXT_FOR_ADD_SETTINGS_COMMAND, HELP_TEXT_FOR_START_COMMAND, HELP_TEXT_FOR_SET_DEFAULT
+from ..mockapi.settings import HOST, PORT, SHARED_STATE, SHARED_STATE_NAME, SHARED_STATE_SLOTS
+from ..mockapi.messages import HELP_TEXT_FOR_ADD_COMMAND, HELP_TEXT_FOR_ADD_SETTINGS_COMMAND, HELP_TEXT_FOR_START_COMMAND, HELP_TEXT_FOR_SET_DEFAULT, HELP_TEXT_FOR_ADMIN_COMMAND, HELP_TEXT_FOR_RECORD_COMMAND, HELP_TEXT_FOR_CHECK_COMMAND
 from ..core.io.constants import MOCKS_FILE_PATH, SETTINGS_FILE_PATH, MOCKS_FILE_EXAMPLE_PATH ,SETTINGS_FILE_EXAMPLE_PATH
 
 
+DEFAULT_RECORDINGS_DIR = "mockapi-recordings"
+
+
 @click.group()
 def cli():
     pass
@@ -37,6 +42,27 @@ def add(user_file: Path) -> None:
     click.echo(f"✅ {user_file} successfully copied to {MOCKS_FILE_PATH}")
 
 
+@cli.command(help=HELP_TEXT_FOR_CHECK_COMMAND)
+@click.argument("paths", nargs=-1, type=click.Path(exists=True, readable=True))
+@click.option("--jobs", "-j", default=None, type=click.IntRange(min=1), help="Worker processes (default: CPU count).")
+@click.option("--strict", is_flag=True, help="Also fail on warnings.")
+def check(paths: tuple[str, ...], jobs: int | None, strict: bool) -> None:
+    """Validate mocks files and exit non-zero on errors."""
+    # imported here: the checker loads Django and the mock model, which the other commands don't need
+    from ..core.check.check import ERROR, WARNING, check_paths
+
+    count, issues = check_paths(paths or (str(MOCKS_FILE_PATH),), jobs)
+    for issue in issues:
+        click.echo(str(issue))
+
+    errors = sum(1 for i in issues if i.level == ERROR)
+    warnings = sum(1 for i in issues if i.level == WARNING)
+    failed = errors or (strict and warnings)
+    click.echo(f"{'❌' if failed else '✅'} {count} mocks checked: {errors} errors, {warnings} warnings")
+    if failed:
+        sys.exit(1)
+
+
 @cli.command(help=HELP_TEXT_FOR_ADD_SETTINGS_COMMAND)
 @click.argument("user_file", type=click.Path(exists=True, dir_okay=False, readable=True))
 def add_settings(user_file: Path) -> None:
@@ -59,17 +85,64 @@ def add_settings(user_file: Path) -> None:
 
 @cli.command(help=HELP_TEXT_FOR_START_COMMAND)
 @click.option("--file", "json_file", default=str(MOCKS_FILE_PATH), type=click.Path(exists=True, dir_okay=False, readable=True))
-def start(json_file) -> None:
+@click.option("--replay", "replay_dir", is_flag=False, flag_value=DEFAULT_RECORDINGS_DIR, default=None,
+              type=click.Path(file_okay=False))
+@click.option("--replay-latency", is_flag=True, default=False)
+@click.option("--query-keys", default=None, type=click.STRING)
+def start(json_file, replay_dir, replay_latency, query_keys) -> None:
     """Start Django server serving mocks from the given JSON file."""
     click.echo(f"🚀 Starting server with mocks from {json_file}...")
 
     os.environ["MOCKS_FILE"] = str(Path(json_file).resolve())
+    if replay_dir:
+        click.echo(f"📼 Replaying recorded exchanges from {replay_dir}")
+        os.environ["MOCKAPI_MODE"] = "replay"
+        os.environ["MOCKAPI_REPLAY_DIR"] = str(Path(replay_dir).resolve())
+        os.environ["MOCKAPI_REPLAY_LATENCY"] = "1" if replay_latency else "0"
+        if query_keys is not None:
+            os.environ["MOCKAPI_REPLAY_QUERY_KEYS"] = query_keys
+    _runserver()
+
+
+@cli.command(help=HELP_TEXT_FOR_RECORD_COMMAND)
+@click.option("--upstream", required=True, type=click.STRING)
+@click.option("--dir", "record_dir", default=DEFAULT_RECORDINGS_DIR, type=click.Path(file_okay=False))
+@click.option("--query-keys", default=None, type=click.STRING)
+def record(upstream: str, record_dir: str, query_keys: str | None) -> None:
+    """Start Django server as a proxy that records upstream exchanges."""
+    click.echo(f"⏺️ Recording {upstream} into {record_dir}...")
+
+    os.environ["MOCKAPI_MODE"] = "record"
+    os.environ["MOCKAPI_UPSTREAM"] = upstream
+    os.environ["MOCKAPI_REPLAY_DIR"] = str(Path(record_dir).resolve())
+    if query_keys is not None:
+        os.environ["MOCKAPI_REPLAY_QUERY_KEYS"] = query_keys
+    _runserver()
+
+
+def _runserver() -> None:
     os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mockapi.django_service.django_service.settings")
-
+    # this process owns the shared state block: the server processes only attach to it
+    shared_state = _create_shared_state() if SHARED_STATE else None
     try:
         subprocess.run([sys.executable, "-m", "django", "runserver", f"{HOST}:{PORT}"])
     except KeyboardInterrupt:
         click.echo("\n🛑 Server stopped by user")
+    finally:
+        if shared_state is not None:
+            shared_state.unlink()
+
+
+def _create_shared_state():
+    """Create the shared state block for the server processes (None, with a message, if it can't be)."""
+    # imported here: the other commands don't need Django
+    from ..core.shared.shared_state import SharedState
+
+    try:
+        return SharedState(SHARED_STATE_NAME, SHARED_STATE_SLOTS, create=True)
+    except Exception as e:
+        click.echo(f"⚠️ Can't create shared state {SHARED_STATE_NAME!r}, counters will be per process: {e}")
+        return None
 
 
 @cli.command(help=HELP_TEXT_FOR_SET_DEFAULT)
@@ -99,4 +172,81 @@ def set_default(file_name: str) -> None:
     except FileNotFoundError as e:
         click.echo(f"Error: {e}")
     except Exception as e:
-        click.echo(f"Unexpected error: {e}")
\ No newline at end of file
+        click.echo(f"Unexpected error: {e}")
+
+
+ADMIN_MOCKS_URL = f"http://{HOST}:{PORT}/__mockapi/admin/mocks"
+
+
+def _admin_request(url: str, payload: dict | None = None):
+    """Send a request to the admin API and return the decoded JSON answer (None on error)."""
+    data = json.dumps(payload).encode("utf-8") if payload is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req) as resp:
+            return json.loads(resp.read() or b"null")
+    except urllib.error.HTTPError as e:
+        click.echo(f"❌ Server answered {e.code}: {e.read().decode('utf-8', 'replace')}")
+    except urllib.error.URLError as e:
+        click.echo(f"❌ Can't reach {url}: {e.reason}")
+    return None
+
+
+@cli.group(help=HELP_TEXT_FOR_ADMIN_COMMAND)
+def admin() -> None:
+    pass
+
+
+@admin.command("push")
+@click.argument("user_file", type=click.Path(exists=True, dir_okay=False, readable=True))
+@click.option("--persist/--no-persist", default=None,
+              help="Write the result back to the mocks file or not (default: the admin_persist setting).")
+@click.option("--replace", is_flag=True, default=None, help="Replace all mocks instead of upserting (default: as the file says).")
+@click.option("--url", default=ADMIN_MOCKS_URL, show_default=True)
+def admin_push(user_file: Path, persist: bool | None, replace: bool | None, url: str) -> None:
+    """Upsert mocks from a JSON file (an array of mocks or an {"upsert": [...], "delete": [...]} batch)."""
+    try:
+        with open(user_file, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except json.JSONDecodeError:
+        click.echo("❌ File contains invalid JSON")
+        return
+
+    batch = {"upsert": data} if isinstance(data, list) else data
+    if not isinstance(batch, dict):
+        click.echo("❌ JSON must be an array of mock objects or a batch object")
+        return
+    if persist is not None:
+        batch["persist"] = persist
+    if replace is not None:
+        batch["replace"] = replace
+
+    result = _admin_request(url, batch)
+    if result is not None:
+        click.echo(f"✅ upserted: {result['upserted']}, deleted: {result['deleted']}, total: {result['total']}")
+
+
+@admin.command("delete")
+@click.option("--path", "mock_path", required=True, type=click.STRING)
+@click.option("--method", "methods", multiple=True, default=("GET",), show_default=True)
+@click.option("--persist/--no-persist", default=None,
+              help="Write the result back to the mocks file or not (default: the admin_persist setting).")
+@click.option("--url", default=ADMIN_MOCKS_URL, show_default=True)
+def admin_delete(mock_path: str, methods: tuple[str, ...], persist: bool | None, url: str) -> None:
+    """Delete the mock with the given path and method(s)."""
+    method = methods[0] if len(methods) == 1 else list(methods)
+    batch = {"delete": [{"path": mock_path, "method": method}]}
+    if persist is not None:
+        batch["persist"] = persist
+    result = _admin_request(url, batch)
+    if result is not None:
+        click.echo(f"✅ deleted: {result['deleted']}, total: {result['total']}")
+
+
+@admin.command("list")
+@click.option("--url", default=ADMIN_MOCKS_URL, show_default=True)
+def admin_list(url: str) -> None:
+    """Print the mocks currently served."""
+    result = _admin_request(url)
+    if result is not None:
+        click.echo(json.dumps(result, ensure_ascii=False, indent=2))
\ No newline at end of file
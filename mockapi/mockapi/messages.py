@@ -42,7 +42,27 @@ Usage:
     python -m mockapi start [OPTIONS]
 
 Options:
-    --file PATH JSON file containing mocks (default: mocks.json)"""
+    --file PATH         JSON file containing mocks (default: mocks.json)
+    --replay [DIR]      Serve exchanges recorded with "record" first (default: mockapi-recordings)
+    --replay-latency    Also reproduce the recorded upstream latency
+    --query-keys KEYS   With --replay: query parameters that identify a request
+                        (default: the ones the recording was made with)"""
+
+
+HELP_TEXT_FOR_RECORD_COMMAND = """
+Start the server as a recording proxy in front of a real upstream.
+
+Usage:
+    python -m mockapi record --upstream URL [OPTIONS]
+
+Options:
+    --upstream URL      Server the requests are forwarded to
+    --dir DIR           Where exchanges are stored (default: mockapi-recordings)
+    --query-keys KEYS   Comma-separated query parameters that identify a request (default: all)
+
+Every exchange is stored by a fingerprint of method, path, query and body.
+The query keys are saved with the recordings and used again on replay.
+Serve them later with: python -m mockapi start --replay DIR"""
 
 
 class Hello:
@@ -84,4 +104,27 @@ class Hello:
  """
     
 
-HELP_TEXT_FOR_SET_DEFAULT = """Set default data JSON files (settings, mocks, or both)."""
\ No newline at end of file
+HELP_TEXT_FOR_SET_DEFAULT = """Set default data JSON files (settings, mocks, or both)."""
+
+
+HELP_TEXT_FOR_ADMIN_COMMAND = """
+Change the mocks of a running server without restarting it.
+
+Usage:
+    python -m mockapi admin push <user_file> [--persist | --no-persist] [--replace]
+    python -m mockapi admin delete --path <path> [--method <method> ...] [--persist | --no-persist]
+    python -m mockapi admin list
+
+Requires "admin_api": true in settings.json."""
+
+HELP_TEXT_FOR_CHECK_COMMAND = """
+Check mocks files against the full mock format without starting the server.
+
+Usage:
+    python -m mockapi check [PATHS...] [--jobs N] [--strict]
+
+Arguments:
+    PATHS       Mocks files or directories (every *.json inside is checked). Default: mocks.json
+
+Reports malformed fields (delay, generate_response, if conditions, unknown Faker providers, ...),
+duplicate and shadowed mocks. Exits with 1 if errors were found (or warnings, with --strict)."""
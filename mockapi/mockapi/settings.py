@@ -4,4 +4,7 @@ VERSION: str = get_version()
 
 HOST: str = get_config_value("host", "127.0.0.1")
 PORT: str = get_config_value("port", "8000")
-APPEND_SLASH: bool = get_config_value("append_slash", False, bool)
\ No newline at end of file
+APPEND_SLASH: bool = get_config_value("append_slash", False, bool)
+SHARED_STATE: bool = get_config_value("shared_state", False, bool)
+SHARED_STATE_NAME: str = get_config_value("shared_state_name", f"mockapi_{PORT}")
+SHARED_STATE_SLOTS: int = get_config_value("shared_state_slots", 4096, int)
@@ -0,0 +1,32 @@
+"""
+Serve mocks from inside a test process.
+
+MockServer runs mockapi in a background thread on a free port. With pytest, once this module is
+enabled as a plugin (`pytest_plugins = ["mockapi.testing"]` in conftest.py), the `mock_server`
+fixture gives each test its own running server, filled from the test's `mocks` marker:
+
+    @pytest.mark.mocks([{"path": "/users/", "response": []}])
+    def test_empty(mock_server):
+        ...
+"""
+from .core.testing.testing import MockServer
+
+try:
+    import pytest
+except ImportError:  # MockServer works without pytest
+    pytest = None
+
+
+__all__ = ["MockServer"]
+
+
+if pytest is not None:
+    def pytest_configure(config):
+        config.addinivalue_line("markers", "mocks(mocks): mocks served by the mock_server fixture (a list, a mock or a path)")
+
+    @pytest.fixture
+    def mock_server(request):
+        """A MockServer running for the duration of the test."""
+        marker = request.node.get_closest_marker("mocks")
+        with MockServer(marker.args[0] if marker and marker.args else None) as server:
+            yield server
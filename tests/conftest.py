@@ -0,0 +1,41 @@
+import json
+import os
+import urllib.error
+import urllib.request
+
+import django
+import pytest
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "mockapi.django_service.django_service.settings")
+django.setup()
+
+pytest_plugins = ["mockapi.testing"]
+
+
+class Reply:
+    """An HTTP answer read in full: status, headers and body (json() decodes it)."""
+
+    def __init__(self, status: int, headers, body: bytes):
+        self.status = status
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        return json.loads(self.body)
+
+
+@pytest.fixture
+def http():
+    """http(method, url, body=None, headers=None) -> Reply; error statuses are returned, not raised."""
+    def send(method: str, url: str, body=None, headers: dict | None = None) -> Reply:
+        headers = dict(headers or {})
+        if body is not None and not isinstance(body, bytes):
+            body = json.dumps(body).encode("utf-8")
+            headers.setdefault("Content-Type", "application/json")
+        request = urllib.request.Request(url, data=body, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                return Reply(response.status, response.headers, response.read())
+        except urllib.error.HTTPError as e:
+            return Reply(e.code, e.headers, e.read())
+    return send
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+from click.testing import CliRunner
+from django.test import override_settings
+
+from mockapi.core.store.store import MockStore
+from mockapi.mockapi import main
+
+
+pytestmark = pytest.mark.mocks([{"path": "/a/", "response": "a"}, {"path": "/b/", "response": "b"}])
+
+
+@override_settings(MOCKAPI_ADMIN_API=True)
+def test_upsert_replaces_and_appends(mock_server, http):
+    admin = mock_server.url + "/__mockapi/admin/mocks"
+    reply = http("POST", admin, [{"path": "/a/", "response": "a2"}, {"path": "/c/", "response": "c"}])
+    assert reply.json() == {"upserted": 2, "deleted": 0, "total": 3}
+
+    assert http("GET", mock_server.url + "/a/").json() == "a2"
+    assert http("GET", mock_server.url + "/c/").json() == "c"
+    assert [m["path"] for m in http("GET", admin).json()] == ["/a/", "/b/", "/c/"]
+
+
+@override_settings(MOCKAPI_ADMIN_API=True)
+def test_batch_deletes_and_replace(mock_server, http):
+    admin = mock_server.url + "/__mockapi/admin/mocks"
+    reply = http("POST", admin, {"delete": [{"path": "/b/", "method": "GET"}, {"path": "/nope/"}]})
+    assert reply.json() == {"upserted": 0, "deleted": 1, "total": 1}
+    assert http("GET", mock_server.url + "/b/").status == 404
+
+    reply = http("POST", admin, {"upsert": [{"path": "/only/"}], "replace": True})
+    assert reply.json()["total"] == 1
+    assert http("GET", mock_server.url + "/a/").status == 404
+
+
+@override_settings(MOCKAPI_ADMIN_API=True)
+def test_invalid_upserts_are_refused_as_a_whole(mock_server, http):
+    admin = mock_server.url + "/__mockapi/admin/mocks"
+    reply = http("POST", admin, [{"path": "/new/"}, {"path": "/bad/", "delay": 1, "unstable": "x"}])
+    assert reply.status == 400 and "upsert[1]" in reply.json()["error"]
+    assert http("POST", admin, b"{").status == 400
+    assert http("POST", admin, {"delete": [{"path": "/a/", "method": 1}]}).status == 400
+    assert http("POST", admin, {"delete": [{"path": "/a/", "method": [None]}]}).status == 400
+    assert http("GET", mock_server.url + "/new/").status == 404
+
+
+def test_admin_api_is_off_by_default(mock_server, http):
+    assert http("GET", mock_server.url + "/__mockapi/admin/mocks").status == 404
+
+
+def test_persist_writes_the_mocks_file(tmp_path):
+    path = tmp_path / "mocks.json"
+    path.write_text(json.dumps([{"path": "/a/"}]))
+    store = MockStore(path=path, persist_delay=0)
+    store.apply([{"path": "/b/", "response": 1}])
+    store.persist()
+    assert json.loads(path.read_text()) == [{"path": "/a/"}, {"path": "/b/", "response": 1}]
+    # what was written is not loaded again
+    snapshot = store.current()
+    assert store.current() is snapshot
+
+
+@pytest.mark.parametrize("args, persist", [([], "unset"), (["--persist"], True), (["--no-persist"], False)])
+def test_push_sends_persist_only_when_given(tmp_path, monkeypatch, args, persist):
+    sent = []
+    monkeypatch.setattr(main, "_admin_request", lambda url, batch: sent.append(batch))
+    mocks = tmp_path / "mocks.json"
+    mocks.write_text(json.dumps([{"path": "/a/"}]))
+    assert CliRunner().invoke(main.cli, ["admin", "push", str(mocks), *args]).exit_code == 0
+    assert sent[0].get("persist", "unset") == persist
+
+
+def test_push_keeps_the_replace_of_the_file(tmp_path, monkeypatch):
+    sent = []
+    monkeypatch.setattr(main, "_admin_request", lambda url, batch: sent.append(batch))
+    batch, mocks = tmp_path / "batch.json", tmp_path / "mocks.json"
+    batch.write_text(json.dumps({"upsert": [{"path": "/a/"}], "replace": True}))
+    mocks.write_text(json.dumps([{"path": "/a/"}]))
+    for path in (batch, mocks):
+        assert CliRunner().invoke(main.cli, ["admin", "push", str(path)]).exit_code == 0
+    assert sent[0]["replace"] is True and "replace" not in sent[1]
@@ -0,0 +1,32 @@
+import os
+import tempfile
+
+from benchmarks.runner import compare, run
+from benchmarks.stages import build_cases
+
+
+SCENARIOS = [("tiny-small", 3, "small")]
+
+
+def test_build_cases_names_every_case_and_removes_scratch_files():
+    tmp = tempfile.gettempdir()
+    before = os.environ.get("MOCKS_FILE")
+    names, scratch, existing = [], set(), set(os.listdir(tmp))
+    for name, func in build_cases(SCENARIOS, only={"load_mocks", "file_response", "snapshot_find"}):
+        names.append(name)
+        func()
+        scratch.update(p for p in os.listdir(tmp) if p.startswith("mockapi-bench-") and p not in existing)
+    assert names == ["snapshot_find[tiny-small]", "load_mocks[tiny-small]", "file_response[small]"]
+    assert scratch and not scratch & set(os.listdir(tmp))
+    assert os.environ.get("MOCKS_FILE") == before
+
+
+def test_run_and_compare_flag_regressions():
+    document = run([("noop", lambda: None)], rounds=1, echo=lambda line: None)
+    assert document["results"]["noop"]["median_ns"] > 0
+
+    baseline = {"results": {"a": {"median_ns": 100}, "b": {"median_ns": 100}}}
+    current = {"results": {"a": {"median_ns": 150}, "b": {"median_ns": 105}, "new": {"median_ns": 1}}}
+    rows = {row["name"]: row for row in compare(baseline, current, threshold=0.1)}
+    assert set(rows) == {"a", "b"}
+    assert rows["a"]["regression"] and not rows["b"]["regression"]
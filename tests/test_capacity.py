@@ -0,0 +1,50 @@
+import random
+import threading
+
+import pytest
+
+from mockapi.core.capacity.capacity import admit, in_flight, release, sojourn_time
+from mockapi.core.model.model import CapacitySpec
+
+
+@pytest.mark.mocks([{
+    "path": "/busy/",
+    "response": "done",
+    "capacity": {"workers": 1, "service_time": 5, "queue_limit": 0, "group": "db"},
+}, {
+    "path": "/busy-too/",
+    "capacity": {"workers": 1, "service_time": 5, "queue_limit": 0, "group": "db", "response": "later"},
+}])
+def test_requests_over_the_queue_limit_are_shed(mock_server, http):
+    spec = mock_server.store.current().mocks[0].capacity
+    assert spec.key == mock_server.namespace + "group:db"
+    # the first request holds the only worker
+    assert admit(spec) is not None
+    try:
+        shed = http("GET", mock_server.url + "/busy/")
+        assert shed.status == 503 and shed.json() == {"error": "over capacity"}
+        assert float(shed.headers["Retry-After"]) >= 1
+        assert http("GET", mock_server.url + "/busy-too/").json() == "later"
+        assert in_flight(spec) == 1
+    finally:
+        release(spec)
+    assert in_flight(spec) == 0
+
+
+@pytest.mark.mocks([{"path": "/queue/", "response": "ok", "capacity": {"workers": 2, "service_time": 0.01}}])
+def test_requests_are_released_after_being_served(mock_server, http):
+    threads = [threading.Thread(target=http, args=("GET", mock_server.url + "/queue/")) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert in_flight(mock_server.store.current().mocks[0].capacity) == 0
+
+
+def test_sojourn_time_grows_with_the_queue():
+    spec = CapacitySpec.from_dict({"workers": 2, "service_time": 0.1}, "GET:/x/")
+    random.seed(1)
+    mean = lambda in_system: sum(sojourn_time(spec, in_system) for _ in range(2000)) / 2000
+    # served at once: one service time; 4 requests ahead of 2 workers: 2 service times of waiting more
+    assert mean(1) == pytest.approx(0.1, rel=0.15)
+    assert mean(6) == pytest.approx(0.3, rel=0.15)
@@ -0,0 +1,70 @@
+import json
+
+from click.testing import CliRunner
+
+from mockapi.core.check.check import ERROR, WARNING, check_mock, check_paths, check_routes
+from mockapi.mockapi.main import cli
+
+
+def test_single_mock_problems():
+    assert check_mock({"path": "/ok/", "response": {}}) == []
+    assert check_mock([]) == [(ERROR, "mock must be an object")]
+    assert check_mock({"response": {}}) == [(ERROR, "path must be a string, got None")]
+    assert (WARNING, "path doesn't start with '/' and never matches a request") in check_mock({"path": "ok/"})
+    assert any(level == ERROR and "status" in message for level, message in check_mock({"path": "/s/", "status": 99}))
+    assert any(level == WARNING and "unknown type" in message for level, message in check_mock({"path": "/t/", "type": "x"}))
+    assert any(level == WARNING and "WSGI" in message for level, message in check_mock({"path": "/p/", "throughput": 100}))
+    assert not any("WSGI" in message for _, message in check_mock({"path": "/p/", "fault": {"type": "truncate"}}))
+
+
+def test_routes_that_are_never_served():
+    entries = [
+        {"path": "/a/", "method": ["GET", "POST"]},
+        {"path": "/a/"},
+        {"path": "/a/", "method": ["POST", "PUT"]},
+        {"path": "/b/", "match": {"query": {"x": "1"}}},
+        {"path": "/b/", "match": {"query": {"x": "1"}}},
+        {"path": "/r", "type": "resource"},
+        {"path": "/r/", "type": "resource"},
+    ]
+    found = [(i.level, i.index, i.message) for i in check_routes("mocks.json", entries)]
+    assert found == [
+        (ERROR, 1, "never served, shadowed by #0"),
+        (WARNING, 2, "POST already served by #0"),
+        (ERROR, 4, "duplicate of #3 (same match)"),
+        (ERROR, 6, "duplicate resource, #5 is served instead"),
+    ]
+
+
+def test_files_and_directories(tmp_path):
+    (tmp_path / "good.json").write_text(json.dumps([{"path": "/a/"}, {"path": "/b/"}]))
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "nested" / "bad.json").write_text(json.dumps([{"path": "/a/", "status": "x"}] * 600))
+    (tmp_path / "broken.json").write_text("{")
+    count, issues = check_paths([tmp_path], jobs=2)
+    assert count == 602
+    assert sum(1 for i in issues if "status must be" in i.message) == 600
+    assert any(i.file.endswith("broken.json") and i.index is None for i in issues)
+
+
+def test_cli_exit_code(tmp_path):
+    good, warned, bad = tmp_path / "good.json", tmp_path / "warned.json", tmp_path / "bad.json"
+    good.write_text(json.dumps([{"path": "/a/"}]))
+    warned.write_text(json.dumps([{"path": "a/"}]))
+    bad.write_text(json.dumps([{"path": "/a/", "status": 1000}]))
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ["check", str(good)])
+    assert result.exit_code == 0 and "1 mocks checked: 0 errors, 0 warnings" in result.output
+    assert runner.invoke(cli, ["check", str(warned)]).exit_code == 0
+    assert runner.invoke(cli, ["check", "--strict", str(warned)]).exit_code == 1
+    result = runner.invoke(cli, ["check", "-j", "1", str(bad)])
+    assert result.exit_code == 1 and f"{bad}:0 /a/: error:" in result.output
+
+
+def test_response_files_are_checked_from_the_mocks_file(tmp_path):
+    (tmp_path / "data.bin").write_bytes(b"x")
+    assert check_mock({"path": "/f/", "response_file": "data.bin"}, str(tmp_path)) == []
+    for outside in ("../data.bin", str(tmp_path / "data.bin")):
+        issues = check_mock({"path": "/f/", "response_file": outside}, str(tmp_path))
+        assert any(level == WARNING and "outside" in message for level, message in issues)
@@ -0,0 +1,82 @@
+import gc
+import json
+
+import pytest
+from django.test import override_settings
+
+from mockapi.core.files.files import maps, parse_range
+from mockapi.testing import MockServer
+
+
+DATA = bytes(range(256)) * 40  # 10240 bytes
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    path = tmp_path / "data.bin"
+    path.write_bytes(DATA)
+    return str(path)
+
+
+def test_parse_range():
+    assert parse_range("bytes=0-99", 1000) == (0, 100)
+    assert parse_range("bytes=900-", 1000) == (900, 1000)
+    assert parse_range("bytes=-100", 1000) == (900, 1000)
+    assert parse_range("bytes=990-2000", 1000) == (990, 1000)
+    assert parse_range("bytes=1000-", 1000) is False
+    assert parse_range("bytes=-0", 1000) is False
+    assert parse_range("bytes=5-1", 1000) is None
+    assert parse_range("bytes=0-1,5-9", 1000) is None
+    assert parse_range("items=0-1", 1000) is None
+
+
+def test_whole_file_ranges_and_conditional_requests(mock_server, http, data_file):
+    mock_server.add({"path": "/file/", "response_file": data_file})
+    url = mock_server.url + "/file/"
+
+    whole = http("GET", url)
+    assert whole.status == 200 and whole.body == DATA
+    assert whole.headers["Content-Type"] == "application/octet-stream"
+    assert whole.headers["Accept-Ranges"] == "bytes" and whole.headers["ETag"]
+
+    part = http("GET", url, headers={"Range": "bytes=100-199"})
+    assert part.status == 206 and part.body == DATA[100:200]
+    assert part.headers["Content-Range"] == f"bytes 100-199/{len(DATA)}"
+    assert http("GET", url, headers={"Range": "bytes=-10"}).body == DATA[-10:]
+    assert http("GET", url, headers={"Range": "bytes=99999-"}).status == 416
+    assert http("GET", url, headers={"Range": "bytes=0-1,5-9"}).body == DATA
+    assert http("GET", url, headers={"Range": "bytes=0-9", "If-Range": '"old"'}).status == 200
+
+    assert http("GET", url, headers={"If-None-Match": whole.headers["ETag"]}).status == 304
+
+
+def test_maps_are_dropped_with_their_mocks(mock_server, http, data_file):
+    gc.collect()
+    before = len(maps)
+    mock_server.add({"path": "/file/", "response_file": data_file, "content_type": "text/plain"})
+    part = http("GET", mock_server.url + "/file/", headers={"Range": "bytes=0-9"})
+    assert part.headers["Content-Type"] == "text/plain" and part.body == DATA[:10]
+    assert len(maps) == before + 1
+
+    mock_server.set_mocks([])
+    gc.collect()
+    assert len(maps) == before
+
+
+@override_settings(MOCKAPI_ADMIN_API=True)
+def test_admin_api_refuses_response_files(mock_server, http, data_file):
+    reply = http("POST", mock_server.url + "/__mockapi/admin/mocks", [{"path": "/x/", "sequence": [{"response_file": data_file}]}])
+    assert reply.status == 400 and "response_file" in reply.json()["error"]
+    assert mock_server.mocks == []
+
+
+def test_relative_paths_are_from_the_mocks_file(http, tmp_path, monkeypatch):
+    (tmp_path / "fx").mkdir()
+    (tmp_path / "fx" / "a.bin").write_bytes(DATA)
+    mocks = tmp_path / "mocks.json"
+    mocks.write_text(json.dumps([{"path": "/file/", "response_file": "fx/a.bin"}]))
+    monkeypatch.chdir(tmp_path.parent)
+    with MockServer(str(mocks)) as server:
+        assert http("GET", server.url + "/file/").body == DATA
+        server.set_mocks([{"path": "/file/", "response_file": "fx/a.bin"}])
+        assert http("GET", server.url + "/file/").status == 500
@@ -0,0 +1,81 @@
+import json
+import time
+
+import pytest
+from django.test import override_settings
+
+from mockapi.core.journal.journal import RequestJournal
+
+
+def _wait_for(predicate, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@override_settings(MOCKAPI_JOURNAL=True)
+@pytest.mark.mocks([{"path": "/journaled/", "method": ["GET", "POST"], "response": {}}])
+def test_journal_endpoint_records_and_filters(mock_server, http):
+    journal = mock_server.url + "/__mockapi/journal"
+    http("DELETE", journal)
+    http("GET", mock_server.url + "/journaled/?a=1")
+    http("POST", mock_server.url + "/journaled/", {"name": "x"})
+    http("GET", mock_server.url + "/unknown/")
+
+    records = http("GET", journal + "?path=/journaled/").json()
+    assert [(r["method"], r["status"]) for r in records] == [("GET", 200), ("POST", 200)]
+    assert records[0]["query"] == {"a": "1"} and records[1]["body"] == {"name": "x"}
+    assert records[0]["mock"] is not None
+
+    assert [r["method"] for r in http("GET", journal + "?method=post").json()] == ["POST"]
+    assert http("GET", journal + "?limit=0").json() == []
+    assert http("GET", journal + "?limit=-1").status == 400
+    assert http("GET", journal + "?since=x").status == 400
+
+    assert http("DELETE", journal).status in (200, 204)
+    assert http("GET", journal).json() == []
+
+
+def test_ring_keeps_the_most_recent_records():
+    journal = RequestJournal(capacity=3)
+    for i in range(5):
+        journal.record("GET", f"/{i}/", {}, {}, None, None, 200, 1_000_000)
+    assert [r["path"] for r in journal.query()] == ["/2/", "/3/", "/4/"]
+    assert [r["path"] for r in journal.query(limit=2)] == ["/3/", "/4/"]
+    assert journal.query(limit=0) == []
+    assert journal.query(since=time.time() + 60) == []
+
+
+def test_log_file_is_written_in_the_background_and_rotated(tmp_path):
+    log = tmp_path / "journal.log"
+    journal = RequestJournal(log_file=log, max_bytes=300, backups=2)
+    for i in range(10):
+        journal.record("GET", f"/{i}/", {}, {}, None, None, 200, 1_000_000)
+
+    def written():
+        try:
+            return {json.loads(line)["path"] for p in tmp_path.iterdir() for line in p.read_text().splitlines()}
+        except FileNotFoundError:  # rotated while read
+            return set()
+
+    _wait_for(lambda: "/9/" in written())
+    assert (tmp_path / "journal.log.1").exists()
+    assert not (tmp_path / "journal.log.3").exists()
+
+
+def test_credentials_are_redacted(tmp_path):
+    log = tmp_path / "journal.log"
+    journal = RequestJournal(log_file=log)
+    journal.record("GET", "/", {}, {"Authorization": "Bearer t", "Cookie": "s=1", "Accept": "*/*"}, None, None, 200, 0)
+    assert journal.query()[0]["headers"] == {"Authorization": "[redacted]", "Cookie": "[redacted]", "Accept": "*/*"}
+    _wait_for(lambda: log.exists() and log.read_text())
+    assert "Bearer" not in log.read_text()
+
+
+def test_records_past_the_pending_limit_are_dropped(tmp_path, monkeypatch):
+    journal = RequestJournal(log_file=tmp_path / "journal.log", max_pending=2)
+    monkeypatch.setattr(journal, "_start_writer", lambda: None)  # a writer that can't keep up
+    for i in range(5):
+        journal.record("GET", f"/{i}/", {}, {}, None, None, 200, 0)
+    assert journal.dropped == 3 and len(journal.query()) == 5
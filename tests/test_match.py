@@ -0,0 +1,69 @@
+import pytest
+
+from mockapi.core.django_service.view.matcher import MatchContext
+from mockapi.core.store.store import MockSnapshot
+
+
+ORDERS = [
+    {"path": "/orders/", "match": {"query": {"status": "active"}}, "response": "active"},
+    {"path": "/orders/", "match": {"query": {"status": "archived"}}, "response": "archived"},
+    {"path": "/orders/", "match": {"headers": {"Authorization": "regex:^Bearer "}}, "response": "token"},
+    {"path": "/orders/", "method": "POST", "match": {"body": {"user.role": "admin"}}, "response": "admin"},
+    {"path": "/orders/", "method": ["GET", "POST"], "status": 401, "response": "fallback"},
+]
+
+
+@pytest.mark.mocks(ORDERS)
+def test_first_matching_variant_answers(mock_server, http):
+    orders = mock_server.url + "/orders/"
+    assert http("GET", orders + "?status=active").json() == "active"
+    assert http("GET", orders + "?status=archived", headers={"Authorization": "Bearer x"}).json() == "archived"
+    assert http("GET", orders, headers={"Authorization": "Bearer x"}).json() == "token"
+    assert http("POST", orders, {"user": {"role": "admin"}}).json() == "admin"
+
+    fallback = http("POST", orders, {"user": {"role": "guest"}})
+    assert (fallback.status, fallback.json()) == (401, "fallback")
+    assert http("GET", orders + "?status=other").json() == "fallback"
+
+
+def test_snapshot_selects_like_the_file_order():
+    snapshot = MockSnapshot(ORDERS)
+    select = lambda method, **ctx: snapshot.find("/orders/", method, MatchContext(**ctx)).response.body
+    assert select("GET", query={"status": "archived"}) == "archived"
+    assert select("GET", headers={"Authorization": "Basic x"}) == "fallback"
+    assert select("POST", body_loader=lambda: {"user": {"role": "admin"}}) == "admin"
+    assert snapshot.find("/orders/", "DELETE", MatchContext()) is None
+
+
+def test_body_is_only_loaded_when_a_body_condition_is_reached():
+    loads = []
+    snapshot = MockSnapshot(ORDERS)
+    snapshot.find("/orders/", "GET", MatchContext(query={"status": "active"}, body_loader=lambda: loads.append(1)))
+    assert loads == []
+
+
+def test_upserted_match_variants_are_kept_apart(mock_server, http):
+    mock_server.add(
+        {"path": "/v/", "match": {"query": {"v": "1"}}, "response": "one"},
+        {"path": "/v/", "match": {"query": {"v": "2"}}, "response": "two"},
+    )
+    mock_server.add({"path": "/v/", "match": {"query": {"v": "2"}}, "response": "two again"})
+    assert len(mock_server.mocks) == 2
+    assert http("GET", mock_server.url + "/v/?v=1").json() == "one"
+    assert http("GET", mock_server.url + "/v/?v=2").json() == "two again"
+
+    mock_server.remove("/v/", match={"query": {"v": "1"}})
+    assert [m["response"] for m in mock_server.mocks] == ["two again"]
+
+
+def test_booleans_do_not_match_numbers():
+    variants = [
+        {"path": "/n/", "match": {"query": {"n": "1"}}, "response": "one"},
+        {"path": "/n/", "match": {"query": {"n": "0"}}, "response": "zero"},
+        {"path": "/n/", "response": "other"},
+    ]
+    for entries in (variants, variants[:1] + variants[2:]):
+        snapshot = MockSnapshot(entries)
+        select = lambda n: snapshot.find("/n/", "GET", MatchContext(query={"n": n})).response.body
+        assert (select("true"), select("1")) == ("other", "one")
+    assert select("false") == "other"
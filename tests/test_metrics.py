@@ -0,0 +1,64 @@
+import gc
+import threading
+
+import pytest
+from django.test import RequestFactory, override_settings
+
+from mockapi.core.metrics.metrics import MetricsRegistry
+from mockapi.core.replay import replay
+from mockapi.core.replay.replay import ReplayStore, record_exchange
+
+
+@override_settings(MOCKAPI_METRICS=True)
+@pytest.mark.mocks([
+    {"path": "/metrics-ok/", "response": {"ok": True}},
+    {"path": "/metrics-fail/", "method": "POST", "data": [{"name": "id", "type": "int"}], "on_fail": {"response": {}}},
+])
+def test_metrics_endpoint_counts_requests_per_mock(mock_server, http):
+    for _ in range(3):
+        http("GET", mock_server.url + "/metrics-ok/")
+    http("POST", mock_server.url + "/metrics-fail/", {"id": "x"})
+    http("GET", mock_server.url + "/metrics-missing/")
+
+    reply = http("GET", mock_server.url + "/__mockapi/metrics")
+    text = reply.body.decode()
+    assert reply.status == 200 and reply.headers["Content-Type"].startswith("text/plain")
+    assert 'mockapi_requests_total{path="/metrics-ok/",method="GET"} 3' in text
+    assert 'mockapi_responses_total{path="/metrics-ok/",method="GET",status="200"} 3' in text
+    assert 'mockapi_validation_failures_total{path="/metrics-fail/",method="POST"} 1' in text
+    assert 'mockapi_request_duration_seconds_count{path="/metrics-ok/",method="GET"} 3' in text
+
+
+@pytest.mark.mocks([{"path": "/replayed/", "response": {"ok": True}}])
+def test_replayed_responses_have_their_own_label(mock_server, http, tmp_path, monkeypatch):
+    store = ReplayStore(tmp_path)
+    record_exchange(store, RequestFactory().get("/replayed/"), "/replayed/", mock_server.url)
+    monkeypatch.setattr(replay, "_store", store)
+    with override_settings(MOCKAPI_METRICS=True, MOCKAPI_MODE="replay"):
+        assert http("GET", mock_server.url + "/replayed/").json() == {"ok": True}
+        text = http("GET", mock_server.url + "/__mockapi/metrics").body.decode()
+    assert 'mockapi_requests_total{path="/replayed/",method="GET",mock="replay"} 1' in text
+
+
+@pytest.mark.mocks([{"path": "/a/"}])
+def test_metrics_endpoint_is_off_by_default(mock_server, http):
+    assert http("GET", mock_server.url + "/__mockapi/metrics").status == 404
+
+
+def test_shards_of_finished_threads_are_folded_into_the_totals():
+    registry = MetricsRegistry()
+
+    def work():
+        registry.observe("/p/", "GET", 200, 1000)
+
+    for _ in range(50):
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+    registry.observe("/p/", "GET", 500, 1000)
+    gc.collect()
+
+    assert len(registry._shards) <= 2
+    series = registry.collect()[("/p/", "GET")]
+    assert series.requests == 51
+    assert series.statuses == {200: 50, 500: 1}
@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+from mockapi.core.model import model
+from mockapi.core.model.model import Mock, parse_entries
+from mockapi.core.store.store import MockSnapshot, MockStore
+
+
+ENTRY = {
+    "status": 201,
+    "path": "/orders/{id}",
+    "response": {"id": "{{path.id}}"},
+    "method": ["POST", "GET", "POST"],
+    "match": {"query": {"v": "1"}},
+    "delay": "10-20",
+}
+
+
+def test_raw_rebuilds_the_entry_as_written():
+    raw = Mock(json.loads(json.dumps(ENTRY))).raw
+    assert raw == ENTRY
+    assert list(raw) == list(ENTRY)
+
+
+def test_snapshot_keeps_invalid_entries_for_listing():
+    snapshot = MockSnapshot([{"path": "/a/"}, {"path": "/b/", "data": "x"}])
+    assert len(snapshot.items) == 2 and len(snapshot.mocks) == 1
+    assert snapshot.entries == [{"path": "/a/"}, {"path": "/b/", "data": "x"}]
+
+
+def test_apply_reuses_the_mocks_it_does_not_change():
+    store = MockStore(mocks=[{"path": "/a/"}, {"path": "/b/"}])
+    before = store.current().mocks
+    store.apply(upserts=[{"path": "/b/", "response": "b2"}, {"path": "/c/"}])
+    after = store.current().mocks
+    assert after[0] is before[0]
+    assert after[1] is not before[1] and after[1].response.body == "b2"
+    assert [m.path for m in after] == ["/a/", "/b/", "/c/"]
+
+
+def test_apply_rebuilds_only_the_paths_it_changes():
+    entries = [
+        {"path": "/a/", "match": {"query": {"x": "1"}}},
+        {"path": "/a/"},
+        {"path": "/b/", "match": {"query": {"x": "1"}}},
+        {"path": "/items", "type": "resource"},
+        {"path": "/u/{id}"},
+        {"path": "/c/", "match": {"query": {"x": "1"}}},
+    ]
+    store = MockStore(mocks=entries)
+    before = store.current()
+    store.apply(upserts=[{"path": "/b/"}, {"path": "/u/{id}", "response": "u2"}],
+                deletes=[{"path": "/a/", "match": {"query": {"x": "1"}}}, {"path": "/items"}])
+    after = store.current()
+    assert after.trees["/c/"] is before.trees["/c/"]
+    assert after.trees.get("/b/") is not before.trees["/b/"] and "/a/" not in after.trees
+    assert after.routes["/a/"][0].variant == 0
+    assert after.resources == {} and after.patterns[0][0].response.body == "u2"
+    rebuilt = MockSnapshot(after.entries)
+    assert after.entries == rebuilt.entries
+    assert after.routes.keys() == rebuilt.routes.keys() and after.trees.keys() == rebuilt.trees.keys()
+    assert [m.key for m in after.mocks] == [m.key for m in rebuilt.mocks]
+
+
+def test_carried_over_mocks_are_rekeyed_when_their_variant_moves():
+    items = parse_entries([{"path": "/v/", "match": {"query": {"x": "1"}}}, {"path": "/v/"}], "ns:")
+    assert [m.key for m in items] == ["ns:GET:/v/", "ns:GET:/v/#1"]
+    assert all(m.group == "ns:GET:/v/" for m in items)
+
+    rekeyed = parse_entries(items[1:], "ns:")
+    assert rekeyed[0] is not items[1]
+    assert (rekeyed[0].variant, rekeyed[0].key) == (0, "ns:GET:/v/")
+
+
+def test_intern_caches_are_bounded(monkeypatch):
+    monkeypatch.setattr(model, "_INTERN_LIMIT", len(model._LAYOUTS) + 1)
+    Mock({"path": "/x/", "first_new_key": 1})
+    size = len(model._LAYOUTS)
+    mock = Mock({"path": "/x/", "second_new_key": 2})
+    assert len(model._LAYOUTS) == size
+    assert mock.raw == {"path": "/x/", "second_new_key": 2}
+
+
+@pytest.mark.mocks([{"path": ["/a/"], "response": "bad"}, {"path": "/b/", "response": "b"}])
+def test_entry_with_a_non_string_path_is_skipped(mock_server, http):
+    assert len(mock_server.store.current().mocks) == 1
+    assert http("GET", mock_server.url + "/b/").json() == "b"
+
+
+def test_resource_must_be_an_object():
+    items = parse_entries([{"path": "/r", "type": "resource", "resource": True}])
+    assert isinstance(items[0], bytes)
+
+
+def test_rules_with_equal_but_differently_typed_conditions_are_not_shared():
+    one, true = Mock({"path": "/x/", "data": [{"name": "a", "if": 1}]}), Mock({"path": "/y/", "data": [{"name": "a", "if": True}]})
+    assert type(one.rules[0].cond) is int and true.rules[0].cond is True
@@ -0,0 +1,34 @@
+import pytest
+from django.test import override_settings
+
+from mockapi.core.profiling.profiling import PhaseTimer, ProfileSampler
+
+
+@override_settings(MOCKAPI_SERVER_TIMING=True)
+@pytest.mark.mocks([{"path": "/timed/", "response": {"ok": True}}])
+def test_server_timing_header_lists_the_phases(mock_server, http):
+    header = http("GET", mock_server.url + "/timed/").headers["Server-Timing"]
+    phases = [part.split(";")[0] for part in header.split(", ")]
+    assert phases[:3] == ["load", "path", "find"]
+    assert phases[-1] == "total"
+
+
+@pytest.mark.mocks([{"path": "/untimed/"}])
+def test_no_server_timing_by_default(mock_server, http):
+    assert "Server-Timing" not in http("GET", mock_server.url + "/untimed/").headers
+
+
+def test_phase_timer_header():
+    timer = PhaseTimer()
+    timer.lap("find")
+    assert timer.header(2_500_000).endswith("total;dur=2.500")
+
+
+def test_sampler_profiles_one_call_in_n(tmp_path):
+    sampler = ProfileSampler()
+    sampled = [sampler.should_sample(3) for _ in range(6)]
+    assert sampled == [False, False, True, False, False, True]
+    assert not sampler.should_sample(0)
+
+    assert sampler.run(lambda: 42, tmp_path, "GET-/users/") == 42
+    assert [p.suffix for p in tmp_path.iterdir()] == [".pstats"]
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+from django.test import RequestFactory
+
+from mockapi.core.replay import replay
+from mockapi.core.replay.replay import ReplayStore, fingerprint, record_exchange, replay_exchange, request_fingerprint
+
+
+factory = RequestFactory()
+
+
+def test_fingerprint_ignores_json_key_order_and_unselected_query_keys():
+    a = fingerprint("get", "/a//b/", [("page", ["1"]), ("ts", ["1"])], b'{"x": 1, "y": 2}', "application/json", ["page"])
+    b = fingerprint("GET", "a/b", [("ts", ["2"]), ("page", ["1"])], b'{"y":2,"x":1}', "application/json", ["page"])
+    assert a == b
+    assert fingerprint("GET", "/a", [("page", ["1"])], b"") != fingerprint("GET", "/a", [("page", ["2"])], b"")
+
+
+@pytest.mark.mocks([{"path": "/items/", "method": ["GET", "POST"], "response": {"items": [1, 2]}, "status": 201}])
+def test_recorded_exchanges_replay_with_the_recording_query_keys(mock_server, tmp_path):
+    store = ReplayStore(tmp_path, query_keys=["page"])
+    recorded = record_exchange(store, factory.get("/items/", {"page": "1", "ts": "100"}), "/items/", mock_server.url)
+    assert recorded.status_code == 201 and json.loads(recorded.content) == {"items": [1, 2]}
+    assert json.loads((tmp_path / replay.META_FILE).read_text()) == {"query_keys": ["page"]}
+
+    # a replay started without --query-keys identifies requests like the recording did
+    replayed = ReplayStore(tmp_path)
+    assert replayed.query_keys == ["page"] and len(replayed) == 1
+    response = replay_exchange(replayed, factory.get("/items/", {"page": "1", "ts": "999"}), "/items/")
+    assert response.status_code == 201 and json.loads(response.content) == {"items": [1, 2]}
+    assert replay_exchange(replayed, factory.get("/items/", {"page": "2"}), "/items/") is None
+
+    # keys given on replay win
+    assert ReplayStore(tmp_path, query_keys=["ts"]).query_keys == ["ts"]
+
+
+def test_body_cache_evicts_the_least_recently_used(tmp_path, monkeypatch):
+    monkeypatch.setattr(replay, "BODY_CACHE_SIZE", 2)
+    store = ReplayStore(tmp_path)
+    fps = []
+    for name in ("a", "b", "c"):
+        request = factory.get(f"/{name}/")
+        fps.append(request_fingerprint(request, request.path))
+        store.add(fps[-1], "GET", request.path, 200, {}, name.encode(), 1.0)
+
+    store.get(fps[0])
+    store.get(fps[1])
+    store.get(fps[0])
+    store.get(fps[2])
+    assert list(store._bodies) == [fps[0], fps[2]]
+    assert store.get(fps[1])[1] == b"b"
@@ -0,0 +1,95 @@
+import json
+import time
+
+import pytest
+
+from mockapi.core.model.model import Mock
+from mockapi.core.resource.resource import ResourceCollection, ResourceRegistry
+
+
+pytestmark = pytest.mark.mocks([{
+    "path": "/users",
+    "type": "resource",
+    "resource": {
+        "indexes": ["role"],
+        "page_size": 2,
+        "seed": [{"name": "ann", "role": "admin"}, {"name": "bob", "role": "user"}, {"name": "cid", "role": "user"}],
+    },
+}])
+
+
+def test_crud(mock_server, http):
+    users = mock_server.url + "/users"
+    created = http("POST", users, {"name": "dan", "role": "admin"})
+    assert created.status == 201 and created.json()["id"] == 4
+    assert http("POST", users, {"id": 4}).status == 409
+
+    assert http("GET", users + "/4").json() == {"name": "dan", "role": "admin", "id": 4}
+    assert http("PATCH", users + "/4", {"role": "user"}).json()["role"] == "user"
+    assert http("PUT", users + "/4", {"name": "dan"}).json() == {"name": "dan", "id": 4}
+    assert http("PUT", users + "/9", {"name": "eve"}).status == 201
+
+    assert http("DELETE", users + "/4").status == 204
+    assert http("GET", users + "/4").status == 404
+    assert http("DELETE", users + "/4").status == 404
+
+
+def test_string_ids_stay_strings(mock_server, http):
+    assert http("PUT", mock_server.url + "/users/007", {"name": "bond"}).json() == {"name": "bond", "id": "007"}
+    assert http("GET", mock_server.url + "/users/007").json()["id"] == "007"
+    assert http("PUT", mock_server.url + "/users/8", {}).json()["id"] == 8
+    assert http("PUT", mock_server.url + "/users/%C2%B2", {}).json()["id"] == "²"
+
+
+@pytest.mark.mocks([{
+    "path": "/things", "type": "resource",
+    "resource": {"seed": [{"id": "1"}, {"id": "2"}, {"id": {"bad": 1}}, {"id": [3]}]},
+}])
+def test_ids_are_generated_past_string_ids_and_bad_ids_are_refused(mock_server, http):
+    things = mock_server.url + "/things"
+    assert http("GET", things).json()["total"] == 2
+    created = http("POST", things, {"name": "x"})
+    assert created.status == 201 and created.json()["id"] == 3
+    assert http("POST", things, {"id": {"a": 1}}).status == 400
+    assert http("POST", things, {"id": [1]}).status == 400
+
+
+def test_pages_and_filters(mock_server, http):
+    users = mock_server.url + "/users"
+    page = http("GET", users + "?page=2").json()
+    assert [u["name"] for u in page["items"]] == ["cid"]
+    assert (page["page"], page["page_size"], page["total"]) == (2, 2, 3)
+
+    http("POST", users, {"name": "dan", "role": "user"})
+    http("DELETE", users + "/2")
+    assert [u["name"] for u in http("GET", users + "?page=2").json()["items"]] == ["dan"]
+
+    # indexed and scanned filters
+    assert [u["name"] for u in http("GET", users + "?role=user&page_size=10").json()["items"]] == ["cid", "dan"]
+    assert http("GET", users + "?name=ann").json()["total"] == 1
+    assert http("GET", users + "?role=user&page=2&page_size=1").json() == {
+        "items": [{"name": "dan", "role": "user", "id": 4}], "page": 2, "page_size": 1, "total": 2,
+    }
+    assert [u["name"] for u in http("GET", users + "?role=user&name=dan").json()["items"]] == ["dan"]
+
+
+def test_collections_survive_reloads_until_their_config_changes():
+    registry = ResourceRegistry()
+    config = {"path": "/r", "type": "resource", "resource": {"seed": [{"a": 1}]}}
+    collection = registry.get(Mock(config))
+    collection.create({"a": 2})
+    assert registry.get(Mock(json.loads(json.dumps(config)))) is collection
+    config["resource"]["page_size"] = 5
+    assert registry.get(Mock(config)) is not collection
+
+
+def test_snapshots_are_restored_and_stop_with_close(tmp_path):
+    config = {"seed": [{"a": 1}], "snapshot": {"file": str(tmp_path / "r.json"), "interval": 0.01}}
+    collection = ResourceCollection(config)
+    collection.create({"a": 2})
+    collection.close()
+    time.sleep(0.05)
+    assert collection._snapshot_timer is None
+    restored = ResourceCollection(config)
+    restored.close()
+    assert [o["a"] for o in restored.query({}, 0, 10)[0]] == [1, 2]
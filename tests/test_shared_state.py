@@ -0,0 +1,113 @@
+import multiprocessing
+import os
+import tempfile
+import uuid
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import pytest
+
+from mockapi.core.shared import shared_state
+from mockapi.core.shared.shared_state import LocalState, SharedState
+
+
+@pytest.mark.mocks([
+    {"path": "/seq/", "match": {"query": {"v": "a"}}, "sequence": [{"response": "a1"}, {"response": "a2"}]},
+    {"path": "/seq/", "sequence": [{"response": "b1"}, {"response": "b2"}, {"response": "b3"}]},
+])
+def test_match_variants_have_their_own_sequence(mock_server, http):
+    url = mock_server.url + "/seq/"
+    assert [http("GET", url + "?v=a").json() for _ in range(2)] == ["a1", "a2"]
+    assert [http("GET", url).json() for _ in range(3)] == ["b1", "b2", "b3"]
+
+
+@pytest.mark.mocks([
+    {"path": "/flaky/", "match": {"query": {"v": "a"}}, "unstable": {"fail_every": 2, "status": 503}},
+    {"path": "/flaky/", "unstable": {"fail_every": 2, "status": 503}},
+])
+def test_match_variants_have_their_own_fail_every(mock_server, http):
+    url = mock_server.url + "/flaky/"
+    assert [http("GET", url + "?v=a").status for _ in range(3)] == [200, 503, 200]
+    assert [http("GET", url).status for _ in range(2)] == [200, 503]
+
+
+@pytest.mark.mocks([{"path": "/count/", "sequence": [{"response": 1}, {"response": 2}]}])
+def test_test_servers_do_not_share_counters(mock_server, http):
+    with type(mock_server)(mock_server.mocks) as other:
+        assert http("GET", mock_server.url + "/count/").json() == 1
+        assert http("GET", other.url + "/count/").json() == 1
+
+
+def _count(name: str, times: int) -> None:
+    state = SharedState.open(name, slots=64)
+    for _ in range(times):
+        state.incr("hits")
+    state.close()
+
+
+@pytest.fixture
+def shared_name():
+    name = f"mockapi_test_{uuid.uuid4().hex[:12]}"
+    yield name
+    Path(tempfile.gettempdir(), f"{name}.lock").unlink(missing_ok=True)
+
+
+@pytest.mark.skipif(os.name != "posix", reason="uses fork")
+def test_shared_state_counts_across_processes(shared_name):
+    state = SharedState(shared_name, slots=64, create=True)
+    try:
+        context = multiprocessing.get_context("fork")
+        workers = [context.Process(target=_count, args=(shared_name, 200)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        assert state.get("hits") == 800
+        assert all(worker.exitcode == 0 for worker in workers)
+    finally:
+        state.unlink()
+
+
+@pytest.mark.parametrize("make", [LocalState, "shared"])
+def test_values(make, shared_name):
+    state = LocalState() if make is LocalState else SharedState(shared_name, slots=16, create=True)
+    try:
+        assert state.get_value("k") is None and state.get("n") == 0
+        state.set_value("k", b"v1")
+        assert state.get_value("k") == b"v1"
+        assert state.incr("n", 5) == 5 and state.incr("n", -2) == 3
+        with pytest.raises(ValueError):
+            state.set_value("k", b"x" * 10_000)
+    finally:
+        state.unlink() if isinstance(state, SharedState) else state.close()
+
+
+@pytest.mark.mocks([{"path": f"/full/{i}/", "sequence": [{"response": 1}, {"response": 2}]} for i in range(3)])
+def test_counters_past_a_full_block_are_kept_per_process(mock_server, http, shared_name, monkeypatch):
+    state = SharedState(shared_name, slots=1, create=True)
+    monkeypatch.setattr(shared_state, "_state", state)
+    try:
+        for i in range(3):
+            assert [http("GET", f"{mock_server.url}/full/{i}/").json() for _ in range(2)] == [1, 2]
+    finally:
+        state.unlink()
+
+
+@pytest.mark.skipif(os.name != "posix", reason="uses fork")
+def test_workers_create_the_block_when_no_owner_did(shared_name):
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_count, args=(shared_name, 200)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    try:
+        assert all(worker.exitcode == 0 for worker in workers)
+        # the block outlived the worker that created it
+        state = SharedState.open(shared_name, slots=64)
+        assert state.get("hits") == 800
+        state.close()
+    finally:
+        shm = shared_memory.SharedMemory(shared_name)
+        shm.close()
+        shm.unlink()
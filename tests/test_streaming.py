@@ -0,0 +1,56 @@
+import time
+import urllib.request
+from http.client import IncompleteRead
+
+import pytest
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from mockapi.core.model.model import Mock
+from mockapi.core.streaming.streaming import shape_response
+
+
+BODY = "x" * 1000  # the JSON body is 1002 bytes long
+
+
+@pytest.mark.mocks([{"path": "/slow/", "response": BODY, "throughput": {"bytes_per_sec": 4000, "chunk_size": 200}}])
+def test_throughput_paces_the_body(mock_server, http):
+    start = time.monotonic()
+    reply = http("GET", mock_server.url + "/slow/")
+    assert time.monotonic() - start >= 0.2
+    assert reply.json() == BODY and reply.headers["Content-Length"] == "1002"
+
+
+@pytest.mark.mocks([{"path": "/cut/", "response": BODY, "fault": {"type": "truncate", "after_bytes": 100}}])
+def test_truncate_sends_a_short_complete_body(mock_server, http):
+    reply = http("GET", mock_server.url + "/cut/")
+    assert reply.status == 200 and len(reply.body) == 100
+    assert "Content-Length" not in reply.headers
+
+
+@pytest.mark.mocks([{"path": "/drop/", "response": BODY, "fault": {"type": "close", "after_bytes": 100}}])
+def test_close_drops_the_connection_mid_body(mock_server):
+    with urllib.request.urlopen(mock_server.url + "/drop/", timeout=10) as response:
+        assert response.headers["Content-Length"] == "1002"
+        with pytest.raises(IncompleteRead) as e:
+            response.read()
+    assert len(e.value.partial) == 100
+
+
+def test_close_without_a_socket_ends_the_body_without_a_length():
+    mock = Mock({"path": "/drop/", "fault": {"type": "close", "after_bytes": 3}})
+    shaped = shape_response(HttpResponse(b"0123456789"), mock, RequestFactory().get("/drop/"))
+    assert "Content-Length" not in shaped
+    assert b"".join(shaped.streaming_content) == b"012"
+
+
+def test_stall_keeps_the_length():
+    mock = Mock({"path": "/stall/", "fault": {"type": "stall", "after_bytes": 3, "duration": 0}})
+    shaped = shape_response(HttpResponse(b"0123456789"), mock, RequestFactory().get("/stall/"))
+    assert shaped["Content-Length"] == "10"
+    assert b"".join(shaped.streaming_content) == b"0123456789"
+
+
+def test_stall_duration_is_capped():
+    with pytest.raises(ValueError):
+        Mock({"path": "/stall/", "fault": {"type": "stall", "duration": 10_000}})
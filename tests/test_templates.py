@@ -0,0 +1,58 @@
+import re
+
+import pytest
+
+from mockapi.core.check.check import WARNING, check_mock
+from mockapi.core.template.template import compile_template, placeholders
+
+
+@pytest.mark.mocks([{
+    "path": "/users/{id}/",
+    "method": ["GET", "PUT"],
+    "response": {
+        "id": "{{path.id}}",
+        "name": "{{ body.user.name }}",
+        "tags": "{{body.tags}}",
+        "page": "{{query.page}}",
+        "trace": "req-{{headers.X-Request-Id}}",
+        "missing": "[{{query.nope}}]",
+        "updated_at": "{{now}}",
+        "greeting": "Hello {{user}}",
+    },
+}])
+def test_placeholders_are_filled_from_the_request(mock_server, http):
+    reply = http("PUT", mock_server.url + "/users/7/?page=2", {"user": {"name": "ann"}, "tags": [1, True]},
+                 headers={"x-request-id": "abc"})
+    body = reply.json()
+    assert re.match(r"^\d{4}-\d\d-\d\dT", body.pop("updated_at"))
+    assert body == {
+        "id": "7",
+        "name": "ann",
+        "tags": [1, True],
+        "page": "2",
+        "trace": "req-abc",
+        "missing": "[]",
+        "greeting": "Hello {{user}}",
+    }
+
+    # no body: single placeholders are null
+    assert http("GET", mock_server.url + "/users/8/").json()["name"] is None
+
+
+def test_bodies_without_known_placeholders_are_not_templates():
+    assert compile_template({"greeting": "Hello {{user}}", "n": 1}) is None
+    assert compile_template("{{body}}") is not None
+    assert list(placeholders({"a": ["{{x}} and {{ y.z }}"], "b": 1})) == ["x", "y.z"]
+
+
+def test_check_warns_about_placeholders_that_have_no_value():
+    found = check_mock({
+        "path": "/users/{id}/",
+        "response": {"a": "{{user}}", "b": "{{path.id}}", "c": "{{path.name}}"},
+        "sequence": [{"response": "{{user}}"}],
+    })
+    assert found == [
+        (WARNING, "{{user}} is not a placeholder, it is returned as is"),
+        (WARNING, "{{path.name}}: the path has no {name} parameter, so it has no value"),
+        (WARNING, "sequence[0]: {{user}} is not a placeholder, it is returned as is"),
+    ]
@@ -0,0 +1,58 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from mockapi.testing import MockServer
+
+
+def test_servers_run_side_by_side_with_their_own_mocks(http):
+    with MockServer({"path": "/who/", "response": "one"}) as one, MockServer([{"path": "/who/", "response": "two"}]) as two:
+        assert one.port != two.port
+        assert http("GET", one.url + "/who/").json() == "one"
+        assert http("GET", two.url + "/who/").json() == "two"
+
+
+def test_mocks_change_while_running(http, tmp_path):
+    with MockServer() as server:
+        assert http("GET", server.url + "/a/").status == 404
+        server.add({"path": "/a/", "response": "a"}, {"path": "/b/", "method": "POST", "response": "b"})
+        assert http("GET", server.url + "/a/").json() == "a"
+        assert http("POST", server.url + "/b/").json() == "b"
+
+        server.remove("/b/", "POST")
+        assert http("POST", server.url + "/b/").status == 404
+        assert server.mocks == [{"path": "/a/", "response": "a"}]
+
+        mocks_file = tmp_path / "mocks.json"
+        mocks_file.write_text(json.dumps([{"path": "/file/", "response": "from file"}]))
+        server.set_mocks(mocks_file)
+        assert http("GET", server.url + "/file/").json() == "from file"
+        assert http("GET", server.url + "/a/").status == 404
+
+
+@pytest.mark.mocks([{"path": "/marked/", "response": "yes"}])
+def test_the_marker_fills_the_fixture(mock_server, http):
+    assert http("GET", mock_server.url + "/marked/").json() == "yes"
+
+
+def test_the_fixture_starts_empty(mock_server):
+    assert mock_server.mocks == []
+
+
+def test_start_stop_and_restart():
+    server = MockServer({"path": "/up/", "response": "up"})
+    assert "stopped" in repr(server)
+    server.start()
+    with pytest.raises(RuntimeError):
+        server.start()
+    url = server.url
+    server.stop()
+    server.stop()  # stopping twice is harmless
+    with pytest.raises(urllib.error.URLError):
+        urllib.request.urlopen(url + "/up/", timeout=2)
+
+    with server:
+        with urllib.request.urlopen(server.url + "/up/", timeout=10) as response:
+            assert json.loads(response.read()) == "up"